@@ -94,9 +94,40 @@ api.defaults.withCredentials = true;
  * @typedef {import('types').TableColumn} TableColumn
  */
 
+// Browsers do not cache POST responses, so keep the last body of the dashboard
+// queries here and let the server answer 304 when the ETag still matches
+const MAX_CONDITIONAL_POST_ENTRIES = 50;
+const conditionalPostCache = new Map();
+
+const postWithEtag = async (url, body) => {
+    const key = `${url}:${JSON.stringify(body)}`;
+    const cached = conditionalPostCache.get(key);
+    const response = await api.post(url, body, {
+        headers: cached ? { "If-None-Match": cached.etag } : {},
+        validateStatus: (status) =>
+            (status >= 200 && status < 300) || status === 304,
+    });
+
+    if (response.status === 304 && cached) {
+        return { ...cached.data, statusCode: 200 };
+    }
+
+    const etag = response.headers.etag;
+    if (etag && response.data.success) {
+        conditionalPostCache.delete(key);
+        conditionalPostCache.set(key, { etag, data: response.data });
+        if (conditionalPostCache.size > MAX_CONDITIONAL_POST_ENTRIES) {
+            // Maps iterate in insertion order, so this drops the oldest entry
+            conditionalPostCache.delete(conditionalPostCache.keys().next().value);
+        }
+    }
+    return { ...response.data, statusCode: response.status };
+};
+
 export const logout = async () => {
     const response = await api.post("/logout");
     if (response.data.success) {
+        conditionalPostCache.clear();
         localStorage.removeItem("sessionToken");
         window.location.href = "/";
     }
@@ -139,11 +170,10 @@ export const getRefreshToken = async () => {
  * @returns {Promise<ApiResponse>}
  */
 export const fetchProspectingActivities = async (period, filterIds = []) => {
-    const response = await api.post("/get_prospecting_activities_by_ids", {
+    return postWithEtag("/get_prospecting_activities_by_ids", {
         period,
         filterIds,
     });
-    return { ...response.data, statusCode: response.status };
 };
 
 /**
@@ -164,7 +194,7 @@ export const getPaginatedProspectingActivities = async (
     sortColumn = "",
     sortOrder = "asc"
 ) => {
-    const response = await api.post("/get_paginated_prospecting_activities", {
+    return postWithEtag("/get_paginated_prospecting_activities", {
         filterIds,
         page,
         rowsPerPage,
@@ -172,7 +202,6 @@ export const getPaginatedProspectingActivities = async (
         sortColumn,
         sortOrder,
     });
-    return { ...response.data, statusCode: response.status };
 };
 
 /**
@@ -194,17 +223,62 @@ export const saveSettings = async (settings) => {
     return { ...response.data, statusCode: response.status };
 };
 
+const JOB_POLL_INTERVAL_MS = 2000;
+
+/**
+ * Fetches the status and stage progress of a background job
+ * @param {string} jobId
+ * @returns {Promise<ApiResponse>}
+ */
+export const getJobStatus = async (jobId) => {
+    const response = await api.get("/get_job_status", {
+        params: { job_id: jobId },
+        validateStatus: () => true,
+    });
+    return { ...response.data, statusCode: response.status };
+};
+
+/**
+ * Polls a background job until it completes or fails
+ * @param {string} jobId
+ * @param {(job: object) => void} [onProgress] called with the job after every poll
+ * @returns {Promise<object>} the finished job
+ */
+const waitForJob = async (jobId, onProgress) => {
+    while (true) {
+        const response = await getJobStatus(jobId);
+        if (response.statusCode !== 200 || !response.success) {
+            throw new Error(response.message || "Failed to fetch job status");
+        }
+
+        const job = response.data[0];
+        if (onProgress) {
+            onProgress(job);
+        }
+        if (job.status === "completed") {
+            return job;
+        }
+        if (job.status === "failed") {
+            throw new Error(job.message || "Job failed");
+        }
+
+        await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+};
+
 /**
- * Fetches and updates prospecting activity data
+ * Starts processing new prospecting activity and waits for the background job to finish
  * @param {string} timezone
- * @returns {Promise<{ statusCode: number }>}
+ * @param {(job: object) => void} [onProgress]
+ * @returns {Promise<{ statusCode: number, job: object }>}
  */
-export const processNewProspectingActivity = async (timezone) => {
+export const processNewProspectingActivity = async (timezone, onProgress) => {
     try {
         const response = await api.post("/process_new_prospecting_activity", {
             timezone,
         });
-        return { statusCode: response.status };
+        const job = await waitForJob(response.data.data[0].id, onProgress);
+        return { statusCode: response.status, job };
     } catch (error) {
         console.error("Error in processNewProspectingActivity:", error);
         throw error;
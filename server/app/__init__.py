@@ -4,39 +4,54 @@ from config import Config
 import sentry_sdk
 from sentry_sdk.integrations.flask import FlaskIntegration
 import asyncio
+import atexit
 import os
 
 SERVER_URL = os.getenv("SERVER_URL", "http://localhost:8000")
 REACT_APP_URL = os.getenv("REACT_APP_URL", "http://localhost:3000")
-ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+ENVIRONMENT = Config.ENVIRONMENT
 
 
 def create_app():
     app = Flask(__name__)
 
     if os.environ.get("FLASK_ENV") != "testing":
+        from app.sentry_sampling import sample_traces
+
         sentry_sdk.init(
             integrations=[FlaskIntegration()],
             dsn="https://068431a7f1d4b25d48014f759db6d5ca@o4507733909766144.ingest.us.sentry.io/4507733911994368",
-            # Set traces_sample_rate to 1.0 to capture 100%
-            # of transactions for performance monitoring.
-            traces_sample_rate=1.0,
-            # Set profiles_sample_rate to 1.0 to profile 100%
-            # of sampled transactions.
-            # We recommend adjusting this value in production.
-            profiles_sample_rate=1.0,
+            # per-route share of transactions traced, see app.sentry_sampling;
+            # latency for every request is in /metrics
+            traces_sampler=sample_traces,
+            # Share of traced transactions that are also profiled
+            profiles_sample_rate=Config.SENTRY_PROFILES_SAMPLE_RATE,
             environment=ENVIRONMENT,
         )
 
     app.config.from_object(Config)
 
+    # a summary cache or job queue that cannot work in this deployment fails at boot,
+    # not per request
+    from app.cache.summary_cache import get_summary_cache_backends
+    from app.jobs.job_queue import get_job_queue
+
+    get_summary_cache_backends()
+    get_job_queue()
+
     CORS(
         app,
         resources={
             r"/*": {"origins": [app.config["SERVER_URL"], app.config["REACT_APP_URL"]]}
         },
         supports_credentials=True,
-        allow_headers=["Content-Type", "Authorization", "x-session-token"],
+        allow_headers=[
+            "Content-Type",
+            "Authorization",
+            "x-session-token",
+            "If-None-Match",
+        ],
+        expose_headers=["ETag"],
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     )
 
@@ -45,6 +60,24 @@ def create_app():
 
     app.register_blueprint(bp)
 
+    from app.sentry_sampling import get_traces_sampler
+
+    get_traces_sampler().set_routes(rule.rule for rule in app.url_map.iter_rules())
+
+    # close pooled HTTP connections before the background event loop stops
+    from app.http_sessions import shutdown_client_sessions
+
+    atexit.register(shutdown_client_sessions)
+
+    from app.http_cache import compress_response
+
+    app.after_request(compress_response)
+
+    from app.metrics import observe_request, start_request_timer
+
+    app.before_request(start_request_timer)
+    app.after_request(observe_request)
+
     @app.after_request
     def add_header(response):
         response.headers["Content-Security-Policy"] = (
@@ -0,0 +1,157 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class CacheBackend:
+    """
+    Minimal key/value interface shared by the local and shared cache backends.
+
+    Values are arbitrary Python objects for the local backend; the shared backend
+    stores whatever its client accepts (JSON-serializable payloads in practice).
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LocalCacheBackend(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL. Safe to share between Flask worker threads.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[int] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value, expires_at = self._entries.get(key, (0, None))
+            value = int(value) + 1
+            self._entries[key] = (value, expires_at)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedCacheBackend(CacheBackend):
+    """
+    Adapter for a cache shared between processes.
+
+    `client` must expose the redis-py subset `get`, `set(key, value, ex=None)`,
+    `delete` and `incr`, so a `redis.Redis` instance can be passed directly.
+    Values are JSON encoded on the way in and decoded on the way out.
+    """
+
+    def __init__(
+        self,
+        client,
+        prefix: str = "insideoutbound:",
+        dumps: Callable[[Any], str] = json.dumps,
+        loads: Callable[[str], Any] = json.loads,
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.dumps = dumps
+        self.loads = loads
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return self.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self.client.set(self.prefix + key, self.dumps(value), ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def clear(self) -> None:
+        raise NotImplementedError("Shared caches are cleared by key, not wholesale")
+
+
+class InMemorySharedClient:
+    """
+    Stand-in for a redis client, used in tests and local development to exercise
+    the shared backend code path without a server.
+    """
+
+    def __init__(self):
+        self._store = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._store[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._store[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            return 1 if self._store.pop(key, None) is not None else 0
+
+    def incr(self, key):
+        with self._lock:
+            value, expires_at = self._store.get(key, (b"0", None))
+            value = int(value) + 1
+            self._store[key] = (str(value).encode("utf-8"), expires_at)
+            return value
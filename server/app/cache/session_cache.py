@@ -0,0 +1,72 @@
+import json
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from dateutil import parser
+
+from config import Config
+from app.cache.backends import CacheBackend, LocalCacheBackend
+from app.data_models import SessionNotFoundError
+from app.database.session_selector import fetch_supabase_session
+from app.metrics import record_cache_lookup
+
+SESSION_KEY_PREFIX = "session:"
+
+# cached in place of a session for tokens Supabase does not know about
+_SESSION_NOT_FOUND = "not_found"
+
+_session_backend: Optional[CacheBackend] = None
+
+
+def get_session_cache_backend() -> CacheBackend:
+    global _session_backend
+    if _session_backend is None:
+        _session_backend = LocalCacheBackend(
+            max_entries=Config.SESSION_CACHE_MAX_ENTRIES,
+            default_ttl=Config.SESSION_CACHE_TTL_SECONDS,
+        )
+    return _session_backend
+
+
+def set_session_cache_backend(backend: CacheBackend):
+    """
+    Swaps the cache backend, e.g. to a fresh local backend in tests.
+    """
+    global _session_backend
+    _session_backend = backend
+
+
+def get_authenticated_session(session_token: str) -> Tuple[Dict, datetime]:
+    """
+    Returns the session state and expiry for `session_token`, hitting Supabase only
+    when the token has not been seen within the cache TTL.
+
+    Raises SessionNotFoundError for unknown tokens, which are cached briefly too so
+    a client retrying with a stale token does not cost a round trip per request.
+    """
+    backend = get_session_cache_backend()
+    key = SESSION_KEY_PREFIX + session_token
+
+    cached = backend.get(key)
+    record_cache_lookup("session", cached is not None)
+    if cached == _SESSION_NOT_FOUND:
+        raise SessionNotFoundError()
+
+    if cached is None:
+        try:
+            session = fetch_supabase_session(session_token)
+        except SessionNotFoundError:
+            backend.set(
+                key, _SESSION_NOT_FOUND, ttl=Config.SESSION_CACHE_NEGATIVE_TTL_SECONDS
+            )
+            raise
+        cached = (json.loads(session["state"]), parser.isoparse(session["expiry"]))
+        backend.set(key, cached)
+
+    session_state, expiry = cached
+    # callers may modify the state they are handed; keep the cached copy intact
+    return dict(session_state), expiry
+
+
+def invalidate_session(session_token: str) -> None:
+    get_session_cache_backend().delete(SESSION_KEY_PREFIX + session_token)
@@ -0,0 +1,148 @@
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, List, Optional
+
+from werkzeug.http import http_date
+
+from config import Config
+from app.cache.backends import (
+    CacheBackend,
+    InMemorySharedClient,
+    LocalCacheBackend,
+    SharedCacheBackend,
+)
+from app.metrics import record_cache_lookup
+
+DATA_VERSION_KEY_PREFIX = "activation_data_version:"
+SUMMARY_KEY_PREFIX = "activation_summary:"
+
+_summary_backend: Optional[CacheBackend] = None
+_version_backend: Optional[CacheBackend] = None
+
+
+def _encode_json_default(value):
+    # mirror Flask's JSON provider so cached payloads render exactly like fresh ones
+    if isinstance(value, (date, datetime)):
+        return http_date(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _create_backends():
+    backend_type = Config.SUMMARY_CACHE_BACKEND
+    if backend_type == "local":
+        if Config.WEB_CONCURRENCY > 1:
+            # each worker would keep its own data versions and miss the others' bumps
+            raise ValueError(
+                "The local summary cache only supports a single worker process; "
+                "set SUMMARY_CACHE_BACKEND=redis when running "
+                f"{Config.WEB_CONCURRENCY} workers"
+            )
+        return (
+            LocalCacheBackend(
+                max_entries=Config.SUMMARY_CACHE_MAX_ENTRIES,
+                default_ttl=Config.SUMMARY_CACHE_TTL_SECONDS,
+            ),
+            # versions live apart from summaries so LRU eviction can never reset them
+            LocalCacheBackend(max_entries=100_000),
+        )
+
+    if backend_type == "redis":
+        import redis  # optional dependency, only needed for the shared backend
+
+        client = redis.Redis.from_url(Config.REDIS_URL)
+    elif backend_type == "memory":
+        client = InMemorySharedClient()
+    else:
+        raise ValueError(f"Unknown summary cache backend: {backend_type}")
+
+    shared = SharedCacheBackend(client, dumps=_dumps)
+    return shared, shared
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=_encode_json_default)
+
+
+def get_summary_cache_backends():
+    global _summary_backend, _version_backend
+    if _summary_backend is None or _version_backend is None:
+        _summary_backend, _version_backend = _create_backends()
+    return _summary_backend, _version_backend
+
+
+def set_summary_cache_backend(
+    backend: CacheBackend, version_backend: Optional[CacheBackend] = None
+):
+    """
+    Swaps the cache backend, e.g. to an in-memory shared backend in tests.
+    """
+    global _summary_backend, _version_backend
+    _summary_backend = backend
+    _version_backend = version_backend or backend
+
+
+def get_data_version(salesforce_user_ids: Iterable[str]) -> str:
+    """
+    Returns the combined activation data version for a team. Each team member has
+    their own counter since a member's activations can show up under several teams.
+    """
+    _, version_backend = get_summary_cache_backends()
+    return ".".join(
+        str(version_backend.get(f"{DATA_VERSION_KEY_PREFIX}{user_id}") or 0)
+        for user_id in sorted(set(salesforce_user_ids))
+    )
+
+
+def bump_data_version(salesforce_user_ids: Iterable[str]) -> None:
+    """
+    Invalidates every cached summary that includes any of the given users.
+    Called whenever activations for those users are written or deleted.
+    """
+    _, version_backend = get_summary_cache_backends()
+    for user_id in set(filter(None, salesforce_user_ids)):
+        version_backend.incr(f"{DATA_VERSION_KEY_PREFIX}{user_id}")
+
+
+def build_summary_cache_key(
+    team_member_ids: List[str],
+    period: str,
+    filter_ids: Optional[List[str]],
+    data_version: str,
+) -> str:
+    if filter_ids:
+        scope = "ids:" + hashlib.sha1(
+            ",".join(sorted(filter_ids)).encode("utf-8")
+        ).hexdigest()
+    else:
+        scope = f"period:{period}"
+
+    # relative periods and the "activations_today" metric both move with the calendar
+    today = datetime.now().date().isoformat()
+    team = ",".join(sorted(set(team_member_ids)))
+    return f"{SUMMARY_KEY_PREFIX}{team}|{scope}|{today}|v{data_version}"
+
+
+def get_or_compute_summary(
+    team_member_ids: List[str],
+    period: str,
+    filter_ids: Optional[List[str]],
+    compute: Callable[[], dict],
+) -> dict:
+    """
+    Returns the cached summary payload for the team/period/filter combination,
+    computing and storing it when absent or when the team's data version moved.
+    """
+    summary_backend, _ = get_summary_cache_backends()
+    key = build_summary_cache_key(
+        team_member_ids, period, filter_ids, get_data_version(team_member_ids)
+    )
+
+    cached = summary_backend.get(key)
+    record_cache_lookup("summary", cached is not None)
+    if cached is not None:
+        return cached
+
+    payload = compute()
+    summary_backend.set(key, payload, ttl=Config.SUMMARY_CACHE_TTL_SECONDS)
+    return payload
@@ -1,31 +1,18 @@
 from pydantic import BaseModel, Field
+from pydantic_core import core_schema
 from typing import List, Optional, Set, Any, Union, Dict
+from collections.abc import MutableMapping
 from datetime import date, datetime
 from enum import Enum
 import re
-
-
-def serialize_complex_types(obj: Any) -> Any:
-    if isinstance(obj, (date, datetime)):
-        return obj.isoformat()
-    elif isinstance(obj, set):
-        return list(obj)
-    elif isinstance(obj, SerializableModel):
-        return obj.to_dict()
-    elif isinstance(obj, list):
-        return [serialize_complex_types(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {key: serialize_complex_types(value) for key, value in obj.items()}
-    else:
-        return obj
+import sys
 
 
 class SerializableModel(BaseModel):
     def to_dict(self) -> dict:
-        return {
-            key: serialize_complex_types(value)
-            for key, value in self.model_dump().items()
-        }
+        # pydantic-core turns dates, sets, enums and nested models into JSON-ready values
+        # in a single pass; warnings are off since some callers store strings in date fields
+        return self.model_dump(mode="json", warnings=False)
 
 
 class UserSObject(SerializableModel):
@@ -134,6 +121,108 @@ class TaskSObject(SerializableModel):
     TaskSubtype: Optional[str] = None
 
 
+class TaskRecord(MutableMapping):
+    """
+    Compact in-memory Task used by the activation engine in place of the raw REST dict.
+
+    Holds only the fields selected by `fetch_all_matching_tasks` plus the `Account` and
+    `Contact` attached while grouping, in `__slots__`, with ids and low-cardinality
+    picklist values interned. It keeps the dict interface (`task["Id"]`, `task.get(...)`)
+    so the engine and `FilterContainer.matches` work unchanged, and converts back to a
+    plain dict via `to_dict()` when an Activation is persisted.
+    """
+
+    FIELDS = (
+        "Id",
+        "WhoId",
+        "OwnerId",
+        "Priority",
+        "WhatId",
+        "Subject",
+        "Status",
+        "CallDurationInSeconds",
+        "CallType",
+        "CallDisposition",
+        "CreatedDate",
+        "CreatedById",
+        "TaskSubtype",
+        "Account",
+        "Contact",
+    )
+    INTERNED_FIELDS = frozenset(
+        (
+            "Id",
+            "WhoId",
+            "OwnerId",
+            "Priority",
+            "WhatId",
+            "Status",
+            "CallType",
+            "CallDisposition",
+            "CreatedById",
+            "TaskSubtype",
+        )
+    )
+    __slots__ = FIELDS
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_sobject(cls, sobject: Dict) -> "TaskRecord":
+        record = cls()
+        for key in cls.FIELDS:
+            if key in sobject:
+                record[key] = sobject[key]
+        return record
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(f"TaskRecord has no field {key}")
+        if key in self.INTERNED_FIELDS and isinstance(value, str):
+            value = sys.intern(value)
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        for key in self.__slots__:
+            if hasattr(self, key):
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"TaskRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self}
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        # accept records as-is and serialize them as plain dicts
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda record: record.to_dict()
+            ),
+        )
+
+
 class TaskModel(SerializableModel):
     id: str
     createdDate: datetime
@@ -204,7 +293,7 @@ class Activation(SerializableModel):
     task_ids: Optional[Set[str]] = None
     active_contact_ids: Optional[Set[str]] = None
     active_contacts: Optional[List[Contact]] = None
-    tasks: Optional[List[Dict]] = None  # Add this line
+    tasks: Optional[List[Union[TaskRecord, Dict]]] = None
     activated_by_id: Optional[str] = None
     active_contact_count: Optional[int] = None
     activated_date: Optional[date] = None
@@ -409,7 +498,39 @@ class SessionState(SerializableModel):
     username: Optional[str] = None
 
 
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class JobModel(SerializableModel):
+    id: str
+    type: str
+    owner_id: str
+    # users polling this job; callers coalesced onto an existing job are added here
+    subscriber_ids: List[str] = Field(default_factory=list)
+    dedupe_key: Optional[str] = None
+    status: JobStatus = JobStatus.queued
+    stage: Optional[str] = None
+    progress: Dict[str, int] = Field(default_factory=dict)
+    message: str = ""
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.completed, JobStatus.failed)
+
+
 class AuthenticationError(Exception):
     def __init__(self, message="Authentication failed"):
         self.message = message
         super().__init__(self.message)
+
+
+class SessionNotFoundError(AuthenticationError):
+    def __init__(self, message="Session not found"):
+        super().__init__(message)
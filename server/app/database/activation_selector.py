@@ -3,18 +3,47 @@ from app.data_models import Activation
 from app.data_models import ApiResponse
 from app.database.supabase_connection import get_supabase_admin_client
 from app.mapper.mapper import supabase_dict_to_python_activation
-from app.database.settings_selector import load_settings
-from app.utils import get_salesforce_team_ids, format_error_message
+from app.mapper.projection import activation_record_type, parse_projection_columns
+from app.database.settings_selector import load_salesforce_team_ids
+from app.utils import format_error_message
 
 from app.database.supabase_retry import retry_on_temporary_unavailable
 import logging
 from math import ceil
 
+# columns read by generate_summary and the raw_data rows of the dashboard
+ACTIVATION_SUMMARY_COLUMNS = (
+    "id",
+    "activated_by_id",
+    "activated_by",
+    "status",
+    "account",
+    "activated_date",
+    "first_prospecting_activity",
+    "last_prospecting_activity",
+    "active_contact_ids",
+    "task_ids",
+    "event_ids",
+    "opportunity",
+    "prospecting_metadata",
+    "prospecting_effort",
+)
+
+
+def _get_row_mapper(columns: Optional[List[str]]):
+    """
+    Without `columns` rows become full `Activation` models; with `columns` they become
+    lightweight slotted records holding only the projected columns, skipping pydantic.
+    """
+    if not columns:
+        return supabase_dict_to_python_activation
+    return activation_record_type(parse_projection_columns(columns))
+
 
 @retry_on_temporary_unavailable()
 def load_active_activations_order_by_first_prospecting_activity_asc() -> ApiResponse:
     supabase_client = get_supabase_admin_client()
-    team_member_ids = get_salesforce_team_ids(load_settings())
+    team_member_ids = load_salesforce_team_ids()
 
     page_size = 50
     current_page = 0
@@ -49,7 +78,7 @@ def load_active_activations_order_by_first_prospecting_activity_asc() -> ApiResp
 def load_inactive_activations() -> ApiResponse:
     try:
         supabase_client = get_supabase_admin_client()
-        team_member_ids = get_salesforce_team_ids(load_settings())
+        team_member_ids = load_salesforce_team_ids()
 
         response = (
             supabase_client.table("Activations")
@@ -76,9 +105,11 @@ from datetime import datetime, timedelta
 
 
 @retry_on_temporary_unavailable()
-def load_activations_by_period(period: str) -> ApiResponse:
+def load_activations_by_period(
+    period: str, columns: Optional[List[str]] = None
+) -> ApiResponse:
     supabase_client = get_supabase_admin_client()
-    team_member_ids = get_salesforce_team_ids(load_settings())
+    team_member_ids = load_salesforce_team_ids()
 
     now = datetime.utcnow()
 
@@ -117,7 +148,9 @@ def load_activations_by_period(period: str) -> ApiResponse:
     query = (
         supabase_client.table("Activations")
         .select(
-            "id, activated_by_id, status, activated_by, activated_date, account, first_prospecting_activity, prospecting_effort, prospecting_metadata, last_prospecting_activity, active_contact_ids, opportunity, task_ids, event_ids"
+            ", ".join(columns)
+            if columns
+            else "id, activated_by_id, status, activated_by, activated_date, account, first_prospecting_activity, prospecting_effort, prospecting_metadata, last_prospecting_activity, active_contact_ids, opportunity, task_ids, event_ids"
         )
         .in_("activated_by_id", team_member_ids)
         .order("first_prospecting_activity", desc=False)
@@ -130,22 +163,25 @@ def load_activations_by_period(period: str) -> ApiResponse:
 
     response = query.execute()
 
-    activations = [
-        supabase_dict_to_python_activation(row) for row in response.data
-    ] or []
+    row_mapper = _get_row_mapper(columns)
+    activations = [row_mapper(row) for row in response.data] or []
     return ApiResponse(data=activations, success=True)
 
 
 @retry_on_temporary_unavailable()
-def load_active_activations_minimal_by_ids(activation_ids: List[str]) -> ApiResponse:
+def load_active_activations_minimal_by_ids(
+    activation_ids: List[str], columns: Optional[List[str]] = None
+) -> ApiResponse:
     supabase_client = get_supabase_admin_client()
-    team_member_ids = get_salesforce_team_ids(load_settings())
+    team_member_ids = load_salesforce_team_ids()
 
     try:
         response = (
             supabase_client.table("Activations")
             .select(
-                "id, activated_by_id, activated_by, activated_date, account, first_prospecting_activity, prospecting_effort, prospecting_metadata, last_prospecting_activity, active_contact_ids, opportunity, task_ids, event_ids"
+                ", ".join(columns)
+                if columns
+                else "id, activated_by_id, activated_by, activated_date, account, first_prospecting_activity, prospecting_effort, prospecting_metadata, last_prospecting_activity, active_contact_ids, opportunity, task_ids, event_ids"
             )
             .in_("activated_by_id", team_member_ids)
             .in_("id", activation_ids)
@@ -153,9 +189,8 @@ def load_active_activations_minimal_by_ids(activation_ids: List[str]) -> ApiResp
             .execute()
         )
 
-        minimal_activations = [
-            supabase_dict_to_python_activation(row) for row in response.data
-        ] or []
+        row_mapper = _get_row_mapper(columns)
+        minimal_activations = [row_mapper(row) for row in response.data] or []
 
         return ApiResponse(data=minimal_activations, success=True)
     except Exception as e:
@@ -175,7 +210,7 @@ def load_active_activations_paginated_by_ids(
     sort_order: str,
 ) -> ApiResponse:
     supabase_client = get_supabase_admin_client()
-    team_member_ids = get_salesforce_team_ids(load_settings())
+    team_member_ids = load_salesforce_team_ids()
 
     try:
         # Create a set of filter_ids for faster lookup
@@ -265,7 +300,7 @@ def load_active_activations_paginated_with_search(
     sort_order: str,
 ) -> ApiResponse:
     supabase_client = get_supabase_admin_client()
-    team_member_ids = get_salesforce_team_ids(load_settings())
+    team_member_ids = load_salesforce_team_ids()
 
     try:
         # Create a set of filter_ids for faster lookup
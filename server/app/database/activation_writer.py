@@ -0,0 +1,190 @@
+import asyncio
+from typing import Callable, Iterable, List, Optional
+
+import aiohttp
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from app.cache.summary_cache import bump_data_version
+from app.data_models import Activation, ApiResponse
+from app.database.supabase_connection import get_supabase_key, get_supabase_url
+from app.http_sessions import get_client_session
+from app.mapper.mapper import encode_activations_for_upsert
+from app.utils import log_error
+
+CHUNK_SIZE = 50
+MAX_IN_FLIGHT_REQUESTS = 10
+MAX_RETRIES = 3
+
+
+async def upsert_chunk(session: aiohttp.ClientSession, body: bytes):
+    """
+    Upserts one pre-encoded chunk of activations (see `encode_activations_for_upsert`),
+    raising `aiohttp.ClientResponseError` on a non-2xx reply.
+    """
+    url = f"{get_supabase_url()}/rest/v1/Activations"
+    headers = {
+        "apikey": get_supabase_key(),
+        "Authorization": f"Bearer {get_supabase_key()}",
+        "Content-Type": "application/json",
+        "Prefer": "resolution=merge-duplicates",
+    }
+    async with session.post(url, data=body, headers=headers, timeout=30) as response:
+        if response.status != 201 and response.status != 200:
+            raise aiohttp.ClientResponseError(
+                response.request_info,
+                response.history,
+                status=response.status,
+                message=f"Error upserting chunk: {await response.text()}",
+            )
+
+
+class ChunkFailure:
+    def __init__(self, activation_ids: List[str], message: str):
+        self.activation_ids = activation_ids
+        self.message = message
+
+    def to_dict(self):
+        return {"activation_ids": self.activation_ids, "message": self.message}
+
+
+class ActivationWriter:
+    """
+    Streams activations to Supabase while they are still being computed.
+
+    Producers `put` activations into a bounded queue (waiting when it is full), a
+    dispatcher cuts them into chunks of `chunk_size` and keeps up to `max_in_flight`
+    upserts running at all times. Each chunk is retried on its own; chunks that
+    still fail are reported in `result` instead of aborting the other writes.
+
+        async with ActivationWriter() as writer:
+            await writer.put(activation)
+        if not writer.result.success:
+            ...
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = CHUNK_SIZE,
+        max_in_flight: int = MAX_IN_FLIGHT_REQUESTS,
+        max_queued: Optional[int] = None,
+        max_retries: int = MAX_RETRIES,
+        retry_wait: Callable = wait_exponential(multiplier=1, min=4, max=10),
+        on_chunk_written: Optional[Callable[[int], None]] = None,
+    ):
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.retry_wait = retry_wait
+        self.on_chunk_written = on_chunk_written
+        self.written_count = 0
+        self.failures: List[ChunkFailure] = []
+        self.result = ApiResponse(data=[], message="", success=False)
+        self._queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max_queued or chunk_size * max_in_flight * 2
+        )
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._in_flight: set = set()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+    def start(self):
+        if self._dispatcher is None:
+            session = get_client_session(get_supabase_url())
+            self._dispatcher = asyncio.ensure_future(self._dispatch(session))
+
+    async def put(self, activation: Activation):
+        if self._closed:
+            raise RuntimeError("Cannot write to a closed ActivationWriter")
+        self.start()
+        await self._queue.put(activation)
+        # let the dispatcher and in-flight requests progress between CPU-bound producer steps
+        await asyncio.sleep(0)
+
+    async def put_many(self, activations: Iterable[Activation]):
+        for activation in activations:
+            await self.put(activation)
+
+    async def close(self) -> ApiResponse:
+        """
+        Flushes the remaining activations and waits for every in-flight upsert.
+        """
+        if not self._closed:
+            self._closed = True
+            self.start()
+            await self._queue.put(None)
+            await self._dispatcher
+            if self._in_flight:
+                await asyncio.gather(*self._in_flight)
+            self._finalize()
+        return self.result
+
+    async def _dispatch(self, session: aiohttp.ClientSession):
+        chunk: List[Activation] = []
+        while True:
+            activation = await self._queue.get()
+            if activation is not None:
+                chunk.append(activation)
+            # full chunks go out as soon as a request slot frees up, the remainder on close
+            if chunk and (activation is None or len(chunk) >= self.chunk_size):
+                await self._semaphore.acquire()
+                task = asyncio.ensure_future(self._write_chunk(session, chunk))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+                chunk = []
+            if activation is None:
+                return
+
+    async def _write_chunk(self, session: aiohttp.ClientSession, chunk: List[Activation]):
+        try:
+            # encoded once, reused by every retry
+            body = encode_activations_for_upsert(chunk)
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(self.max_retries),
+                wait=self.retry_wait,
+                retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)),
+                reraise=True,
+            ):
+                with attempt:
+                    await upsert_chunk(session, body)
+            self.written_count += len(chunk)
+            if self.on_chunk_written:
+                self.on_chunk_written(self.written_count)
+        except Exception as e:
+            self.failures.append(
+                ChunkFailure([activation.id for activation in chunk], str(e))
+            )
+            log_error(e)
+        finally:
+            try:
+                # even a partial write changes what the dashboard should show
+                bump_data_version(activation.activated_by_id for activation in chunk)
+            except Exception as e:
+                # a failed invalidation must not cost the writer a request slot
+                log_error(e)
+            finally:
+                self._semaphore.release()
+
+    def _finalize(self):
+        if self.failures:
+            self.result.success = False
+            self.result.data = self.failures
+            self.result.message = "\n".join(
+                f"Error upserting {len(failure.activation_ids)} activations: {failure.message}"
+                for failure in self.failures
+            )
+        else:
+            self.result.success = True
+            self.result.message = f"Successfully upserted {self.written_count} activations"
@@ -22,8 +22,16 @@ from app.mapper.mapper import (
     python_settings_to_supabase_dict,
     python_user_to_supabase_dict,
 )
-from app.utils import get_salesforce_team_ids, log_error
-from app.database.settings_selector import load_settings
+from app.utils import log_error
+from app.database.settings_selector import (
+    invalidate_settings,
+    load_salesforce_team_ids,
+)
+from app.cache.summary_cache import bump_data_version
+from app.cache.session_cache import invalidate_session
+from app.event_loop import run_blocking, run_coroutine
+from app.http_sessions import get_client_session
+from app.database.activation_writer import ActivationWriter
 import asyncio
 import aiohttp
 from typing import List
@@ -80,110 +88,29 @@ def upsert_supabase_user(user: UserModel, is_sandbox: bool) -> str:
         raise Exception(f"An error occurred upserting user: {e}")
 
 
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-
-
 async def upsert_activations_async(new_activations: List[Activation]):
-    api_response = ApiResponse(data=[], message="", success=False)
-    CHUNK_SIZE = 50
-    MAX_CONCURRENT_REQUESTS = 10
-    MAX_RETRIES = 3
-
-    @retry(
-        stop=stop_after_attempt(MAX_RETRIES),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)),
-    )
-    async def upsert_chunk(session, chunk):
-        if not chunk:  # Skip empty chunks
-            return None
-
-        ## we need clean JSON in Supabase so that we can filter jsonb fields
-        def parse_json_fields(activation):
-            json_fields = [
-                "account",
-                "active_contacts",
-                "tasks",
-                "prospecting_metadata",
-                "prospecting_effort",
-            ]
-            for field in json_fields:
-                if field in activation and isinstance(activation[field], str):
-                    try:
-                        activation[field] = json.loads(activation[field])
-                    except json.JSONDecodeError:
-                        print(f"Warning: Failed to parse JSON for field {field}")
-            return activation
-
-        supabase_activations = [
-            parse_json_fields(python_activation_to_supabase_dict(activation))
-            for activation in chunk
-        ]
-
-        url = f"{get_supabase_url()}/rest/v1/Activations"
-        headers = {
-            "apikey": get_supabase_key(),
-            "Authorization": f"Bearer {get_supabase_key()}",
-            "Content-Type": "application/json",
-            "Prefer": "resolution=merge-duplicates",
-        }
-        async with session.post(
-            url, json=supabase_activations, headers=headers, timeout=30
-        ) as response:
-            if response.status != 201 and response.status != 200:
-                raise aiohttp.ClientResponseError(
-                    response.request_info,
-                    response.history,
-                    status=response.status,
-                    message=f"Error upserting chunk: {await response.text()}",
-                )
-        return None
-
-    async with aiohttp.ClientSession() as session:
-        chunks = [
-            new_activations[i : i + CHUNK_SIZE]
-            for i in range(0, len(new_activations), CHUNK_SIZE)
-        ]
-
-        for i in range(0, len(chunks), MAX_CONCURRENT_REQUESTS):
-            batch = chunks[i : i + MAX_CONCURRENT_REQUESTS]
-            try:
-                results = await asyncio.gather(
-                    *[upsert_chunk(session, chunk) for chunk in batch]
-                )
-                errors = [r for r in results if r is not None]
-                if errors:
-                    api_response.message = "\n".join(errors)
-                    log_error(Exception(api_response.message))
-                    return api_response
-            except Exception as e:
-                api_response.message = f"Error processing batch: {str(e)}"
-                log_error(e)
-                return api_response
-
-    api_response.success = True
-    api_response.message = f"Successfully upserted {len(new_activations)} activations"
-    return api_response
+    """
+    Upserts `new_activations` in chunks with a bounded number of requests in flight.
+    Producers that compute activations incrementally should use `ActivationWriter` directly.
+    """
+    async with ActivationWriter() as writer:
+        await writer.put_many(new_activations)
+    return writer.result
 
 
 async def delete_all_activations_async():
     try:
-        team_member_ids = get_salesforce_team_ids(load_settings())
+        team_member_ids = await run_blocking(load_salesforce_team_ids)
         supabase = get_supabase_admin_client()
         BATCH_SIZE = 100
         MAX_CONCURRENT_REQUESTS = 10
 
         # Fetch all matching activation IDs
-        all_activations = (
+        all_activations = await run_blocking(
             supabase.table("Activations")
             .select("id")
             .in_("activated_by_id", team_member_ids)
-            .execute()
+            .execute
         )
 
         all_activation_ids = [activation["id"] for activation in all_activations.data]
@@ -206,7 +133,8 @@ async def delete_all_activations_async():
             print(f"Deleted batch of {len(batch)} activations")  # New print statement
             return None
 
-        async with aiohttp.ClientSession() as session:
+        try:
+            session = get_client_session(get_supabase_url())
             batches = [
                 all_activation_ids[i : i + BATCH_SIZE]
                 for i in range(0, len(all_activation_ids), BATCH_SIZE)
@@ -220,6 +148,8 @@ async def delete_all_activations_async():
                 errors = [r for r in results if r is not None]
                 if errors:
                     raise Exception("\n".join(errors))
+        finally:
+            bump_data_version(team_member_ids)
 
         return True
 
@@ -230,7 +160,7 @@ async def delete_all_activations_async():
 
 # Don't forget to update the original function to run the async version
 def delete_all_activations():
-    return asyncio.run(delete_all_activations_async())
+    return run_coroutine(delete_all_activations_async())
 
 
 def save_settings(settings: Settings):
@@ -246,6 +176,8 @@ def save_settings(settings: Settings):
     supabase.table("Settings").upsert(
         settings_dict, on_conflict=["salesforce_user_id"]
     ).execute()
+    # the next load_settings in this request/job reads back what was just written
+    invalidate_settings()
 
     return True
 
@@ -253,6 +185,7 @@ def save_settings(settings: Settings):
 def delete_session(session_token: str):
     supabase = get_supabase_admin_client()
     supabase.table("Session").delete().eq("id", session_token).execute()
+    invalidate_session(session_token)
     return True
 
 
@@ -286,4 +219,6 @@ def save_session(token_data: TokenData, is_sandbox: bool, extra_state: dict = {}
     }
     supabase = get_supabase_admin_client()
     supabase.table("Session").insert(session_data).execute()
+    # drops a negative entry in case the token was probed before it existed
+    invalidate_session(session_token)
     return session_token
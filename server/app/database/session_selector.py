@@ -1,5 +1,5 @@
 from app.database.supabase_connection import get_supabase_admin_client
-from app.data_models import AuthenticationError, ApiResponse
+from app.data_models import AuthenticationError, ApiResponse, SessionNotFoundError
 import json
 from app.database.supabase_retry import retry_on_temporary_unavailable
 
@@ -16,7 +16,7 @@ def fetch_supabase_session(session_id: str):
 
         # Check if a session was found
         if not response.data or len(response.data) == 0:
-            raise AuthenticationError("Session not found")
+            raise SessionNotFoundError()
 
         # Return the first (and should be only) session found
         return response.data[0]
@@ -1,14 +1,76 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, has_app_context
 from app.database.supabase_connection import (
     get_supabase_admin_client,
     get_session_state,
 )
 from app.data_models import Settings
 from app.mapper.mapper import supabase_dict_to_python_settings
-from typing import Optional
+from app.utils import get_salesforce_team_ids
+from typing import Dict, List, Optional
 from app.database.supabase_retry import retry_on_temporary_unavailable
 
-@retry_on_temporary_unavailable()
+# settings memoized for the current scope, keyed by the session's salesforce id.
+# Flask requests and jobs keep it on `g`; `settings_scope` covers code running outside an app context.
+_settings_scope: ContextVar[Optional[Dict]] = ContextVar("settings_scope", default=None)
+
+
+def _get_settings_store() -> Optional[Dict]:
+    store = _settings_scope.get()
+    if store is not None:
+        return store
+    if has_app_context():
+        if "settings_store" not in g:
+            g.settings_store = {}
+        return g.settings_store
+    # no scope to tie the memo to, e.g. a bare script; always query
+    return None
+
+
+@contextmanager
+def settings_scope():
+    """
+    Memoizes settings for the duration of the block when running outside a Flask
+    app context, e.g. in a worker or script.
+    """
+    token = _settings_scope.set({})
+    try:
+        yield
+    finally:
+        _settings_scope.reset(token)
+
+
 def load_settings() -> Optional[Settings]:
+    """
+    Returns the logged in user's settings, querying Supabase at most once per
+    request/job. Call `invalidate_settings` after writing settings.
+    """
+    store = _get_settings_store()
+    if store is None:
+        return fetch_settings()
+
+    salesforce_id = get_session_state()["salesforce_id"]
+    if salesforce_id not in store:
+        store[salesforce_id] = fetch_settings()
+    return store[salesforce_id]
+
+
+def load_salesforce_team_ids() -> List[str]:
+    """
+    Returns the salesforce ids of the user and their team members, from the memoized settings.
+    """
+    return get_salesforce_team_ids(load_settings())
+
+
+def invalidate_settings() -> None:
+    store = _get_settings_store()
+    if store is not None:
+        store.clear()
+
+
+@retry_on_temporary_unavailable()
+def fetch_settings() -> Optional[Settings]:
     try:
         supabase = get_supabase_admin_client()
         salesforce_id = get_session_state()["salesforce_id"]
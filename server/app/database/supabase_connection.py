@@ -1,8 +1,11 @@
 import os
+import time
 from supabase import create_client, Client
 from flask import g
 from dotenv import load_dotenv
 from app.data_models import AuthenticationError
+from app.instrumentation import SUPABASE, record_call
+from app.metrics import observe_remote_call
 
 load_dotenv()
 
@@ -25,8 +28,36 @@ def get_session_state():
 
 
 def get_supabase_admin_client() -> Client:
+    _count_calls(supabase.postgrest.session)
     return supabase
 
+
+def _count_calls(session):
+    # the client may rebuild its PostgREST session, so the hooks are checked on every use
+    if _record_supabase_response not in session.event_hooks["response"]:
+        session.event_hooks["request"].append(_start_supabase_request)
+        session.event_hooks["response"].append(_record_supabase_response)
+
+
+def _start_supabase_request(request):
+    request.extensions["started_at"] = time.perf_counter()
+
+
+def _record_supabase_response(response):
+    # PostgREST responses are read in full anyway; reading here makes their size known
+    response.read()
+    started_at = response.request.extensions.get("started_at")
+    record_call(
+        SUPABASE,
+        bytes_sent=len(response.request.content),
+        bytes_received=len(response.content),
+    )
+    observe_remote_call(
+        SUPABASE,
+        time.perf_counter() - started_at if started_at is not None else None,
+        error=response.status_code >= 400,
+    )
+
 def get_supabase_url() -> str:
     return url
 
@@ -15,8 +15,17 @@ from app.database.activation_selector import (
     load_active_activations_order_by_first_prospecting_activity_asc,
 )
 from app.database.settings_selector import load_settings
-from app.database.dml import save_settings, upsert_activations_async  # Note the new import
+from app.database.dml import save_settings
+from app.database.activation_writer import ActivationWriter
 from app.data_models import ApiResponse, FilterContainer, Settings
+from app.jobs.job_queue import get_current_job_id, report_job_progress
+from app.event_loop import run_blocking, run_coroutine
+from app.instrumentation import (
+    record_rows,
+    set_run_attributes,
+    stage,
+    trace_run,
+)
 from app.utils import (
     add_days,
     get_team_member_salesforce_ids,
@@ -24,14 +33,35 @@ from app.utils import (
 import asyncio
 
 
+def run_activation_refresh(user_timezone) -> ApiResponse:
+    """
+    Synchronous entry point for running `update_activation_states` as a background job.
+    """
+    return run_coroutine(update_activation_states(user_timezone))
+
+
 async def update_activation_states(user_timezone):
-    api_response = ApiResponse(data=[], message="", success=False)
+    with trace_run("activation_refresh"):
+        return await _update_activation_states(user_timezone)
+
 
-    settings = load_settings()
-    salesforce_user_ids = get_team_member_salesforce_ids(settings)
+async def _update_activation_states(user_timezone):
+    api_response = ApiResponse(data=[], message="", success=False)
 
-    active_activations = (
-        load_active_activations_order_by_first_prospecting_activity_asc().data
+    with stage("load activations"):
+        # Supabase client calls block, so they run off the loop other teams' refreshes share
+        settings = await run_blocking(load_settings)
+        salesforce_user_ids = get_team_member_salesforce_ids(settings)
+
+        active_activations = (
+            await run_blocking(
+                load_active_activations_order_by_first_prospecting_activity_asc
+            )
+        ).data
+        record_rows(rows_out=len(active_activations))
+    # lets the diagnostics endpoint show a team its own runs, by job if it has one
+    set_run_attributes(
+        job_id=get_current_job_id(), salesforce_user_ids=salesforce_user_ids
     )
 
     task_ids_to_exclude = []
@@ -40,65 +70,88 @@ async def update_activation_states(user_timezone):
 
     unresponsive_activations = None
     if len(active_activations) > 0:
-        async_response = await find_unresponsive_activations(
-            active_activations, settings
-        )
+        with stage("unresponsive check"):
+            async_response = await find_unresponsive_activations(
+                active_activations, settings
+            )
+            record_rows(
+                rows_in=len(active_activations), rows_out=len(async_response.data)
+            )
         unresponsive_activations = async_response.data
 
-    if unresponsive_activations and len(unresponsive_activations) > 0:
-        await upsert_activations_async(unresponsive_activations)
-
-    active_activations = [
-        a
-        for a in active_activations
-        if a.id not in [u.id for u in unresponsive_activations]
-    ]
-
-    relevant_task_criteria: List[FilterContainer] = settings.criteria
-    if settings.meeting_object == "Task":
-        relevant_task_criteria = settings.criteria + [settings.meetings_criteria]
-
-    if len(active_activations) > 0:
-        print("incrementing existing activations")
-        async_response = await increment_existing_activations(
-            active_activations, settings, relevant_task_criteria
+    # every stage streams its activations into one writer, so upserts overlap the remaining work
+    writer = ActivationWriter(
+        on_chunk_written=lambda count: report_job_progress(
+            "activations_upserted", count
         )
-        incremented_activations = async_response.data
-        print(f"upserting {len(incremented_activations)} incremented activations")
-        await upsert_activations_async(incremented_activations)
-
-    async_response = await fetch_prospecting_tasks_by_account_ids_from_date_not_in_ids(
-        f"{get_threshold_date_for_activatable_tasks(settings)}T00:00:00Z",
-        relevant_task_criteria,
-        task_ids_to_exclude,
-        salesforce_user_ids,
     )
-
-    print("Tasks fetched and organized successfully")
-
-    prospecting_tasks_by_criteria_name_by_account_id = async_response.data
-
-    print("Computing activated accounts")
-    async_response = await compute_activated_accounts(
-        prospecting_tasks_by_criteria_name_by_account_id, settings
-    )
-    new_activations = async_response.data
-
-    print(f" {len(new_activations)} new activations computed")
-
-    if len(new_activations) > 0:
-        print(f"Upserting {len(new_activations)} new activations")
-        upsert_response = await upsert_activations_async(new_activations)
-        if not upsert_response.success:
-            print(f"Error upserting new activations: {upsert_response.message}")
-            api_response.success = False
-            api_response.message = f"Error upserting new activations: {upsert_response.message}"
-            return api_response
-        print("New activations upserted successfully")
+    async with writer:
+        if unresponsive_activations and len(unresponsive_activations) > 0:
+            await writer.put_many(unresponsive_activations)
+
+        active_activations = [
+            a
+            for a in active_activations
+            if a.id not in [u.id for u in unresponsive_activations]
+        ]
+
+        relevant_task_criteria: List[FilterContainer] = settings.criteria
+        if settings.meeting_object == "Task":
+            relevant_task_criteria = settings.criteria + [settings.meetings_criteria]
+
+        if len(active_activations) > 0:
+            print("incrementing existing activations")
+            with stage("increment"):
+                async_response = await increment_existing_activations(
+                    active_activations, settings, relevant_task_criteria, writer=writer
+                )
+                record_rows(
+                    rows_in=len(active_activations), rows_out=len(async_response.data)
+                )
+            print(f"{len(async_response.data)} incremented activations queued for upsert")
+
+        with stage("fetch tasks"):
+            async_response = await fetch_prospecting_tasks_by_account_ids_from_date_not_in_ids(
+                f"{get_threshold_date_for_activatable_tasks(settings)}T00:00:00Z",
+                relevant_task_criteria,
+                task_ids_to_exclude,
+                salesforce_user_ids,
+            )
+
+        print("Tasks fetched and organized successfully")
+
+        prospecting_tasks_by_criteria_name_by_account_id = async_response.data
+
+        print("Computing activated accounts")
+        with stage("compute"):
+            async_response = await compute_activated_accounts(
+                prospecting_tasks_by_criteria_name_by_account_id, settings, writer=writer
+            )
+            record_rows(
+                rows_in=len(prospecting_tasks_by_criteria_name_by_account_id),
+                rows_out=len(async_response.data),
+            )
+        new_activations = async_response.data
+
+        print(f" {len(new_activations)} new activations computed")
+        report_job_progress("activations_computed", len(new_activations))
+
+        # chunks are upserted all along; this waits for the ones still queued or in flight
+        with stage("upsert"):
+            await writer.close()
+            record_rows(rows_out=writer.written_count)
+
+    if not writer.result.success:
+        print(f"Error upserting activations: {writer.result.message}")
+        api_response.success = False
+        api_response.message = f"Error upserting activations: {writer.result.message}"
+        return api_response
+    print(f"{writer.written_count} activations upserted successfully")
 
     user_tz = pytz.timezone(user_timezone)
     settings.latest_date_queried = datetime.now(user_tz).strftime("%Y-%m-%d %H:%M:%S%z")
-    save_settings(settings)
+    with stage("save settings"):
+        await run_blocking(save_settings, settings)
 
     api_response.success = True
 
@@ -0,0 +1,299 @@
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Coroutine, Optional
+
+from config import Config
+from app.instrumentation import (
+    SlowCallbackFilter,
+    call_with_cpu_charged,
+    record_loop_lag,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundEventLoop:
+    """
+    A long-lived asyncio loop running in a daemon thread.
+
+    Sync code (Flask views, job workers) submits coroutines with `run` instead of
+    `asyncio.run`, so the loop, and anything bound to it such as aiohttp sessions
+    and their connection pools, survives across requests.
+    """
+
+    def __init__(self, name: str = "app-event-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._monitor: Optional[LoopBlockingMonitor] = None
+        self._lag_monitor: Optional[LoopLagMonitor] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # a forked worker inherits the object but not the thread, so start a new loop
+            if self._loop is None or self._pid != os.getpid() or self._loop.is_closed():
+                self._start()
+            return self._loop
+
+    def _start(self):
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run_forever():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run_forever, name=self.name, daemon=True)
+        self._thread.start()
+        ready.wait()
+        self._loop = loop
+        self._pid = os.getpid()
+
+        if Config.EVENT_LOOP_LAG_INTERVAL_SECONDS > 0:
+            self._lag_monitor = LoopLagMonitor(
+                loop, Config.EVENT_LOOP_LAG_INTERVAL_SECONDS
+            )
+            self._lag_monitor.start()
+
+        if Config.EVENT_LOOP_DEBUG:
+            # asyncio also logs each callback that runs longer than the threshold
+            install_slow_callback_filter()
+            loop.set_debug(True)
+            loop.slow_callback_duration = Config.EVENT_LOOP_BLOCKING_THRESHOLD_SECONDS
+            self._monitor = LoopBlockingMonitor(
+                loop, self._thread, Config.EVENT_LOOP_BLOCKING_THRESHOLD_SECONDS
+            )
+            self._monitor.start()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        Schedules `coro` on the loop and returns a concurrent future for its result.
+        The coroutine runs with a copy of the caller's context, so flask.g, the session
+        state and job progress reporting behave as they would under `asyncio.run`.
+        """
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Cannot block on the background loop from its own thread")
+
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        context = contextvars.copy_context()
+
+        def schedule():
+            if future.cancelled():
+                coro.close()
+                return
+            # tasks copy the current context on creation, so create it inside `context`
+            task = context.run(loop.create_task, coro)
+
+            def copy_result(task: asyncio.Task):
+                try:
+                    if task.cancelled():
+                        future.cancel()
+                    elif task.exception() is not None:
+                        future.set_exception(task.exception())
+                    else:
+                        future.set_result(task.result())
+                except concurrent.futures.InvalidStateError:
+                    # the caller cancelled the future while the task was finishing
+                    pass
+
+            task.add_done_callback(copy_result)
+            future.add_done_callback(
+                lambda f: f.cancelled() and loop.call_soon_threadsafe(task.cancel)
+            )
+
+        loop.call_soon_threadsafe(schedule)
+        return future
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Runs `coro` on the loop and blocks until it finishes. On timeout the
+        coroutine is cancelled and `concurrent.futures.TimeoutError` is raised.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def shutdown(self, timeout: float = 5):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            monitors = [self._monitor, self._lag_monitor]
+            self._loop = self._thread = self._monitor = self._lag_monitor = None
+        for monitor in monitors:
+            if monitor is not None:
+                monitor.stop()
+        if loop is None or loop.is_closed() or self._pid != os.getpid():
+            return
+
+        async def cancel_pending():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_pending(), loop).result(timeout)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+
+
+class LoopBlockingMonitor:
+    """
+    Debug aid that reports code blocking an event loop.
+
+    The loop bumps a heartbeat every `threshold / 2` seconds and a watchdog thread
+    checks it. When the heartbeat is older than `threshold`, something has held the
+    loop thread that long without yielding, e.g. a sync Salesforce or Supabase call
+    made from a coroutine; the watchdog logs a warning with that thread's stack, once
+    per stall.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        loop_thread: threading.Thread,
+        threshold: float,
+    ):
+        self.loop = loop
+        self.loop_thread = loop_thread
+        self.threshold = threshold
+        self.interval = threshold / 2
+        self._last_beat = time.monotonic()
+        self._reported_beat: Optional[float] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self.loop.call_soon_threadsafe(self._beat)
+        threading.Thread(
+            target=self._watch, name="event-loop-watchdog", daemon=True
+        ).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+        if not self._stopped.is_set():
+            self.loop.call_later(self.interval, self._beat)
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            last_beat = self._last_beat
+            blocked_for = time.monotonic() - last_beat
+            if blocked_for > self.threshold and self._reported_beat != last_beat:
+                self._reported_beat = last_beat
+                self.report(blocked_for)
+
+    def report(self, blocked_for: float):
+        frame = sys._current_frames().get(self.loop_thread.ident)
+        stack = "".join(traceback.format_stack(frame)) if frame else ""
+        logger.warning(
+            f"Event loop blocked for {blocked_for:.2f}s (threshold {self.threshold}s):\n{stack}"
+        )
+
+
+class LoopLagMonitor:
+    """
+    Samples how late the loop runs a callback scheduled every `interval` seconds.
+    The lag is how long other callbacks held the loop past that point, so it rises
+    with CPU-bound coroutines and blocking calls. Cheap enough to leave on: one
+    callback per interval on the loop and no extra thread.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float):
+        self.loop = loop
+        self.interval = interval
+        self._expected_at: Optional[float] = None
+        self._stopped = False
+
+    def start(self):
+        self.loop.call_soon_threadsafe(self._schedule)
+
+    def stop(self):
+        self._stopped = True
+
+    def _schedule(self):
+        if self._stopped:
+            return
+        self._expected_at = self.loop.time() + self.interval
+        self.loop.call_at(self._expected_at, self._sample)
+
+    def _sample(self):
+        record_loop_lag(max(0.0, self.loop.time() - self._expected_at))
+        self._schedule()
+
+
+def install_slow_callback_filter():
+    asyncio_logger = logging.getLogger("asyncio")
+    if not any(isinstance(f, SlowCallbackFilter) for f in asyncio_logger.filters):
+        asyncio_logger.addFilter(SlowCallbackFilter())
+
+
+_blocking_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_blocking_executor_pid: Optional[int] = None
+_blocking_executor_lock = threading.Lock()
+
+
+def get_blocking_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _blocking_executor, _blocking_executor_pid
+    with _blocking_executor_lock:
+        # like the loop, a forked worker needs its own threads
+        if _blocking_executor is None or _blocking_executor_pid != os.getpid():
+            _blocking_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=Config.BLOCKING_IO_MAX_WORKERS,
+                thread_name_prefix="blocking-io",
+            )
+            _blocking_executor_pid = os.getpid()
+        return _blocking_executor
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Runs a blocking call, e.g. a `requests` based Salesforce fetch or a Supabase
+    client query, on the bounded blocking-IO pool so the loop keeps serving other
+    coroutines. The call sees the caller's context (flask.g, session state), as
+    with `asyncio.to_thread`, which would share the loop's default pool instead,
+    and its CPU time is added to the current engine stage (see `app.instrumentation`).
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_blocking_executor(),
+        functools.partial(context.run, call_with_cpu_charged, func, *args, **kwargs),
+    )
+
+
+_background_loop = BackgroundEventLoop()
+atexit.register(_background_loop.shutdown)
+
+
+def get_background_loop() -> BackgroundEventLoop:
+    return _background_loop
+
+
+def run_coroutine(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    """
+    Drop-in replacement for `asyncio.run` from sync code that reuses the app's loop.
+    """
+    return _background_loop.run(coro, timeout)
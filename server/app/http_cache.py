@@ -0,0 +1,166 @@
+import hashlib
+import json
+import uuid
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from flask import Response, request
+from werkzeug.http import generate_etag
+
+from config import Config
+from app.cache.backends import LocalCacheBackend
+from app.cache.summary_cache import get_data_version, get_summary_cache_backends
+from app.database.settings_selector import load_salesforce_team_ids
+from app.database.supabase_connection import get_session_state
+from app.streaming import NDJSON_MIMETYPE, wants_ndjson
+
+try:
+    import brotli  # optional: preferred over gzip by clients that accept it
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", NDJSON_MIMETYPE}
+
+# local data versions restart from 0 with the process, so tags carry the boot too
+_BOOT_ID = uuid.uuid4().hex
+
+
+def build_etag(*parts) -> str:
+    return hashlib.sha1(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def activation_data_etag() -> str:
+    """
+    ETag for a response computed from the team's activations. It changes whenever
+    any team member's activation data version moves, so it can be checked before
+    anything is loaded or serialized. Versions kept per process are only trusted
+    within the process that handed the tag out.
+    """
+    team_member_ids = sorted(set(load_salesforce_team_ids()))
+    _, version_backend = get_summary_cache_backends()
+    boot_id = _BOOT_ID if isinstance(version_backend, LocalCacheBackend) else None
+    return build_etag(
+        request.path,
+        request.get_json(silent=True),
+        wants_ndjson(),
+        get_session_state().get("salesforce_id"),
+        team_member_ids,
+        get_data_version(team_member_ids),
+        boot_id,
+        # summaries count activity relative to today
+        datetime.now().date().isoformat(),
+    )
+
+
+def _matching_tag(etag: str) -> Optional[str]:
+    """
+    Returns the If-None-Match entry matching `etag`, including the variants
+    `compress_response` hands out for encoded bodies.
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    for candidate in (etag, f"{etag}-gzip", f"{etag}-br"):
+        if if_none_match.contains(candidate):
+            return candidate
+    return etag if if_none_match.star_tag else None
+
+
+def is_not_modified(etag: str) -> bool:
+    return _matching_tag(etag) is not None
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status=304)
+    return set_etag(response, _matching_tag(etag) or etag)
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    """
+    Adds a strong ETag and asks clients to revalidate on every use. Responses are
+    per user, so shared caches must not store them.
+    """
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add("X-Session-Token")
+    return response
+
+
+def make_conditional(response: Response, etag: Optional[str] = None) -> Response:
+    """
+    Tags a buffered response, by default with a hash of its body, and replaces it
+    with a 304 when the client already holds that version.
+    """
+    etag = etag or generate_etag(response.get_data())
+    if is_not_modified(etag):
+        return not_modified(etag)
+    return set_etag(response, etag)
+
+
+def _negotiate_encoding() -> Optional[str]:
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def _compressor(encoding: str):
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=Config.COMPRESSION_LEVEL)
+        return compressor.process, compressor.flush, compressor.finish
+    # wbits=31 writes the gzip container rather than a raw zlib stream
+    compressor = zlib.compressobj(Config.COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+    return (
+        compressor.compress,
+        lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+        compressor.flush,
+    )
+
+
+def _compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    compress, flush, finish = _compressor(encoding)
+    for chunk in chunks:
+        # flush per chunk so rows keep reaching the client as they are produced
+        data = compress(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+def compress_response(response: Response) -> Response:
+    """
+    `after_request` hook encoding JSON bodies with the best encoding the client
+    accepts. Streamed bodies are encoded chunk by chunk; tagged responses get an
+    encoding-specific ETag so the tag stays strong.
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+    if (
+        response.status_code != 200
+        or "Content-Encoding" in response.headers
+        or request.method == "HEAD"
+    ):
+        return response
+
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.iter_encoded(), encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < Config.COMPRESSION_MIN_BYTES:
+            return response
+        compress, _, finish = _compressor(encoding)
+        response.set_data(compress(data) + finish())
+
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
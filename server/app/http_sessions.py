@@ -0,0 +1,159 @@
+import asyncio
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import aiohttp
+from yarl import URL
+
+from config import Config
+from app.instrumentation import SALESFORCE, SUPABASE, record_call
+from app.metrics import observe_remote_call
+
+SessionFactory = Callable[[str], aiohttp.ClientSession]
+
+
+def create_client_session(base_url: str) -> aiohttp.ClientSession:
+    """
+    Default factory: one pooled session per remote, with DNS results cached so
+    repeated Salesforce/Supabase calls skip resolution as well as the TLS handshake.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=Config.HTTP_POOL_LIMIT,
+        limit_per_host=Config.HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=Config.HTTP_DNS_CACHE_TTL_SECONDS,
+        keepalive_timeout=Config.HTTP_KEEPALIVE_TIMEOUT_SECONDS,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        trace_configs=[create_call_trace_config(service_for_base_url(base_url))],
+    )
+
+
+def service_for_base_url(base_url: str) -> str:
+    from app.database.supabase_connection import get_supabase_url
+
+    supabase_url = get_supabase_url()
+    if supabase_url and str(URL(supabase_url).origin()) == base_url:
+        return SUPABASE
+    return SALESFORCE
+
+
+def create_call_trace_config(service: str) -> aiohttp.TraceConfig:
+    """
+    Counts a session's calls and bytes toward the engine stage making them, and
+    their latency and outcome in the metrics.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.started_at = asyncio.get_running_loop().time()
+
+    async def on_request_chunk_sent(session, context, params):
+        record_call(service, calls=0, bytes_sent=len(params.chunk))
+
+    async def on_response_chunk_received(session, context, params):
+        record_call(service, calls=0, bytes_received=len(params.chunk))
+
+    async def on_request_end(session, context, params):
+        record_call(service)
+        observe_remote_call(
+            service,
+            asyncio.get_running_loop().time() - context.started_at,
+            error=params.response.status >= 400,
+        )
+
+    async def on_request_exception(session, context, params):
+        observe_remote_call(
+            service, asyncio.get_running_loop().time() - context.started_at, error=True
+        )
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+    trace_config.on_response_chunk_received.append(on_response_chunk_received)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
+
+
+class ClientSessionRegistry:
+    """
+    Long-lived aiohttp sessions keyed by base URL (scheme + host + port).
+
+    aiohttp sessions are bound to the loop they were created on, so sessions are
+    also keyed by loop; in the app that is the single background loop, so every
+    stage of a refresh shares the same connection pool.
+    """
+
+    def __init__(self, session_factory: SessionFactory = create_client_session):
+        self.session_factory = session_factory
+        self._sessions: Dict[Tuple[int, str], Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> aiohttp.ClientSession:
+        """
+        Returns the shared session for the origin of `url`. Must be called from a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        base_url = str(URL(url).origin())
+        key = (id(loop), base_url)
+
+        with self._lock:
+            self._prune_closed_loops()
+            entry = self._sessions.get(key)
+            if entry is None or entry[1].closed:
+                entry = (loop, self.session_factory(base_url))
+                self._sessions[key] = entry
+            return entry[1]
+
+    async def close(self):
+        """
+        Closes the sessions created on the running loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [key for key, (owner, _) in self._sessions.items() if owner is loop]
+            sessions = [self._sessions.pop(key)[1] for key in keys]
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+    def _prune_closed_loops(self):
+        # e.g. sessions left behind by a loop from `asyncio.run`; their sockets died with it
+        for key in [k for k, (loop, _) in self._sessions.items() if loop.is_closed()]:
+            del self._sessions[key]
+
+
+_registry: Optional[ClientSessionRegistry] = None
+
+
+def get_client_session_registry() -> ClientSessionRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ClientSessionRegistry()
+    return _registry
+
+
+def set_client_session_registry(registry: ClientSessionRegistry):
+    """
+    Swaps the registry, e.g. for one whose factory builds sessions mocked with aioresponses.
+    """
+    global _registry
+    _registry = registry
+
+
+def get_client_session(url: str) -> aiohttp.ClientSession:
+    return get_client_session_registry().get(url)
+
+
+def shutdown_client_sessions():
+    """
+    Closes the shared sessions on the background loop. Registered by `create_app`.
+    """
+    from app.event_loop import get_background_loop
+
+    if _registry is None:
+        return
+    try:
+        get_background_loop().run(get_client_session_registry().close(), timeout=5)
+    except Exception:
+        pass
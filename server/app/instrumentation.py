@@ -0,0 +1,497 @@
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import sentry_sdk
+
+from config import Config
+from app.cache.backends import (
+    CacheBackend,
+    InMemorySharedClient,
+    LocalCacheBackend,
+    SharedCacheBackend,
+)
+from app.metrics import (
+    ENGINE_RUN_DURATION,
+    ENGINE_STAGE_DURATION,
+    EVENT_LOOP_LAG,
+    EVENT_LOOP_SLOW_CALLBACKS,
+    EVENT_LOOP_STALLS,
+    observe_remote_call,
+)
+
+# remote services whose calls are counted per stage
+SALESFORCE = "salesforce"
+SUPABASE = "supabase"
+
+RUN_REPORT_KEY_PREFIX = "engine_run:"
+RUNS_BY_USER_KEY_PREFIX = "engine_runs_by_user:"
+RUNS_BY_JOB_KEY_PREFIX = "engine_runs_by_job:"
+
+logger = logging.getLogger(__name__)
+
+
+class StageTiming:
+    """
+    Wall and CPU time of one stage of a traced run, with its row and call counts and
+    the Salesforce query plans it ran.
+
+    `cpu_ms` is the CPU time of the event loop thread while the stage ran, so it also
+    counts coroutines interleaved with the stage on the same loop. `offloaded_cpu_ms`
+    is the CPU time of the calls the stage (or a stage nested in it) handed to
+    `run_blocking`. Calls and bytes also count toward the enclosing stages, rows only
+    toward the stage that recorded them.
+    """
+
+    def __init__(self, name: str, parent: Optional["StageTiming"] = None):
+        self.name = name
+        self.parent = parent
+        self.wall_ms: Optional[float] = None
+        self.cpu_ms: Optional[float] = None
+        self.offloaded_cpu_ms = 0.0
+        self.rows_in: Optional[int] = None
+        self.rows_out: Optional[int] = None
+        self.calls = {service: _CallCounts() for service in (SALESFORCE, SUPABASE)}
+        self.query_plans: List[Dict] = []
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self._cpu_started_at = time.thread_time()
+
+    def finish(self):
+        self.wall_ms = (time.perf_counter() - self._started_at) * 1000
+        self.cpu_ms = (time.thread_time() - self._cpu_started_at) * 1000
+
+    def add_offloaded_cpu(self, seconds: float):
+        stage = self
+        while stage is not None:
+            with stage._lock:
+                stage.offloaded_cpu_ms += seconds * 1000
+            stage = stage.parent
+
+    def add_call(self, service: str, calls: int, bytes_sent: int, bytes_received: int):
+        stage = self
+        while stage is not None:
+            with stage._lock:
+                stage.calls[service].add(calls, bytes_sent, bytes_received)
+            stage = stage.parent
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "parent": self.parent.name if self.parent else None,
+            "wall_ms": _round(self.wall_ms),
+            "cpu_ms": _round(self.cpu_ms),
+            "offloaded_cpu_ms": _round(self.offloaded_cpu_ms),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            **{service: counts.to_dict() for service, counts in self.calls.items()},
+            "query_plans": list(self.query_plans),
+        }
+
+
+class _CallCounts:
+    def __init__(self):
+        self.calls = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def add(self, calls: int, bytes_sent: int, bytes_received: int):
+        self.calls += calls
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+
+
+class RunTrace:
+    """
+    Stage report of one sampled run, e.g. an activation refresh, plus the event loop
+    lag observed while it ran. The run itself is the root stage, so its calls and
+    bytes are the run's totals. `attributes` identify the run, e.g. its job and team.
+    """
+
+    def __init__(self, name: str):
+        self.run_id = uuid.uuid4().hex
+        self.name = name
+        self.attributes: Dict[str, Any] = {}
+        self.started_at = datetime.now(timezone.utc)
+        self.root = StageTiming(name)
+        self.stages: List[StageTiming] = []
+        self._started_at_monotonic = time.monotonic()
+        self.loop_lag_max_ms: Optional[float] = None
+        self.loop_stalls = 0
+
+    def finish(self):
+        self.root.finish()
+        lags = loop_lag_samples_since(self._started_at_monotonic)
+        self.loop_lag_max_ms = max(lags) if lags else None
+        self.loop_stalls = _count_stalls(lags)
+
+    def to_dict(self) -> Dict:
+        return {
+            "run_id": self.run_id,
+            "name": self.name,
+            "attributes": self.attributes,
+            "started_at": self.started_at.isoformat(),
+            "wall_ms": _round(self.root.wall_ms),
+            "cpu_ms": _round(self.root.cpu_ms),
+            "offloaded_cpu_ms": _round(self.root.offloaded_cpu_ms),
+            **{
+                service: counts.to_dict()
+                for service, counts in self.root.calls.items()
+            },
+            "loop_lag_max_ms": _round(self.loop_lag_max_ms),
+            "loop_stalls": self.loop_stalls,
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+
+_current_run: ContextVar[Optional[RunTrace]] = ContextVar("current_run", default=None)
+_current_stage: ContextVar[Optional[StageTiming]] = ContextVar(
+    "current_stage", default=None
+)
+_recent_runs: Deque[RunTrace] = deque(maxlen=Config.ENGINE_TRACE_HISTORY)
+_report_backend: Optional[CacheBackend] = None
+
+
+@contextmanager
+def trace_run(name: str) -> Iterator[Optional[RunTrace]]:
+    """
+    Traces the stages run inside the block for a sample of runs
+    (ENGINE_TRACE_SAMPLE_RATE). When the run is sampled, it is logged as one
+    structured record and kept for `get_recent_runs`; with ENGINE_TRACE_SENTRY_SPANS
+    its stages are also sent to Sentry as a span tree. Yields None for runs left out,
+    whose duration still goes to the run duration metric.
+    """
+    if random.random() >= Config.ENGINE_TRACE_SAMPLE_RATE:
+        started_at = time.perf_counter()
+        try:
+            yield None
+        finally:
+            ENGINE_RUN_DURATION.observe(time.perf_counter() - started_at, run=name)
+        return
+
+    run = RunTrace(name)
+    run_token = _current_run.set(run)
+    stage_token = _current_stage.set(run.root)
+    try:
+        with _sentry_span("engine.run", name, root=True):
+            yield run
+    finally:
+        _current_stage.reset(stage_token)
+        _current_run.reset(run_token)
+        run.finish()
+        _recent_runs.append(run)
+        _store_run_report(run.to_dict())
+        ENGINE_RUN_DURATION.observe(run.root.wall_ms / 1000, run=name)
+        for timing in run.stages:
+            ENGINE_STAGE_DURATION.observe(
+                timing.wall_ms / 1000, run=name, stage=timing.name
+            )
+        logger.info("Engine run: %s", json.dumps(run.to_dict()))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[Optional[StageTiming]]:
+    """
+    Times the block as a stage of the current run, nested under the enclosing stage.
+    A no-op outside a sampled run, so stages can stay in place on every code path.
+    """
+    run = _current_run.get()
+    if run is None:
+        yield None
+        return
+
+    timing = StageTiming(name, parent=_current_stage.get())
+    run.stages.append(timing)
+    token = _current_stage.set(timing)
+    try:
+        with _sentry_span("engine.stage", name) as span:
+            yield timing
+            timing.finish()
+            if span is not None:
+                span.set_data("cpu_ms", timing.cpu_ms)
+                span.set_data("offloaded_cpu_ms", timing.offloaded_cpu_ms)
+    finally:
+        if timing.wall_ms is None:
+            timing.finish()
+        _current_stage.reset(token)
+
+
+def call_with_cpu_charged(func: Callable, *args, **kwargs) -> Any:
+    """
+    Calls `func`, adding the CPU time it takes on this thread to the current stage.
+    `run_blocking` runs offloaded calls through this in the caller's context.
+    """
+    current = _current_stage.get()
+    if current is None:
+        return func(*args, **kwargs)
+    started_at = time.thread_time()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        current.add_offloaded_cpu(time.thread_time() - started_at)
+
+
+def set_run_attributes(**attributes):
+    run = _current_run.get()
+    if run is not None:
+        run.attributes.update(attributes)
+
+
+def attach_query_plan(plan: Dict):
+    """
+    Adds a Salesforce query plan, with its observed cost, to the current stage.
+    """
+    current = _current_stage.get()
+    if current is None:
+        return
+    with current._lock:
+        current.query_plans.append(plan)
+
+
+def record_rows(rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+    """
+    Sets how many rows the current stage took in and produced.
+    """
+    current = _current_stage.get()
+    if current is None:
+        return
+    if rows_in is not None:
+        current.rows_in = rows_in
+    if rows_out is not None:
+        current.rows_out = rows_out
+
+
+def record_call(
+    service: str, calls: int = 1, bytes_sent: int = 0, bytes_received: int = 0
+):
+    """
+    Counts remote calls and their bytes toward the current stage and its parents.
+    Called from the HTTP clients' hooks, so it must stay cheap outside a run.
+    """
+    current = _current_stage.get()
+    if current is not None:
+        current.add_call(service, calls, bytes_sent, bytes_received)
+
+
+def record_response(service: str, response):
+    """
+    Counts one finished `requests` call, toward the current stage and the metrics.
+    """
+    body = getattr(getattr(response, "request", None), "body", None)
+    content = getattr(response, "content", None)
+    record_call(
+        service,
+        bytes_sent=len(body) if isinstance(body, (bytes, str)) else 0,
+        bytes_received=len(content) if isinstance(content, (bytes, str)) else 0,
+    )
+    elapsed = getattr(response, "elapsed", None)
+    status_code = getattr(response, "status_code", None)
+    observe_remote_call(
+        service,
+        elapsed.total_seconds() if hasattr(elapsed, "total_seconds") else None,
+        error=isinstance(status_code, int) and status_code >= 400,
+    )
+
+
+def get_recent_runs() -> List[Dict]:
+    """
+    Reports of the runs this process traced lately, whatever team they were for.
+    """
+    return [run.to_dict() for run in list(_recent_runs)]
+
+
+def _create_report_backend() -> CacheBackend:
+    backend_type = Config.ENGINE_TRACE_BACKEND
+    if backend_type == "local":
+        # reports plus their per user and per job indexes
+        return LocalCacheBackend(
+            max_entries=Config.ENGINE_TRACE_HISTORY * 10,
+            default_ttl=Config.ENGINE_TRACE_TTL_SECONDS,
+        )
+    if backend_type == "redis":
+        import redis  # only needed for the shared backend
+
+        return SharedCacheBackend(redis.Redis.from_url(Config.REDIS_URL))
+    if backend_type == "memory":
+        return SharedCacheBackend(InMemorySharedClient())
+    raise ValueError(f"Unknown engine trace backend: {backend_type}")
+
+
+def get_run_report_backend() -> CacheBackend:
+    global _report_backend
+    if _report_backend is None:
+        _report_backend = _create_report_backend()
+    return _report_backend
+
+
+def set_run_report_backend(backend: CacheBackend):
+    """
+    Swaps the run report backend, e.g. to an in-memory shared backend in tests.
+    """
+    global _report_backend
+    _report_backend = backend
+
+
+def get_run_reports(
+    salesforce_user_id: str, job_id: Optional[str] = None
+) -> List[Dict]:
+    """
+    Reports of the runs that refreshed `salesforce_user_id`'s team, oldest first,
+    optionally only those of `job_id`. They are read from the run report backend, so
+    with a shared one any worker can answer for a run another worker traced.
+    """
+    backend = get_run_report_backend()
+    index_key = (
+        f"{RUNS_BY_JOB_KEY_PREFIX}{job_id}"
+        if job_id is not None
+        else f"{RUNS_BY_USER_KEY_PREFIX}{salesforce_user_id}"
+    )
+    reports = [
+        backend.get(f"{RUN_REPORT_KEY_PREFIX}{run_id}")
+        for run_id in backend.get(index_key) or []
+    ]
+    # job ids are not secret, so a job's runs are still checked against the team
+    return [
+        report
+        for report in reports
+        if report is not None
+        and salesforce_user_id in report["attributes"].get("salesforce_user_ids", [])
+    ]
+
+
+def _store_run_report(report: Dict):
+    """
+    Stores `report` and adds it to the indexes of its team members and job, each
+    keeping the latest ENGINE_TRACE_HISTORY runs.
+    """
+    attributes = report["attributes"]
+    index_keys = [
+        f"{RUNS_BY_USER_KEY_PREFIX}{user_id}"
+        for user_id in attributes.get("salesforce_user_ids") or []
+    ]
+    if attributes.get("job_id"):
+        index_keys.append(f"{RUNS_BY_JOB_KEY_PREFIX}{attributes['job_id']}")
+    if not index_keys:
+        return
+
+    ttl = Config.ENGINE_TRACE_TTL_SECONDS
+    try:
+        backend = get_run_report_backend()
+        backend.set(f"{RUN_REPORT_KEY_PREFIX}{report['run_id']}", report, ttl=ttl)
+        for key in index_keys:
+            run_ids = list(backend.get(key) or [])
+            run_ids.append(report["run_id"])
+            backend.set(key, run_ids[-Config.ENGINE_TRACE_HISTORY :], ttl=ttl)
+    except Exception as e:
+        # reporting must never fail the run it reports on
+        logger.warning(f"Could not store the {report['name']} run report: {e}")
+
+
+@contextmanager
+def _sentry_span(op: str, name: str, root: bool = False):
+    if not Config.ENGINE_TRACE_SENTRY_SPANS or not sentry_sdk.get_client().is_active():
+        yield None
+        return
+    # a background job has no request transaction to hang its spans from
+    if root and sentry_sdk.get_current_span() is None:
+        span_context = sentry_sdk.start_transaction(op=op, name=name)
+    else:
+        span_context = sentry_sdk.start_span(op=op, name=name)
+    with span_context as span:
+        yield span
+
+
+# event loop lag
+
+_loop_lag_samples: Deque[Tuple[float, float]] = deque(
+    maxlen=Config.EVENT_LOOP_LAG_HISTORY
+)
+_slow_callbacks: Deque[Dict] = deque(maxlen=50)
+_slow_callback_count = 0
+
+
+def record_loop_lag(lag_seconds: float):
+    _loop_lag_samples.append((time.monotonic(), lag_seconds * 1000))
+    EVENT_LOOP_LAG.observe(lag_seconds)
+    if lag_seconds >= Config.EVENT_LOOP_BLOCKING_THRESHOLD_SECONDS:
+        EVENT_LOOP_STALLS.inc()
+
+
+def loop_lag_samples_since(started_at: float) -> List[float]:
+    return [lag for at, lag in list(_loop_lag_samples) if at >= started_at]
+
+
+def record_slow_callback(description: str, duration_seconds: float):
+    global _slow_callback_count
+    _slow_callback_count += 1
+    EVENT_LOOP_SLOW_CALLBACKS.inc()
+    _slow_callbacks.append(
+        {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "callback": description,
+            "duration_ms": _round(duration_seconds * 1000),
+        }
+    )
+
+
+class SlowCallbackFilter(logging.Filter):
+    """
+    Records the slow callbacks asyncio logs in debug mode ("Executing <Handle ...>
+    took 0.123 seconds") and lets the log record through.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.msg == "Executing %s took %.3f seconds" and len(record.args) == 2:
+            description, duration = record.args
+            record_slow_callback(str(description), duration)
+        return True
+
+
+def get_event_loop_stats() -> Dict:
+    """
+    Lag of the background loop's heartbeat over the kept samples, stalls being lags
+    past EVENT_LOOP_BLOCKING_THRESHOLD_SECONDS, and the slow callbacks asyncio
+    reported by name, which it only does in debug mode (EVENT_LOOP_DEBUG).
+    """
+    lags = [lag for _, lag in list(_loop_lag_samples)]
+    ordered = sorted(lags)
+    return {
+        "lag_samples": len(lags),
+        "lag_last_ms": _round(lags[-1]) if lags else None,
+        "lag_p50_ms": _round(_percentile(ordered, 0.5)),
+        "lag_p99_ms": _round(_percentile(ordered, 0.99)),
+        "lag_max_ms": _round(ordered[-1]) if ordered else None,
+        "stalls": _count_stalls(lags),
+        "slow_callbacks": _slow_callback_count,
+        "recent_slow_callbacks": list(_slow_callbacks),
+    }
+
+
+def _count_stalls(lags_ms: List[float]) -> int:
+    threshold_ms = Config.EVENT_LOOP_BLOCKING_THRESHOLD_SECONDS * 1000
+    return sum(1 for lag in lags_ms if lag >= threshold_ms)
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
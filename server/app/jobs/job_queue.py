@@ -0,0 +1,311 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app
+
+from config import Config
+from app.cache.backends import LocalCacheBackend
+from app.data_models import ApiResponse, JobModel, JobStatus, Settings
+from app.database.supabase_connection import get_session_state, set_session_state
+from app.utils import format_error_message, log_error
+
+REFRESH_ACTIVATIONS_JOB = "refresh_activations"
+
+# stages reported by the activation refresh, in the order they happen
+REFRESH_JOB_STAGES = (
+    "tasks_fetched",
+    "contacts_resolved",
+    "activations_computed",
+    "activations_upserted",
+)
+
+# (queue, job id) of the job running in the current thread/task, if any
+_current_job: ContextVar[Optional[Tuple["JobQueue", str]]] = ContextVar(
+    "current_job", default=None
+)
+
+_job_queue: Optional["JobQueue"] = None
+
+
+class JobQueue:
+    """
+    Runs callables outside of the request that enqueued them and keeps their
+    status and stage progress around so clients can poll for it.
+    """
+
+    def enqueue(
+        self,
+        job_type: str,
+        owner_id: str,
+        fn: Callable,
+        *args,
+        dedupe_key: Optional[str] = None,
+        **kwargs,
+    ) -> JobModel:
+        """
+        Enqueues `fn(*args, **kwargs)`. Jobs sharing a `dedupe_key` are single-flight:
+        callers attach to a queued or just-started run, and callers arriving later in
+        a run are coalesced into one follow-up run that starts when it finishes.
+        """
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[JobModel]:
+        raise NotImplementedError
+
+    def update_progress(self, job_id: str, stage: str, count: int) -> None:
+        raise NotImplementedError
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[JobModel]:
+        raise NotImplementedError
+
+    def shutdown(self, wait: bool = True) -> None:
+        raise NotImplementedError
+
+
+class LocalJobQueue(JobQueue):
+    """
+    In-process queue backed by a thread pool. Job state lives in this process only,
+    so the status endpoint must be served by the same process that enqueued the job.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        result_ttl: int = 60 * 60,
+        max_jobs: int = 1024,
+        coalesce_window: float = 30,
+    ):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job-worker"
+        )
+        self._jobs = LocalCacheBackend(max_entries=max_jobs, default_ttl=result_ttl)
+        self._futures: Dict[str, Future] = {}
+        # dedupe key -> id of the job currently queued/running, and of its follow-up
+        self._in_flight: Dict[str, str] = {}
+        self._follow_ups: Dict[str, Tuple[str, Callable, tuple, dict]] = {}
+        self.coalesce_window = coalesce_window
+        # re-entrant: a future that is already done runs its callback while we hold the lock
+        self._lock = threading.RLock()
+
+    def enqueue(
+        self,
+        job_type: str,
+        owner_id: str,
+        fn: Callable,
+        *args,
+        dedupe_key: Optional[str] = None,
+        **kwargs,
+    ) -> JobModel:
+        with self._lock:
+            if dedupe_key is not None:
+                existing = self._find_coalescable_job(dedupe_key)
+                if existing is not None:
+                    if owner_id not in existing.subscriber_ids:
+                        existing.subscriber_ids.append(owner_id)
+                    return existing.model_copy(deep=True)
+
+            job = JobModel(
+                id=uuid.uuid4().hex,
+                type=job_type,
+                owner_id=owner_id,
+                subscriber_ids=[owner_id],
+                dedupe_key=dedupe_key,
+                created_at=datetime.now(),
+            )
+            self._jobs.set(job.id, job)
+
+            if dedupe_key is not None and dedupe_key in self._in_flight:
+                # started long enough ago that its results may be stale; run once more after it
+                self._follow_ups[dedupe_key] = (job.id, fn, args, kwargs)
+            else:
+                if dedupe_key is not None:
+                    self._in_flight[dedupe_key] = job.id
+                self._submit(job.id, dedupe_key, fn, args, kwargs)
+
+            return job.model_copy(deep=True)
+
+    def get(self, job_id: str) -> Optional[JobModel]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy(deep=True) if job else None
+
+    def update_progress(self, job_id: str, stage: str, count: int) -> None:
+        self._update(job_id, stage=stage, progress={stage: count})
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[JobModel]:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._lock:
+                job = self._jobs.get(job_id)
+                future = self._futures.get(job_id)
+            if job is None or job.is_finished:
+                return self.get(job_id)
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return self.get(job_id)
+            if future:
+                wait([future], timeout=remaining)
+            else:
+                # a follow-up that has not been submitted yet
+                time.sleep(0.01 if remaining is None else min(0.01, remaining))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _find_coalescable_job(self, dedupe_key: str) -> Optional[JobModel]:
+        follow_up = self._follow_ups.get(dedupe_key)
+        if follow_up is not None:
+            return self._jobs.get(follow_up[0])
+
+        in_flight_id = self._in_flight.get(dedupe_key)
+        job = self._jobs.get(in_flight_id) if in_flight_id else None
+        if job is None:
+            return None
+        if job.started_at is None or (
+            (datetime.now() - job.started_at).total_seconds() <= self.coalesce_window
+        ):
+            return job
+        return None
+
+    def _submit(self, job_id: str, dedupe_key: Optional[str], fn: Callable, args, kwargs):
+        # called with the lock held
+        future = self._executor.submit(self._run, job_id, dedupe_key, fn, args, kwargs)
+        self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._forget_future(job_id))
+
+    def _release(self, job_id: str, dedupe_key: Optional[str]):
+        with self._lock:
+            if dedupe_key is None or self._in_flight.get(dedupe_key) != job_id:
+                return
+            follow_up = self._follow_ups.pop(dedupe_key, None)
+            if follow_up is None:
+                del self._in_flight[dedupe_key]
+                return
+            follow_up_id, fn, args, kwargs = follow_up
+            self._in_flight[dedupe_key] = follow_up_id
+            self._submit(follow_up_id, dedupe_key, fn, args, kwargs)
+
+    def _run(self, job_id: str, dedupe_key: Optional[str], fn: Callable, args, kwargs):
+        token = _current_job.set((self, job_id))
+        self._update(job_id, status=JobStatus.running, started_at=datetime.now())
+        try:
+            result = fn(*args, **kwargs)
+            if isinstance(result, ApiResponse) and not result.success:
+                self._finish(job_id, JobStatus.failed, result.message)
+            else:
+                message = result.message if isinstance(result, ApiResponse) else ""
+                self._finish(job_id, JobStatus.completed, message)
+        except Exception as e:
+            self._finish(job_id, JobStatus.failed, format_error_message(e))
+        finally:
+            _current_job.reset(token)
+            self._release(job_id, dedupe_key)
+
+    def _finish(self, job_id: str, status: JobStatus, message: str):
+        self._update(
+            job_id, status=status, message=message or "", finished_at=datetime.now()
+        )
+
+    def _update(self, job_id: str, progress: Optional[Dict[str, int]] = None, **changes):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for field, value in changes.items():
+                setattr(job, field, value)
+            if progress:
+                job.progress.update(progress)
+            # re-setting restarts the retention TTL from the latest update
+            self._jobs.set(job_id, job)
+
+    def _forget_future(self, job_id: str):
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+
+def _create_job_queue() -> JobQueue:
+    if Config.JOB_QUEUE_BACKEND == "local":
+        if Config.WEB_CONCURRENCY > 1:
+            # job status and single-flight keys would be invisible to the other workers
+            raise ValueError(
+                "The local job queue only supports a single worker process; "
+                f"run one worker instead of {Config.WEB_CONCURRENCY}"
+            )
+        return LocalJobQueue(
+            max_workers=Config.JOB_QUEUE_MAX_WORKERS,
+            result_ttl=Config.JOB_RESULT_TTL_SECONDS,
+            coalesce_window=Config.JOB_COALESCE_WINDOW_SECONDS,
+        )
+    raise ValueError(f"Unknown job queue backend: {Config.JOB_QUEUE_BACKEND}")
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = _create_job_queue()
+    return _job_queue
+
+
+def set_job_queue(queue: JobQueue):
+    """
+    Swaps the job queue, e.g. to a fresh local queue in tests.
+    """
+    global _job_queue
+    _job_queue = queue
+
+
+def report_job_progress(stage: str, count: int) -> None:
+    """
+    Records progress for the job running in the current context. A no-op when the
+    caller is not running as a job, e.g. when the engine is invoked directly.
+    """
+    current = _current_job.get()
+    if current is None:
+        return
+    queue, job_id = current
+    queue.update_progress(job_id, stage, count)
+
+
+def get_current_job_id() -> Optional[str]:
+    current = _current_job.get()
+    return current[1] if current is not None else None
+
+
+def build_team_job_key(job_type: str, settings: Settings) -> str:
+    """
+    Single-flight key for jobs that act on a whole team's data.
+    """
+    team_ids = sorted(set(settings.team_member_ids or []))
+    return f"{job_type}:{settings.salesforce_user_id}:{','.join(team_ids)}"
+
+
+def enqueue_with_session(
+    job_type: str, fn: Callable, *args, dedupe_key: Optional[str] = None, **kwargs
+) -> JobModel:
+    """
+    Enqueues `fn` to run inside an app context carrying the current request's
+    session state, so Salesforce and Supabase calls authenticate as the caller.
+    """
+    app = current_app._get_current_object()
+    session_state = get_session_state()
+
+    def run_with_session():
+        with app.app_context():
+            set_session_state(session_state)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                log_error(e)
+                raise
+
+    return get_job_queue().enqueue(
+        job_type,
+        session_state["salesforce_id"],
+        run_with_session,
+        dedupe_key=dedupe_key,
+    )
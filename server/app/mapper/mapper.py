@@ -18,6 +18,11 @@ from dateutil import parser
 from datetime import datetime, date
 import json
 from uuid import UUID
+
+try:
+    import orjson  # optional: faster encoding of activation upsert payloads
+except ImportError:
+    orjson = None
 from app.utils import (
     surround_numbers_with_underscores,
     remove_underscores_from_numbers,
@@ -137,11 +142,10 @@ def python_settings_to_supabase_dict(settings: Settings) -> Dict:
                 settings_dict[field] if settings_dict[field] else {}
             )
 
-    # Convert datetime to UTC ISO format string
-    if "latest_date_queried" in settings_dict and isinstance(
-        settings_dict["latest_date_queried"], datetime
-    ):
-        utc_time = settings_dict["latest_date_queried"].astimezone(pytz.UTC)
+    # Convert datetime to UTC ISO format string; to_dict has already rendered it as a
+    # string, so check the model's value (the engine may also have stored a string there)
+    if isinstance(settings.latest_date_queried, datetime):
+        utc_time = settings.latest_date_queried.astimezone(pytz.UTC)
         settings_dict["latest_date_queried"] = utc_time.isoformat()
 
     # Convert team_member_ids to JSON string if it's not None
@@ -270,6 +274,76 @@ def python_activation_to_supabase_dict(activation: Activation) -> Dict:
     return {k: v for k, v in activation_dict.items() if k in supabase_fields}
 
 
+# Activation columns stored in Supabase
+ACTIVATION_SUPABASE_FIELDS = (
+    "id",
+    "created_at",
+    "account_id",
+    "account",
+    "activated_by_id",
+    "activated_by",
+    "active_contact_ids",
+    "active_contacts",
+    "task_ids",
+    "tasks",
+    "activated_date",
+    "first_prospecting_activity",
+    "last_prospecting_activity",
+    "event_ids",
+    "prospecting_metadata",
+    "prospecting_effort",
+    "days_activated",
+    "days_engaged",
+    "engaged_date",
+    "last_outbound_engagement",
+    "opportunity",
+    "status",
+)
+
+
+def python_activation_to_supabase_payload(activation: Activation) -> Dict:
+    """
+    Wire-ready row for the Activations REST endpoint, built in one pass.
+
+    Unlike `python_activation_to_supabase_dict`, jsonb columns stay as plain
+    lists/dicts rather than JSON strings, so the row is encoded exactly once.
+    """
+    activation_dict = activation.to_dict()
+    payload = {
+        field: activation_dict[field]
+        for field in ACTIVATION_SUPABASE_FIELDS
+        if field in activation_dict
+    }
+
+    payload["account_id"] = activation_dict["account"]["id"]
+    payload["created_at"] = datetime.now().isoformat()
+    if not payload.get("event_ids"):
+        payload["event_ids"] = None
+    for field in ("prospecting_metadata", "prospecting_effort"):
+        if field in payload and not payload[field]:
+            payload[field] = None
+    if isinstance(payload.get("id"), UUID):
+        payload["id"] = str(payload["id"])
+
+    return payload
+
+
+def dumps_json_bytes(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def encode_activations_for_upsert(activations) -> bytes:
+    """
+    Encodes activations as a JSON array body, one pass per activation.
+    """
+    return b"[" + b",".join(
+        dumps_json_bytes(python_activation_to_supabase_payload(activation))
+        for activation in activations
+    ) + b"]"
+
+
 def convert_filter_model_to_filter(fm: FilterModel) -> Filter:
     return Filter(
         field=fm.field,
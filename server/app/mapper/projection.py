@@ -0,0 +1,132 @@
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+# Activation columns that hold dates, mirrored from supabase_dict_to_python_activation
+ACTIVATION_DATE_COLUMNS = frozenset(
+    {
+        "activated_date",
+        "engaged_date",
+        "first_prospecting_activity",
+        "last_prospecting_activity",
+        "last_outbound_engagement",
+    }
+)
+ACTIVATION_SET_COLUMNS = frozenset({"active_contact_ids", "task_ids", "event_ids"})
+
+# date keys inside the jsonb columns (Opportunity, ProspectingEffort, ProspectingMetadata)
+NESTED_DATE_KEYS = frozenset(
+    {"close_date", "date_entered", "first_occurrence", "last_occurrence"}
+)
+NESTED_DATE_KEYS_BY_COLUMN = {
+    "opportunity": NESTED_DATE_KEYS | {"created_date"},
+}
+
+
+class JsonRecord:
+    """
+    Read-only attribute view over a jsonb value, e.g. `record.account.id`.
+
+    Nested dicts and lists are wrapped lazily on access, and known date keys are
+    parsed, so the summary code can treat it like the pydantic model it replaces
+    without paying for validation of fields it never reads.
+    """
+
+    __slots__ = ("_data", "_date_keys")
+
+    def __init__(self, data: Dict, date_keys: frozenset = NESTED_DATE_KEYS):
+        self._data = data
+        self._date_keys = date_keys
+
+    def __getattr__(self, name):
+        try:
+            value = self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        if name in self._date_keys and isinstance(value, str):
+            return datetime.fromisoformat(value[:10]).date()
+        return _wrap_json(value, self._date_keys)
+
+    def __eq__(self, other):
+        if isinstance(other, JsonRecord):
+            return self._data == other._data
+        return NotImplemented
+
+    def __repr__(self):
+        return f"JsonRecord({self._data!r})"
+
+    def to_dict(self) -> Dict:
+        return self._data
+
+
+def _wrap_json(value, date_keys=NESTED_DATE_KEYS):
+    if isinstance(value, dict):
+        return JsonRecord(value, date_keys)
+    if isinstance(value, list):
+        return [_wrap_json(item, date_keys) for item in value]
+    return value
+
+
+def _convert_column(column: str, value):
+    if value is None:
+        return None
+    if column in ACTIVATION_DATE_COLUMNS:
+        return datetime.fromisoformat(value).date() if value else None
+    if column in ACTIVATION_SET_COLUMNS:
+        return set(value)
+    if isinstance(value, (dict, list)):
+        return _wrap_json(
+            value, NESTED_DATE_KEYS_BY_COLUMN.get(column, NESTED_DATE_KEYS)
+        )
+    return value
+
+
+@lru_cache(maxsize=None)
+def activation_record_type(columns: Tuple[str, ...]) -> type:
+    """
+    Returns a slotted record class holding exactly `columns`. Classes are built
+    once per column set and reused.
+    """
+
+    def __init__(self, row: Dict):
+        for column in columns:
+            setattr(self, column, _convert_column(column, row.get(column)))
+
+    def __repr__(self):
+        fields = ", ".join(f"{column}={getattr(self, column)!r}" for column in columns)
+        return f"ActivationRecord({fields})"
+
+    def to_dict(self) -> Dict:
+        return {column: _record_value_to_dict(getattr(self, column)) for column in columns}
+
+    return type(
+        "ActivationRecord",
+        (),
+        {
+            "__slots__": columns,
+            "__init__": __init__,
+            "__repr__": __repr__,
+            "to_dict": to_dict,
+            "columns": columns,
+        },
+    )
+
+
+def _record_value_to_dict(value):
+    if isinstance(value, JsonRecord):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_record_value_to_dict(item) for item in value]
+    if isinstance(value, set):
+        return list(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def parse_projection_columns(columns: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(column.strip() for column in columns))
+
+
+def supabase_dict_to_activation_record(row: Dict, columns: Iterable[str]):
+    return activation_record_type(parse_projection_columns(columns))(row)
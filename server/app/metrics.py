@@ -0,0 +1,242 @@
+import bisect
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from flask import Response, g, request
+
+# Prometheus' default latency buckets, in seconds
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# engine runs take from seconds to many minutes
+RUN_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._samples(),
+        ]
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def _labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{self._labels(key)} {_format(value)}"
+
+
+class Histogram(_Metric):
+    """
+    Cumulative buckets, sum and count per label set, as Prometheus expects them.
+    Observing is a bisect and three additions under a lock.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = REQUEST_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: counts per bucket (the last one is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            values = {key: (list(c), t[0]) for key, (c, t) in self._values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format(bound)}"'
+                yield f"{self.name}_bucket{self._labels(key, le)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_format(total)}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text format. Each worker process
+    keeps its own, so a scrape reports the process that answered it.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = _registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Flask request latency by route.",
+        ("method", "route", "status"),
+    )
+)
+REMOTE_CALL_DURATION = _registry.register(
+    Histogram(
+        "remote_call_duration_seconds",
+        "Salesforce and Supabase call latency.",
+        ("service",),
+    )
+)
+REMOTE_CALLS = _registry.register(
+    Counter(
+        "remote_calls_total",
+        "Salesforce and Supabase calls by outcome (ok or error).",
+        ("service", "outcome"),
+    )
+)
+CACHE_LOOKUPS = _registry.register(
+    Counter(
+        "cache_lookups_total",
+        "Cache lookups by cache and result (hit or miss).",
+        ("cache", "result"),
+    )
+)
+ENGINE_RUN_DURATION = _registry.register(
+    Histogram(
+        "engine_run_duration_seconds",
+        "Duration of engine runs, e.g. activation refreshes.",
+        ("run",),
+        buckets=RUN_BUCKETS,
+    )
+)
+ENGINE_STAGE_DURATION = _registry.register(
+    Histogram(
+        "engine_stage_duration_seconds",
+        "Duration of the stages of traced engine runs.",
+        ("run", "stage"),
+        buckets=RUN_BUCKETS,
+    )
+)
+EVENT_LOOP_LAG = _registry.register(
+    Histogram(
+        "event_loop_lag_seconds",
+        "Lag of the background event loop's heartbeat.",
+    )
+)
+EVENT_LOOP_STALLS = _registry.register(
+    Counter(
+        "event_loop_stalls_total",
+        "Heartbeats lagging past EVENT_LOOP_BLOCKING_THRESHOLD_SECONDS.",
+    )
+)
+EVENT_LOOP_SLOW_CALLBACKS = _registry.register(
+    Counter(
+        "event_loop_slow_callbacks_total",
+        "Slow callbacks asyncio reported, only in debug mode (EVENT_LOOP_DEBUG).",
+    )
+)
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+def start_request_timer():
+    g.request_started_at = time.perf_counter()
+
+
+def observe_request(response: Response) -> Response:
+    """
+    Records the request's latency under its route pattern, so paths carrying ids
+    share one series. Streamed bodies are timed until the view returned.
+    """
+    started_at = g.pop("request_started_at", None)
+    if started_at is not None:
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started_at,
+            method=request.method,
+            route=request.url_rule.rule if request.url_rule else "unmatched",
+            status=response.status_code,
+        )
+    return response
+
+
+def observe_remote_call(service: str, seconds: Optional[float], error: bool):
+    if seconds is not None:
+        REMOTE_CALL_DURATION.observe(seconds, service=service)
+    REMOTE_CALLS.inc(service=service, outcome="error" if error else "ok")
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
@@ -1,13 +1,11 @@
 from flask import request, g
-import json
 from functools import wraps
 from datetime import datetime, timezone
 from app.data_models import AuthenticationError
 from app.database.supabase_connection import (
     set_session_state,
 )
-from app.database.session_selector import fetch_supabase_session
-from dateutil import parser
+from app.cache.session_cache import get_authenticated_session
 
 
 def authenticate(f):
@@ -17,13 +15,12 @@ def authenticate(f):
         if not session_token:
             raise AuthenticationError("missing session token, are you logged in?")
 
-        session = fetch_supabase_session(session_token)
-        session_state = json.loads(session["state"])
+        session_state, expiry = get_authenticated_session(session_token)
         set_session_state(session_state)
 
         now = datetime.now(timezone.utc).astimezone()
 
-        if now > parser.isoparse(session["expiry"]):
+        if now > expiry:
             raise AuthenticationError("Session expired")
 
         return f(*args, **kwargs)
@@ -0,0 +1,531 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import math
+import time
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote_plus
+
+from config import Config
+from app.event_loop import run_blocking
+from app.instrumentation import attach_query_plan, call_with_cpu_charged
+
+SALESFORCE_QUERY_PATH = "/services/data/v55.0/query"
+
+# records per page of a REST query, and subrequests per composite call
+QUERY_PAGE_SIZE = 2000
+COMPOSITE_MAX_SUBREQUESTS = 25
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStrategy(str, Enum):
+    skip = "skip"
+    broad = "broad"
+    batched_in = "batched_in"
+    composite = "composite"
+    bulk = "bulk"
+
+
+class QuerySpec:
+    """
+    A SOQL query the planner may run as is or split by candidate ids.
+
+    `where` scopes every strategy. When `candidate_ids` is given only rows whose
+    `id_field` is one of them are wanted: batched strategies add
+    `id_field IN (...)` to the query, the others filter the rows afterwards unless
+    `filter_candidates` is False because the caller matches rows itself.
+    `max_concurrency` caps the calls batched strategies have in flight.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        sobject: str,
+        select: str,
+        where: Optional[str] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+        id_field: Optional[str] = None,
+        candidate_ids: Optional[List[str]] = None,
+        bulk_safe: bool = False,
+        filter_candidates: bool = True,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.label = label
+        self.sobject = sobject
+        self.select = select
+        self.where = where
+        self.order_by = order_by
+        self.limit = limit
+        self.id_field = id_field
+        self.candidate_ids = (
+            sorted(set(candidate_ids)) if candidate_ids is not None else None
+        )
+        # Bulk API results are CSV, so only queries whose callers cope with text
+        # values and no relationship fields may be moved to it
+        self.bulk_safe = bulk_safe and "." not in select
+        self.filter_candidates = filter_candidates
+        # concurrent calls for batched strategies, SOQL_IN_BATCH_CONCURRENCY by default
+        self.max_concurrency = max_concurrency or Config.SOQL_IN_BATCH_CONCURRENCY
+
+    def soql(self, ids: Optional[List[str]] = None) -> str:
+        soql = f"SELECT {self.select} FROM {self.sobject}"
+        if ids is not None:
+            joined_ids = "','".join(ids)
+            id_filter = f"{self.id_field} IN ('{joined_ids}')"
+            if self.where:
+                soql += f" WHERE ({self.where}) AND {id_filter}"
+            else:
+                soql += f" WHERE {id_filter}"
+        elif self.where:
+            soql += f" WHERE {self.where}"
+        if self.order_by:
+            soql += f" ORDER BY {self.order_by}"
+        if self.limit:
+            soql += f" LIMIT {self.limit}"
+        return soql
+
+    def count_soql(self) -> str:
+        soql = f"SELECT COUNT() FROM {self.sobject}"
+        return f"{soql} WHERE {self.where}" if self.where else soql
+
+
+class QueryPlan:
+    def __init__(
+        self,
+        spec: QuerySpec,
+        strategy: QueryStrategy,
+        expected_rows: Optional[int] = None,
+        id_batches: Optional[List[List[str]]] = None,
+        estimated_cost_ms: Optional[float] = None,
+        reason: str = "",
+    ):
+        self.spec = spec
+        self.strategy = strategy
+        self.expected_rows = expected_rows
+        self.id_batches = id_batches or []
+        self.estimated_cost_ms = estimated_cost_ms
+        self.reason = reason
+        self.queries = 0
+        self.rows = 0
+        self.elapsed_ms: Optional[float] = None
+
+    def to_dict(self):
+        return {
+            "label": self.spec.label,
+            "sobject": self.spec.sobject,
+            "strategy": self.strategy.value,
+            "reason": self.reason,
+            "candidate_ids": (
+                len(self.spec.candidate_ids)
+                if self.spec.candidate_ids is not None
+                else None
+            ),
+            "expected_rows": self.expected_rows,
+            "batches": len(self.id_batches),
+            "estimated_cost_ms": self.estimated_cost_ms,
+            "queries": self.queries,
+            "rows": self.rows,
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+
+class QueryExecutor:
+    """
+    The Salesforce calls the planner drives. `salesforce_api` provides the real
+    implementation; tests can provide their own.
+    """
+
+    instance_url: str = ""
+
+    def count(self, soql: str) -> int:
+        raise NotImplementedError
+
+    def fetch(self, soql: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def fetch_composite(self, soqls: List[str]) -> List[List[Dict]]:
+        raise NotImplementedError
+
+    async def fetch_composite_async(self, soqls: List[str]) -> List[List[Dict]]:
+        return await run_blocking(self.fetch_composite, soqls)
+
+    async def count_many_async(self, soqls: List[str]) -> List[Optional[int]]:
+        """
+        Runs independent count probes, with None for each probe that failed.
+        """
+
+        def count_or_none(soql: str) -> Optional[int]:
+            try:
+                return self.count(soql)
+            except Exception as e:
+                logger.warning(f"Count probe failed: {e}")
+                return None
+
+        return list(
+            await asyncio.gather(
+                *(run_blocking(count_or_none, soql) for soql in soqls)
+            )
+        )
+
+    async def fetch_many_async(self, soqls: List[str]) -> List[List[Dict]]:
+        """
+        Runs independent queries, returning the rows of each in order.
+        """
+        return list(
+            await asyncio.gather(
+                *(run_blocking(self.fetch, soql) for soql in soqls)
+            )
+        )
+
+    def fetch_bulk(self, soql: str) -> List[Dict]:
+        raise NotImplementedError
+
+
+def record_query_plan(plan: QueryPlan) -> None:
+    """
+    Logs the plan and adds it to the current engine stage, so traced runs report
+    the plans of their Salesforce reads (see /get_engine_run_reports).
+    """
+    report = plan.to_dict()
+    logger.info("Salesforce query plan: %s", report)
+    attach_query_plan(report)
+
+
+class QueryPlanner:
+    """
+    Chooses how to run a `QuerySpec` from cheap `COUNT()` probes and a cost model
+    in milliseconds, runs it, and records the plan with its observed cost:
+
+    - broad: the query as is, filtered by the candidate ids afterwards
+    - batched_in: `id_field IN (...)` batches sized to the URI limit, run concurrently
+    - composite: the same batches packed into Composite Batch calls
+    - bulk: a Bulk API query for very large broad pulls (off unless enabled)
+    """
+
+    def __init__(self, executor: QueryExecutor):
+        self.executor = executor
+
+    def plan(self, spec: QuerySpec) -> QueryPlan:
+        expected_rows = self._probe(spec) if self.needs_probe(spec) else None
+        return self.plan_with_count(spec, expected_rows)
+
+    @staticmethod
+    def needs_probe(spec: QuerySpec) -> bool:
+        if spec.candidate_ids is None:
+            return Config.SALESFORCE_BULK_ENABLED and spec.bulk_safe
+        # each id matches at most one row, and an unscoped broad query is never worth
+        # running, so neither needs a probe to be bounded
+        return bool(spec.candidate_ids) and spec.id_field != "Id" and spec.where is not None
+
+    def plan_with_count(
+        self, spec: QuerySpec, expected_rows: Optional[int]
+    ) -> QueryPlan:
+        """
+        Plans `spec` given the result of its count probe, run separately by callers
+        that send several probes at once. `expected_rows` is None when the probe was
+        not needed or failed.
+        """
+        probed = self.needs_probe(spec)
+        if spec.candidate_ids is not None and not spec.candidate_ids:
+            return QueryPlan(spec, QueryStrategy.skip, 0, reason="no candidate ids")
+
+        if spec.candidate_ids is None:
+            if not probed:
+                return QueryPlan(
+                    spec, QueryStrategy.broad, reason="no candidate ids to split"
+                )
+            if expected_rows is None:
+                return QueryPlan(spec, QueryStrategy.broad, reason="count probe failed")
+            costs = {QueryStrategy.broad: self._broad_cost(expected_rows)}
+            costs[QueryStrategy.bulk] = self._bulk_cost(expected_rows)
+            return self._cheapest(spec, costs, expected_rows, [])
+
+        id_batches = split_ids_for_query_uri(spec, self.executor.instance_url)
+        unique_ids = spec.id_field == "Id"
+        if not probed:
+            expected_rows = None
+        elif expected_rows is None:
+            return QueryPlan(spec, QueryStrategy.broad, reason="count probe failed")
+        if expected_rows == 0:
+            return QueryPlan(
+                spec, QueryStrategy.skip, 0, reason="count probe found no rows"
+            )
+
+        matched_rows = len(spec.candidate_ids) * (
+            1 if unique_ids else Config.SALESFORCE_PLANNER_ROWS_PER_ID
+        )
+        if expected_rows is not None:
+            matched_rows = min(matched_rows, expected_rows)
+
+        candidate_count = len(spec.candidate_ids)
+        costs = {}
+        if expected_rows is not None:
+            costs[QueryStrategy.broad] = self._broad_cost(expected_rows)
+        if len(id_batches) <= Config.SOQL_IN_BATCH_MAX_BATCHES:
+            costs[QueryStrategy.batched_in] = self._batched_cost(
+                len(id_batches), candidate_count, matched_rows
+            )
+        costs[QueryStrategy.composite] = self._composite_cost(
+            len(id_batches), candidate_count, matched_rows
+        )
+        bulk_allowed = Config.SALESFORCE_BULK_ENABLED and spec.bulk_safe
+        if expected_rows is not None and bulk_allowed:
+            costs[QueryStrategy.bulk] = self._bulk_cost(expected_rows)
+        return self._cheapest(spec, costs, expected_rows, id_batches)
+
+    def execute(self, spec: QuerySpec) -> List[Dict]:
+        started_at = time.perf_counter()
+        return self.run(self.plan(spec), started_at)
+
+    def run(self, plan: QueryPlan, started_at: Optional[float] = None) -> List[Dict]:
+        """
+        Runs a plan from `plan`, for callers whose next queries depend on the strategy.
+        """
+        if started_at is None:
+            started_at = time.perf_counter()
+        return self._finish(plan, self._run(plan), started_at)
+
+    async def execute_async(self, spec: QuerySpec) -> List[Dict]:
+        """
+        Same as `execute` for callers on an event loop: blocking calls run in a
+        worker thread and composite calls use the executor's async client.
+        """
+        started_at = time.perf_counter()
+        plan = await run_blocking(self.plan, spec)
+        if plan.strategy == QueryStrategy.composite:
+            rows = await self._run_composite_async(plan)
+        else:
+            rows = await run_blocking(self._run, plan)
+        return self._finish(plan, rows, started_at)
+
+    async def execute_many_async(
+        self, specs: Dict[str, QuerySpec]
+    ) -> Dict[str, Tuple[QueryPlan, List[Dict]]]:
+        """
+        Plans and runs independent specs together: their count probes are sent as one
+        set of calls, then every planned query, so an executor that packs calls (e.g.
+        into composite requests) serves them all in as few round trips as it can.
+        Bulk plans still run on their own.
+        """
+        started_at = time.perf_counter()
+        probe_keys = [key for key, spec in specs.items() if self.needs_probe(spec)]
+        counts = dict(
+            zip(
+                probe_keys,
+                await self.executor.count_many_async(
+                    [specs[key].count_soql() for key in probe_keys]
+                ),
+            )
+        )
+        plans = {
+            key: self.plan_with_count(spec, counts.get(key))
+            for key, spec in specs.items()
+        }
+
+        bulk_keys = [
+            key for key, plan in plans.items() if plan.strategy == QueryStrategy.bulk
+        ]
+        soqls_by_key = {
+            key: self.plan_queries(plan)
+            for key, plan in plans.items()
+            if key not in bulk_keys
+        }
+        soqls = [soql for key_soqls in soqls_by_key.values() for soql in key_soqls]
+        fetched, bulk_rows = await asyncio.gather(
+            self.executor.fetch_many_async(soqls) if soqls else _no_rows(),
+            asyncio.gather(
+                *(run_blocking(self._run, plans[key]) for key in bulk_keys)
+            ),
+        )
+
+        rows_by_key = dict(zip(bulk_keys, bulk_rows))
+        position = 0
+        for key, key_soqls in soqls_by_key.items():
+            plans[key].queries = len(key_soqls)
+            results = fetched[position : position + len(key_soqls)]
+            rows_by_key[key] = [row for rows in results for row in rows]
+            position += len(key_soqls)
+
+        return {
+            key: (plan, self._finish(plan, rows_by_key[key], started_at))
+            for key, plan in plans.items()
+        }
+
+    @staticmethod
+    def plan_queries(plan: QueryPlan) -> List[str]:
+        """
+        The REST queries a non-bulk plan runs.
+        """
+        if plan.strategy == QueryStrategy.skip:
+            return []
+        if plan.strategy == QueryStrategy.broad:
+            return [plan.spec.soql()]
+        return [plan.spec.soql(batch) for batch in plan.id_batches]
+
+    def _probe(self, spec: QuerySpec) -> Optional[int]:
+        try:
+            return self.executor.count(spec.count_soql())
+        except Exception as e:
+            logger.warning(f"Count probe for {spec.label} failed: {e}")
+            return None
+
+    def _cheapest(self, spec, costs, expected_rows, id_batches) -> QueryPlan:
+        # ties go to the earlier, simpler strategy
+        strategy = min(costs, key=lambda s: costs[s])
+        batched = strategy in (QueryStrategy.batched_in, QueryStrategy.composite)
+        return QueryPlan(
+            spec,
+            strategy,
+            expected_rows,
+            id_batches if batched else [],
+            round(costs[strategy], 2),
+            reason="lowest estimated cost",
+        )
+
+    @staticmethod
+    def _broad_cost(expected_rows: int) -> float:
+        pages = max(1, math.ceil(expected_rows / QUERY_PAGE_SIZE))
+        return (
+            pages * Config.SALESFORCE_PLANNER_REQUEST_COST_MS
+            + expected_rows * Config.SALESFORCE_PLANNER_ROW_COST_MS
+        )
+
+    @staticmethod
+    def _batched_cost(
+        batch_count: int, candidate_count: int, matched_rows: float
+    ) -> float:
+        waves = math.ceil(batch_count / Config.SOQL_IN_BATCH_CONCURRENCY)
+        return (
+            waves * Config.SALESFORCE_PLANNER_REQUEST_COST_MS
+            + candidate_count * Config.SALESFORCE_PLANNER_ID_COST_MS
+            + matched_rows * Config.SALESFORCE_PLANNER_ROW_COST_MS
+        )
+
+    @staticmethod
+    def _composite_cost(
+        batch_count: int, candidate_count: int, matched_rows: float
+    ) -> float:
+        calls = math.ceil(batch_count / COMPOSITE_MAX_SUBREQUESTS)
+        waves = math.ceil(calls / Config.SOQL_IN_BATCH_CONCURRENCY)
+        return (
+            waves
+            * (
+                Config.SALESFORCE_PLANNER_REQUEST_COST_MS
+                + min(batch_count, COMPOSITE_MAX_SUBREQUESTS)
+                * Config.SALESFORCE_PLANNER_SUBREQUEST_COST_MS
+            )
+            + candidate_count * Config.SALESFORCE_PLANNER_ID_COST_MS
+            + matched_rows * Config.SALESFORCE_PLANNER_ROW_COST_MS
+        )
+
+    @staticmethod
+    def _bulk_cost(expected_rows: int) -> float:
+        return (
+            Config.SALESFORCE_BULK_JOB_COST_MS
+            + expected_rows * Config.SALESFORCE_BULK_ROW_COST_MS
+        )
+
+    def _run(self, plan: QueryPlan) -> List[Dict]:
+        if plan.strategy == QueryStrategy.bulk:
+            plan.queries = 1
+            return self.executor.fetch_bulk(plan.spec.soql())
+
+        soqls = self.plan_queries(plan)
+        plan.queries = len(soqls)
+        if plan.strategy == QueryStrategy.composite:
+            return [
+                row
+                for chunk in _chunks(soqls, COMPOSITE_MAX_SUBREQUESTS)
+                for rows in self.executor.fetch_composite(chunk)
+                for row in rows
+            ]
+        if len(soqls) <= 1:
+            return [row for soql in soqls for row in self.executor.fetch(soql)]
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(plan.spec.max_concurrency, len(soqls))
+        ) as pool:
+            # each batch runs in a copy of the caller's context, as with `run_blocking`,
+            # so its calls and CPU time count toward the current engine stage
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run,
+                    call_with_cpu_charged,
+                    self.executor.fetch,
+                    soql,
+                )
+                for soql in soqls
+            ]
+            return [row for future in futures for row in future.result()]
+
+    async def _run_composite_async(self, plan: QueryPlan) -> List[Dict]:
+        soqls = self.plan_queries(plan)
+        plan.queries = len(soqls)
+        semaphore = asyncio.Semaphore(plan.spec.max_concurrency)
+
+        async def run_chunk(chunk: List[str]) -> List[List[Dict]]:
+            async with semaphore:
+                return await self.executor.fetch_composite_async(chunk)
+
+        results = await asyncio.gather(
+            *(run_chunk(chunk) for chunk in _chunks(soqls, COMPOSITE_MAX_SUBREQUESTS))
+        )
+        return [row for chunk_rows in results for rows in chunk_rows for row in rows]
+
+    def _finish(self, plan: QueryPlan, rows: List[Dict], started_at: float) -> List[Dict]:
+        spec = plan.spec
+        # batched queries only return candidates, the other strategies may not
+        batched = plan.strategy in (QueryStrategy.batched_in, QueryStrategy.composite)
+        if spec.candidate_ids is not None and spec.filter_candidates and not batched:
+            candidate_ids = set(spec.candidate_ids)
+            rows = [row for row in rows if row.get(spec.id_field) in candidate_ids]
+        if spec.order_by and plan.queries > 1:
+            rows = _sort_rows(rows, spec.order_by)
+        plan.rows = len(rows)
+        plan.elapsed_ms = round((time.perf_counter() - started_at) * 1000, 2)
+        record_query_plan(plan)
+        return rows
+
+
+def split_ids_for_query_uri(spec: QuerySpec, instance_url: str) -> List[List[str]]:
+    """
+    Splits the candidate ids into batches whose `id_field IN (...)` query keeps the
+    GET URL under Config.SOQL_MAX_URI_LENGTH once URL-encoded.
+    """
+    base_length = len(f"{instance_url}{SALESFORCE_QUERY_PATH}?q=") + len(
+        quote_plus(spec.soql([]))
+    )
+    budget = Config.SOQL_MAX_URI_LENGTH - base_length
+
+    batches, batch, used = [], [], 0
+    for id in spec.candidate_ids:
+        cost = len(quote_plus(f"'{id}',"))
+        if batch and used + cost > budget:
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(id)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def _no_rows() -> List[List[Dict]]:
+    return []
+
+
+def _chunks(items: List, size: int) -> List[List]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _sort_rows(rows: List[Dict], order_by: str) -> List[Dict]:
+    # results of several batches are merged, so re-apply a single-field ORDER BY
+    field, _, direction = order_by.partition(" ")
+    return sorted(
+        rows,
+        key=lambda row: (row.get(field) is not None, row.get(field) or ""),
+        reverse=direction.strip().upper() == "DESC",
+    )
@@ -1,15 +1,16 @@
-import requests, json
+import requests, json, hmac
 from flask import Blueprint, jsonify, redirect, request
 from urllib.parse import unquote
 from app.middleware import authenticate
 from app.utils import format_error_message, log_error
 from app.database.activation_selector import (
+    ACTIVATION_SUMMARY_COLUMNS,
     load_active_activations_minimal_by_ids,
     load_activations_by_period,
     load_active_activations_paginated_by_ids,
     load_active_activations_paginated_with_search,
 )
-from app.database.settings_selector import load_settings
+from app.database.settings_selector import load_settings, load_salesforce_team_ids
 from app.database.supabase_user_selector import fetch_supabase_user
 from app.database.dml import (
     save_settings,
@@ -24,15 +25,32 @@ from app.mapper.mapper import (
     convert_settings_to_settings_model,
 )
 from app.helpers.activation_helper import generate_summary
+from app.cache.summary_cache import get_or_compute_summary
+from app.streaming import stream_api_response
+from app.http_cache import (
+    activation_data_etag,
+    is_not_modified,
+    make_conditional,
+    not_modified,
+    set_etag,
+)
 from app.services.setting_service import define_criteria_from_events_or_tasks
-from app.engine.activation_engine import update_activation_states
+from app.services.onboarding_preview_service import fetch_preview_records
+from app.engine.activation_engine import run_activation_refresh
+from app.instrumentation import get_run_reports
+from app.metrics import PROMETHEUS_CONTENT_TYPE, get_metrics_registry
+from app.sentry_sampling import get_traces_sampler
+from app.jobs.job_queue import (
+    REFRESH_ACTIVATIONS_JOB,
+    build_team_job_key,
+    enqueue_with_session,
+    get_job_queue,
+)
 from app.salesforce_api import (
     fetch_criteria_fields,
     fetch_task_fields,
     fetch_event_fields,
     fetch_salesforce_users,
-    fetch_tasks_by_user_ids,
-    fetch_events_by_user_ids,
     fetch_logged_in_salesforce_user,
     get_task_query_count,
     refresh_access_token,
@@ -264,14 +282,22 @@ def get_prospecting_activities_by_ids():
         period = data.get("period", "All")
         filter_ids = data.get("filterIds", [])
 
-        activations = []
-        if filter_ids and len(filter_ids) > 0:
-            activations = load_active_activations_minimal_by_ids(filter_ids).data
-        else:
-            activations = load_activations_by_period(period).data
+        etag = activation_data_etag()
+        if is_not_modified(etag):
+            return not_modified(etag)
+
+        def build_summary_payload():
+            activations = []
+            if filter_ids and len(filter_ids) > 0:
+                activations = load_active_activations_minimal_by_ids(
+                    filter_ids, columns=ACTIVATION_SUMMARY_COLUMNS
+                ).data
+            else:
+                activations = load_activations_by_period(
+                    period, columns=ACTIVATION_SUMMARY_COLUMNS
+                ).data
 
-        response.data = [
-            {
+            return {
                 "summary": generate_summary(activations),
                 "raw_data": [
                     {
@@ -284,8 +310,24 @@ def get_prospecting_activities_by_ids():
                     for activation in activations
                 ],
             }
-        ]
+
+        payload = get_or_compute_summary(
+            load_salesforce_team_ids(),
+            period,
+            filter_ids,
+            build_summary_payload,
+        )
         response.success = True
+        # "All" on a large team can be tens of thousands of rows, so stream them out
+        return set_etag(
+            stream_api_response(
+                response,
+                {"summary": payload["summary"]},
+                "raw_data",
+                payload["raw_data"],
+            ),
+            etag,
+        )
     except Exception as e:
         log_error(e)
         response.message = (
@@ -311,6 +353,10 @@ def get_paginated_prospecting_activities():
         sort_column = data.get("sortColumn", "")
         sort_order = data.get("sortOrder", "asc")
 
+        etag = activation_data_etag()
+        if is_not_modified(etag):
+            return not_modified(etag)
+
         if search_term:
             result = load_active_activations_paginated_with_search(
                 page,
@@ -326,16 +372,16 @@ def get_paginated_prospecting_activities():
             )
 
         if result.success:
-            response.data = [
-                {
-                    "raw_data": [
-                        activation.to_dict()
-                        for activation in result.data["activations"]
-                    ],
-                    "total_items": result.data["total_count"],
-                }
-            ]
             response.success = True
+            return set_etag(
+                stream_api_response(
+                    response,
+                    {"total_items": result.data["total_count"]},
+                    "raw_data",
+                    (activation.to_dict() for activation in result.data["activations"]),
+                ),
+                etag,
+            )
         else:
             response.message = result.message
     except Exception as e:
@@ -351,32 +397,130 @@ def process_new_prospecting_activity():
     from app.data_models import ApiResponse
 
     api_response = ApiResponse(data=[], message="", success=False)
+    try:
+        # Get the timezone from the request
+        user_timezone = request.json.get("timezone", "UTC")
+
+        # The engine can run for minutes, so it runs as a job the client polls via /get_job_status
+        # concurrent refreshes for the same team share one run
+        job = enqueue_with_session(
+            REFRESH_ACTIVATIONS_JOB,
+            run_activation_refresh,
+            user_timezone,
+            dedupe_key=build_team_job_key(REFRESH_ACTIVATIONS_JOB, load_settings()),
+        )
 
-    async def process_request():
-        try:
-            # Get the timezone from the request
-            user_timezone = request.json.get("timezone", "UTC")
+        api_response.data = [job]
+        api_response.success = True
+        api_response.message = "Prospecting activity processing started"
+        status_code = 202
+    except Exception as e:
+        log_error(e)
+        api_response.message = f"Failed to process prospecting activities data: {format_error_message(e)}"
+        status_code = 500
 
-            # Pass the timezone to update_activation_states
-            response = await update_activation_states(user_timezone)
+    return jsonify(api_response.to_dict()), status_code
 
-            if response.success:
-                api_response.success = True
-                api_response.message = (
-                    "Prospecting activity data processed successfully"
-                )
-            else:
-                api_response.message = response.message
 
-            status_code = 200 if api_response.success else 500
-        except Exception as e:
-            log_error(e)
-            api_response.message = f"Failed to process prospecting activities data: {format_error_message(e)}"
-            status_code = 500
+@bp.route("/get_job_status", methods=["GET"])
+@authenticate
+def get_job_status():
+    from app.data_models import ApiResponse
+
+    response = ApiResponse(data=[], message="", success=False)
+    try:
+        job = get_job_queue().get(request.args.get("job_id", ""))
+
+        # jobs are only visible to the users who started or joined them
+        if (
+            job is None
+            or get_session_state()["salesforce_id"] not in job.subscriber_ids
+        ):
+            response.message = "Job not found"
+            return jsonify(response.to_dict()), 404
 
-        return jsonify(api_response.to_dict()), status_code
+        response.data = [job]
+        response.success = True
+    except Exception as e:
+        log_error(e)
+        response.message = f"Failed to retrieve job status: {format_error_message(e)}"
 
-    return asyncio.run(process_request())
+    return jsonify(response.to_dict()), get_status_code(response)
+
+
+@bp.route("/metrics", methods=["GET"])
+def metrics():
+    # scraped by Prometheus rather than the client; tokenless only in development
+    if Config.METRICS_TOKEN:
+        if not has_bearer_token(Config.METRICS_TOKEN):
+            return "Unauthorized", 401
+    elif Config.ENVIRONMENT != "development":
+        return "Not found", 404
+    return (
+        get_metrics_registry().render(),
+        200,
+        {"Content-Type": PROMETHEUS_CONTENT_TYPE},
+    )
+
+
+@bp.route("/trace_sampling_policy", methods=["GET", "PUT", "DELETE"])
+def trace_sampling_policy():
+    from app.data_models import ApiResponse
+
+    # an operator switch rather than a user feature, so it only exists with a token set
+    if not Config.SENTRY_SAMPLING_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    if not has_bearer_token(Config.SENTRY_SAMPLING_TOKEN):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    response = ApiResponse(data=[], message="", success=False)
+    try:
+        sampler = get_traces_sampler()
+        if request.method == "PUT":
+            policy = sampler.update_policy(request.json or {})
+        elif request.method == "DELETE":
+            policy = sampler.reset_policy()
+        else:
+            policy = sampler.get_policy()
+        response.data = [policy]
+        response.success = True
+        if request.method != "GET" and not sampler.is_shared:
+            response.message = (
+                "Applied to the worker that served this request only; use the redis "
+                "SENTRY_SAMPLING_POLICY_BACKEND to switch every worker"
+            )
+    except ValueError as e:
+        response.message = str(e)
+        return jsonify(response.to_dict()), 400
+    except Exception as e:
+        log_error(e)
+        response.message = (
+            f"Failed to update trace sampling policy: {format_error_message(e)}"
+        )
+
+    return jsonify(response.to_dict()), get_status_code(response)
+
+
+@bp.route("/get_engine_run_reports", methods=["GET"])
+@authenticate
+def get_engine_run_reports():
+    from app.data_models import ApiResponse
+
+    response = ApiResponse(data=[], message="", success=False)
+    try:
+        job_id = request.args.get("job_id")
+        salesforce_id = get_session_state()["salesforce_id"]
+
+        # reports are only visible to the team whose activations the run refreshed
+        response.data = get_run_reports(salesforce_id, job_id)
+        response.success = True
+    except Exception as e:
+        log_error(e)
+        response.message = (
+            f"Failed to retrieve engine run reports: {format_error_message(e)}"
+        )
+
+    return jsonify(response.to_dict()), get_status_code(response)
 
 
 @bp.route("/delete_all_prospecting_activity", methods=["POST"])
@@ -429,7 +573,7 @@ def get_settings():
         settings_model: SettingsModel = convert_settings_to_settings_model(settings)
         api_response.data = [settings_model.to_dict()]
         api_response.success = True
-        return jsonify(api_response.to_dict()), 200
+        return make_conditional(jsonify(api_response.to_dict()))
     except Exception as e:
         log_error(e)
         api_response.message = f"Failed to retrieve settings: {str(e)}"
@@ -466,7 +610,7 @@ def get_salesforce_tasks_by_user_ids():
         if not user_ids:
             response.message = "No user IDs provided"
         else:
-            response.data = fetch_tasks_by_user_ids(user_ids, 1000).data
+            response.data = fetch_preview_records("Task", user_ids).data
             response.success = True
     except Exception as e:
         log_error(e)
@@ -490,7 +634,7 @@ def get_salesforce_events_by_user_ids():
         if not user_ids:
             response.message = "No user IDs provided"
         else:
-            response.data = fetch_events_by_user_ids(user_ids, 1000).data
+            response.data = fetch_preview_records("Event", user_ids).data
             response.success = True
     except Exception as e:
         log_error(e)
@@ -596,6 +740,7 @@ def get_task_fields():
     try:
         response.data = fetch_task_fields().data
         response.success = True
+        return make_conditional(jsonify(response.to_dict()))
     except Exception as e:
         log_error(e)
         error_msg = format_error_message(e)
@@ -833,3 +978,11 @@ def get_status_code(response):
     return (
         200 if response.success else 400 if SESSION_EXPIRED in response.message else 503
     )
+
+
+def has_bearer_token(token: str) -> bool:
+    # constant-time, so response timing does not reveal how much of the token matched
+    return hmac.compare_digest(
+        request.headers.get("Authorization", "").encode("utf-8"),
+        f"Bearer {token}".encode("utf-8"),
+    )
@@ -1,8 +1,10 @@
 import requests
 import asyncio
-import aiohttp
+import csv
+import io
+import re
 from flask import current_app as app
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from app.utils import pluck, format_error_message, group_by
 from app.data_models import (
     ApiResponse,
@@ -14,9 +16,24 @@ from app.data_models import (
     UserModel,
     UserSObject,
     TokenData,
+    TaskRecord,
 )
 from app.database.supabase_connection import get_session_state
+from app.jobs.job_queue import report_job_progress
+from app.http_sessions import get_client_session
+from app.event_loop import run_blocking
+from app.instrumentation import SALESFORCE, record_response, record_rows, stage
 from app.constants import SESSION_EXPIRED, FILTER_OPERATOR_MAPPING
+from app.salesforce_composite import CompositeBatchEngine
+from app.salesforce_retry import salesforce_retrying
+from app.query_planner import (
+    SALESFORCE_QUERY_PATH,
+    QueryExecutor,
+    QueryPlan,
+    QueryPlanner,
+    QuerySpec,
+    QueryStrategy,
+)
 import concurrent.futures
 from config import Config
 import logging
@@ -82,29 +99,10 @@ def fetch_salesforce_users(ids: list[str] = None) -> ApiResponse:
     api_response = ApiResponse(data=[], message="", success=False)
 
     try:
-        soql_query = "SELECT Id,Email,FirstName,LastName,Username,FullPhotoUrl,UserRole.Name FROM User"
-
-        if ids:
-            soql_query += " WHERE Id IN ({})".format(",".join(f"'{id}'" for id in ids))
-
-        response = _fetch_sobjects(soql_query, get_credentials())
-        for entry in response.data:
-
-            entry["Role"] = (
-                entry["UserRole"]["Name"] if entry.get("UserRole") is not None else None
-            )
-            if "UserRole" in entry:
-                del entry["UserRole"]
-            if "attributes" in entry:
-                del entry["attributes"]
-
-        users = [
-            UserModel.from_sobject(
-                UserSObject(**{k: v for k, v in entry.items() if k != "attributes"})
-            )
-            for entry in response.data
-        ]
-        api_response.data = users
+        entries = QueryPlanner(SalesforceQueryExecutor(get_credentials())).execute(
+            _salesforce_users_spec(ids)
+        )
+        api_response.data = _to_user_models(entries)
         api_response.success = True
     except Exception as e:
         raise Exception(format_error_message(e))
@@ -112,19 +110,52 @@ def fetch_salesforce_users(ids: list[str] = None) -> ApiResponse:
     return api_response
 
 
+def _salesforce_users_spec(ids: List[str] = None) -> QuerySpec:
+    return QuerySpec(
+        label="salesforce_users",
+        sobject="User",
+        select="Id,Email,FirstName,LastName,Username,FullPhotoUrl,UserRole.Name",
+        id_field="Id",
+        candidate_ids=ids or None,
+    )
+
+
+def _to_user_models(entries: List[Dict]) -> List[UserModel]:
+    for entry in entries:
+
+        entry["Role"] = (
+            entry["UserRole"]["Name"] if entry.get("UserRole") is not None else None
+        )
+        if "UserRole" in entry:
+            del entry["UserRole"]
+        if "attributes" in entry:
+            del entry["attributes"]
+
+    return [
+        UserModel.from_sobject(
+            UserSObject(**{k: v for k, v in entry.items() if k != "attributes"})
+        )
+        for entry in entries
+    ]
+
+
 def fetch_any_prospecting_activity_from_date(
     start: str, criteria: List[FilterContainer], salesforce_user_ids: List[str]
 ) -> List[Dict]:
     joined_user_ids = "','".join(salesforce_user_ids)
-    base_query = f"SELECT WhoId FROM Task WHERE CreatedDate >= {start} AND OwnerId IN ('{joined_user_ids}') AND "
+    planner = QueryPlanner(SalesforceQueryExecutor(get_credentials()))
 
     all_tasks = []
     for filter_container in criteria:
         combined_conditions = _construct_where_clause_from_filter(filter_container)
-        full_query = f"{base_query} {combined_conditions}"
-
-        tasks = _fetch_sobjects(full_query, get_credentials())
-        all_tasks.extend(tasks)
+        spec = QuerySpec(
+            label="any_prospecting_activity",
+            sobject="Task",
+            select="WhoId",
+            where=f"CreatedDate >= {start} AND OwnerId IN ('{joined_user_ids}') AND {combined_conditions}",
+            bulk_safe=True,
+        )
+        all_tasks.extend(planner.execute(spec))
 
     return all_tasks
 
@@ -139,7 +170,12 @@ async def fetch_prospecting_tasks_by_account_ids_from_date_not_in_ids(
 
     # 1. Fetch all tasks meeting any criteria
     print("Fetching all matching tasks")
-    all_tasks = fetch_all_matching_tasks(start, criteria, salesforce_user_ids).data
+    matching_tasks = await run_blocking(
+        fetch_all_matching_tasks, start, criteria, salesforce_user_ids
+    )
+    all_tasks = [TaskRecord.from_sobject(task) for task in matching_tasks.data]
+    record_rows(rows_out=len(all_tasks))
+    report_job_progress("tasks_fetched", len(all_tasks))
 
     # 2. Group tasks by WhoId
     print("Grouping tasks by WhoId")
@@ -147,7 +183,10 @@ async def fetch_prospecting_tasks_by_account_ids_from_date_not_in_ids(
 
     # 3. Fetch contacts for these WhoIds
     print("Fetching contacts for these WhoIds")
-    contact_by_id = await fetch_contact_by_id_map(list(tasks_by_who_id.keys()))
+    with stage("resolve contacts"):
+        contact_by_id = await fetch_contact_by_id_map(list(tasks_by_who_id.keys()))
+        record_rows(rows_in=len(tasks_by_who_id), rows_out=len(contact_by_id))
+    report_job_progress("contacts_resolved", len(contact_by_id))
 
     # 4 & 5. Group tasks by AccountId and criteria
     print("Grouping tasks by AccountId and criteria")
@@ -164,105 +203,37 @@ async def fetch_prospecting_tasks_by_account_ids_from_date_not_in_ids(
 
 def fetch_all_matching_tasks(
     start: str, criteria: List[FilterContainer], salesforce_user_ids: List[str]
-) -> List[Dict]:
+) -> ApiResponse:
     combined_criteria = " OR ".join(
         [_construct_where_clause_from_filter(fc) for fc in criteria]
     )
-    soql_query = f"""
-    SELECT Id, WhoId, OwnerId, Priority, WhatId, Subject, Status, CallDurationInSeconds, CallType, CallDisposition, CreatedDate, CreatedById, TaskSubtype
-    FROM Task
-    WHERE CreatedDate >= {start}
-    AND OwnerId IN ('{("','".join(salesforce_user_ids))}')
-    AND ({combined_criteria})
-    """
-    return _fetch_sobjects(soql_query, get_credentials())
+    joined_user_ids = "','".join(salesforce_user_ids)
+    spec = QuerySpec(
+        label="all_matching_tasks",
+        sobject="Task",
+        select="Id, WhoId, OwnerId, Priority, WhatId, Subject, Status, CallDurationInSeconds, CallType, CallDisposition, CreatedDate, CreatedById, TaskSubtype",
+        where=f"CreatedDate >= {start} AND OwnerId IN ('{joined_user_ids}') AND ({combined_criteria})",
+        # criteria are matched again locally, and Filter.matches casts the values it compares
+        bulk_safe=True,
+    )
+    return ApiResponse(
+        data=QueryPlanner(SalesforceQueryExecutor(get_credentials())).execute(spec),
+        success=True,
+    )
 
 
 async def fetch_contacts_by_account_ids(account_ids: List[str]) -> List[Contact]:
-    contact_batch_size = 300
-    composite_batch_size = 5
-    account_batches = [
-        account_ids[i : i + contact_batch_size]
-        for i in range(0, len(account_ids), contact_batch_size)
-    ]
-    composite_batches = [
-        account_batches[i : i + composite_batch_size]
-        for i in range(0, len(account_batches), composite_batch_size)
-    ]
-
-    async with aiohttp.ClientSession() as session:
-        contact_fetch_jobs = [
-            fetch_contact_composite_batch_by_account(batch, session)
-            for batch in composite_batches
-        ]
-        results = await asyncio.gather(*contact_fetch_jobs)
-
-    contacts = []
-    for result in results:
-        for batch_result in result:
-            contacts.extend(batch_result)
-
-    return contacts
-
-
-async def fetch_contact_composite_batch_by_account(
-    account_batches: List[List[str]], session: aiohttp.ClientSession
-) -> List[List[Contact]]:
-    access_token, instance_url = get_credentials()
-    if not access_token or not instance_url:
-        raise Exception("Session expired")
-
-    composite_request = {"allOrNone": False, "compositeRequest": []}
-
-    for i, batch in enumerate(account_batches):
-        account_id_filter = "','".join(batch)
-        composite_request["compositeRequest"].append(
-            {
-                "method": "GET",
-                "url": f"/services/data/v55.0/query/?q=SELECT Id,FirstName,LastName,AccountId FROM Contact WHERE AccountId IN ('{account_id_filter}')",
-                "referenceId": f"ContactQuery{i}",
-            }
-        )
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-    }
-
-    async with session.post(
-        f"{instance_url}/services/data/v55.0/composite",
-        json=composite_request,
-        headers=headers,
-    ) as response:
-        if response.status != 200:
-            raise Exception(f"API request failed: {await response.text()}")
-
-        data = await response.json()
-        results = []
-        for composite_response in data["compositeResponse"]:
-            result = []
-            contacts = composite_response["body"]["records"]
-
-            # Process initial batch of contacts
-            result.extend(_process_contacts(contacts))
-
-            # Fetch and process remaining contacts if any
-            next_records_url = composite_response["body"].get("nextRecordsUrl")
-            while next_records_url:
-                async with session.get(
-                    f"{instance_url}{next_records_url}", headers=headers
-                ) as next_response:
-                    if next_response.status != 200:
-                        raise Exception(
-                            f"API request failed: {await next_response.text()}"
-                        )
-
-                    next_data = await next_response.json()
-                    result.extend(_process_contacts(next_data["records"]))
-                    next_records_url = next_data.get("nextRecordsUrl")
-
-            results.append(result)
-        return results
+    spec = QuerySpec(
+        label="contacts_by_account_ids",
+        sobject="Contact",
+        select="Id,FirstName,LastName,AccountId",
+        id_field="AccountId",
+        candidate_ids=account_ids,
+    )
+    contacts = await QueryPlanner(SalesforceQueryExecutor(get_credentials())).execute_async(
+        spec
+    )
+    return _process_contacts(contacts)
 
 
 def _process_contacts(contacts):
@@ -281,108 +252,13 @@ def _process_contacts(contacts):
 import time
 
 
-async def fetch_contact_by_id_map(contact_ids: List[str]) -> Dict[str, str]:
+async def fetch_contact_by_id_map(contact_ids: List[str]) -> Dict[str, Contact]:
     start_time = time.time()
     print(f"Starting fetch_contact_by_id_map for {len(contact_ids)} contacts")
 
-    contact_batch_size = 300
-    composite_batch_size = 3  # Reduced from 5 to 3
-    contact_batches = [
-        contact_ids[i : i + contact_batch_size]
-        for i in range(0, len(contact_ids), contact_batch_size)
-    ]
-    composite_batches = [
-        contact_batches[i : i + composite_batch_size]
-        for i in range(0, len(contact_batches), composite_batch_size)
-    ]
-
-    async with aiohttp.ClientSession() as session:
-        contact_by_id = {}
-        for i, batch in enumerate(composite_batches):
-            print(f"Processing composite batch {i+1} of {len(composite_batches)}")
-            results = await fetch_contact_composite_batch(batch, session)
-            for result in results:
-                contact_by_id.update(result)
-
-            if i < len(composite_batches) - 1:  # Don't wait after the last batch
-                await asyncio.sleep(0.5)  # 0.5 second delay between composite batches
-
-    end_time = time.time()
-    print(
-        f"Completed fetch_contact_by_id_map. Total contacts processed: {len(contact_by_id)}. Time taken: {end_time - start_time:.2f} seconds"
-    )
-    return contact_by_id
-
-
-import logging
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
-
-# Create logger
-logger = logging.getLogger(__name__)
-
-
-async def fetch_contact_composite_batch(
-    contact_batches: List[List[str]], session: aiohttp.ClientSession
-) -> List[Dict[str, Account]]:
-    MAX_RETRIES = 3
-    RETRY_DELAY = 2  # seconds
-    TIMEOUT = 10  # seconds
-
-    async def make_request_with_retry(request_func, *args, **kwargs):
-        for attempt in range(MAX_RETRIES):
-            try:
-                return await asyncio.wait_for(
-                    request_func(*args, **kwargs), timeout=TIMEOUT
-                )
-            except asyncio.TimeoutError:
-                if attempt == MAX_RETRIES - 1:
-                    raise
-                logger.warning(
-                    f"Request timed out after {TIMEOUT} seconds. Retrying in {RETRY_DELAY} seconds... (Attempt {attempt + 1}/{MAX_RETRIES})"
-                )
-                await asyncio.sleep(RETRY_DELAY)
-            except Exception as e:
-                if attempt == MAX_RETRIES - 1:
-                    raise
-                logger.warning(
-                    f"Request failed: {str(e)}. Retrying in {RETRY_DELAY} seconds... (Attempt {attempt + 1}/{MAX_RETRIES})"
-                )
-                await asyncio.sleep(RETRY_DELAY)
-
-    async def make_composite_request():
-        async with session.post(
-            f"{instance_url}/services/data/v55.0/composite",
-            json=composite_request,
-            headers=headers,
-        ) as response:
-            if response.status != 200:
-                raise Exception(f"API request failed: {await response.text()}")
-            return await response.json()
-
-    async def fetch_next_records(url):
-        await asyncio.sleep(0.5)  # 0.5 second delay before each pagination request
-        async with session.get(
-            f"{instance_url}{url}", headers=headers
-        ) as next_response:
-            if next_response.status != 200:
-                raise Exception(f"API request failed: {await next_response.text()}")
-            return await next_response.json()
-
-    access_token, instance_url = get_credentials()
-    if not access_token or not instance_url:
-        raise Exception("Session expired")
-
-    print(f"Fetching contacts for batch with {len(contact_batches)} batches")
-
-    composite_request = {"allOrNone": False, "compositeRequest": []}
-
-    account_fields = _fetch_object_fields("Account", get_credentials()).data
+    account_fields = (
+        await run_blocking(_fetch_object_fields, "Account", get_credentials())
+    ).data
 
     blacklist = {
         "isdeleted",
@@ -409,73 +285,44 @@ async def fetch_contact_composite_batch(
         [f"Account.{field}" for field in filtered_account_fields]
     )
 
-    for i, batch in enumerate(contact_batches):
-        contact_id_filter = "','".join(batch)
-        composite_request["compositeRequest"].append(
-            {
-                "method": "GET",
-                "url": f"/services/data/v55.0/query/?q=SELECT Id,FirstName,LastName,AccountId, {account_fields_str} FROM Contact WHERE Id IN ('{contact_id_filter}')",
-                "referenceId": f"ContactQuery{i}",
-            }
-        )
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
+    spec = QuerySpec(
+        label="contact_by_id_map",
+        sobject="Contact",
+        select=f"Id,FirstName,LastName,AccountId, {account_fields_str}",
+        id_field="Id",
+        candidate_ids=contact_ids,
+        max_concurrency=Config.SALESFORCE_CONTACT_LOOKUP_CONCURRENCY,
+    )
+    # calls are retried one by one; a lookup that still fails fails the refresh rather
+    # than leaving tasks without their accounts
+    contacts = await QueryPlanner(
+        SalesforceQueryExecutor(get_credentials())
+    ).execute_async(spec)
+
+    contact_by_id = {
+        contact["Id"]: _process_contact(contact)
+        for contact in contacts
+        if contact.get("AccountId")
     }
 
-    start_time = time.time()
-    try:
-        data = await make_request_with_retry(make_composite_request)
-        logger.info(
-            f"Composite request successful. Time taken: {time.time() - start_time:.2f} seconds"
-        )
-    except Exception as e:
-        logger.error(f"Composite request failed after {MAX_RETRIES} attempts: {str(e)}")
-        return []
-
-    results = []
-    for composite_response in data["compositeResponse"]:
-        result = {}
-        contacts = composite_response["body"]["records"]
-
-        print(f"Processing {len(contacts)} contacts from initial batch")
-        for contact in contacts:
-            if contact.get("AccountId"):
-                result[contact["Id"]] = _process_contact(contact)
-
-        next_records_url = composite_response["body"].get("nextRecordsUrl")
-        page_count = 1
-        while next_records_url:
-            print(f"Fetching next records url (page {page_count}): {next_records_url}")
-            try:
-                next_data = await make_request_with_retry(
-                    fetch_next_records, next_records_url
-                )
-                logger.info(
-                    f"Next records request successful. Time taken: {time.time() - start_time:.2f} seconds"
-                )
-            except Exception as e:
-                logger.error(
-                    f"Next records request failed after {MAX_RETRIES} attempts: {str(e)}"
-                )
-                break
+    end_time = time.time()
+    print(
+        f"Completed fetch_contact_by_id_map. Total contacts processed: {len(contact_by_id)}. Time taken: {end_time - start_time:.2f} seconds"
+    )
+    return contact_by_id
 
-            print(
-                f"Processing {len(next_data['records'])} contacts from page {page_count}"
-            )
-            for contact in next_data["records"]:
-                if contact.get("AccountId"):
-                    result[contact["Id"]] = _process_contact(contact)
 
-            next_records_url = next_data.get("nextRecordsUrl")
-            page_count += 1
+import logging
 
-        print(f"Finished processing batch. Total contacts: {len(result)}")
-        results.append(result)
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
 
-    print(f"Completed fetch_contact_composite_batch. Total batches: {len(results)}")
-    return results
+# Create logger
+logger = logging.getLogger(__name__)
 
 
 def _process_contact(contact):
@@ -554,13 +401,16 @@ def group_tasks_by_account_and_criteria(
     return tasks_by_account_and_criteria
 
 
-def fetch_tasks_by_user_ids(user_ids: List[str], limit: int = None):
+def fetch_tasks_by_user_ids(
+    user_ids: List[str], limit: int = None, fields: List[str] = None
+):
     """
     Fetches tasks from Salesforce based on a list of user IDs.
 
     Parameters:
     - user_ids (list[str]): A list of user IDs to fetch tasks for.
-    - fields (list[str]): A list of field names to fetch for each task.
+    - limit (int): The maximum number of tasks to fetch.
+    - fields (list[str]): The field names to fetch for each task; every valid Task field when omitted.
 
     Returns:
     - ApiResponse: An ApiResponse object containing the fetched tasks as a list of Task objects.
@@ -572,13 +422,19 @@ def fetch_tasks_by_user_ids(user_ids: List[str], limit: int = None):
 
     try:
         joined_user_ids = "','".join(user_ids)
-        task_fields = pluck(fetch_task_fields().data, "name")
-        soql_query = f"SELECT {','.join(task_fields)} FROM Task WHERE OwnerId IN ('{joined_user_ids}')"
-        if limit:
-            soql_query += f" LIMIT {limit}"
+        task_fields = fields or pluck(fetch_task_fields().data, "name")
+        spec = QuerySpec(
+            label="tasks_by_user_ids",
+            sobject="Task",
+            select=",".join(task_fields),
+            where=f"OwnerId IN ('{joined_user_ids}')",
+            limit=limit,
+        )
         api_response.data = [
             {key: value for key, value in entry.items() if key != "attributes"}
-            for entry in _fetch_sobjects(soql_query, get_credentials()).data
+            for entry in QueryPlanner(
+                SalesforceQueryExecutor(get_credentials())
+            ).execute(spec)
         ]
         api_response.success = True
     except Exception as e:
@@ -614,13 +470,16 @@ def get_task_query_count(filter_container, salesforce_user_ids):
     return api_response
 
 
-def fetch_events_by_user_ids(user_ids: List[str], limit: int = None):
+def fetch_events_by_user_ids(
+    user_ids: List[str], limit: int = None, fields: List[str] = None
+):
     """
     Fetches events from Salesforce based on a list of user IDs.
 
     Parameters:
     - user_ids (list[str]): A list of user IDs to fetch events for.
-    - fields (list[str]): A list of field names to fetch for each event.
+    - limit (int): The maximum number of events to fetch.
+    - fields (list[str]): The field names to fetch for each event; every valid Event field when omitted.
 
     Returns:
     - ApiResponse: An ApiResponse object containing the fetched events as a list of Event objects.
@@ -632,13 +491,19 @@ def fetch_events_by_user_ids(user_ids: List[str], limit: int = None):
 
     try:
         joined_user_ids = "','".join(user_ids)
-        event_fields = pluck(fetch_event_fields().data, "name")
-        soql_query = f"SELECT {','.join(event_fields)} FROM Event WHERE OwnerId IN ('{joined_user_ids}')"
-        if limit:
-            soql_query += f" LIMIT {limit}"
+        event_fields = fields or pluck(fetch_event_fields().data, "name")
+        spec = QuerySpec(
+            label="events_by_user_ids",
+            sobject="Event",
+            select=",".join(event_fields),
+            where=f"OwnerId IN ('{joined_user_ids}')",
+            limit=limit,
+        )
         api_response.data = [
             {key: value for key, value in entry.items() if key != "attributes"}
-            for entry in _fetch_sobjects(soql_query, get_credentials()).data
+            for entry in QueryPlanner(
+                SalesforceQueryExecutor(get_credentials())
+            ).execute(spec)
         ]
         api_response.success = True
     except Exception as e:
@@ -656,6 +521,11 @@ def fetch_events_by_contact_ids_from_date(
     """
     Fetches events from Salesforce and post-processes them to match the given contact IDs.
 
+    As for `fetch_opportunities_by_account_ids_from_date`, the query planner picks
+    batched `WhoId IN (...)` queries when the contacts are few compared to the team's
+    meetings, one broad query filtered here otherwise. Group events also match the
+    contacts invited to them through EventRelation, not only their primary WhoId.
+
     Parameters:
     - contact_ids (list[str]): A list of contact IDs to fetch events for
     - start (str): The start date for filtering events via CreatedDate, in ISO format
@@ -672,27 +542,20 @@ def fetch_events_by_contact_ids_from_date(
     api_response = ApiResponse(data={}, message="", success=True)
 
     try:
-        meeting_criteria_filter = _construct_where_clause_from_filter(meetings_criteria)
-        joined_user_ids = "','".join(salesforce_user_ids)
-
-        soql_query = f"""
-        SELECT Id, WhoId, WhatId, Subject, CreatedDate, StartDateTime, EndDateTime 
-        FROM Event 
-        WHERE CreatedDate >= {start} 
-        AND CreatedById IN ('{joined_user_ids}') 
-        AND ({meeting_criteria_filter}) 
-        ORDER BY StartDateTime ASC
-        """
-
-        response = _fetch_sobjects(soql_query, get_credentials())
-
-        events_by_contact_id = {}
-        for event in response.data:
-            who_id = event.get("WhoId")
-            if who_id in contact_ids:
-                if who_id not in events_by_contact_id:
-                    events_by_contact_id[who_id] = []
-                events_by_contact_id[who_id].append(event)
+        contact_id_set = set(contact_ids)
+        if not contact_id_set:
+            api_response.message = "No contacts to fetch events for."
+            return api_response
+
+        planner = QueryPlanner(SalesforceQueryExecutor(get_credentials()))
+        plan = planner.plan(
+            _events_by_contact_ids_spec(
+                contact_ids, start, salesforce_user_ids, meetings_criteria
+            )
+        )
+        events_by_contact_id = _match_events_to_contacts(
+            planner, plan, planner.run(plan), start, salesforce_user_ids
+        )
 
         api_response.data = events_by_contact_id
         api_response.message = "Events fetched and filtered successfully."
@@ -704,28 +567,131 @@ def fetch_events_by_contact_ids_from_date(
     return api_response
 
 
+def _events_by_contact_ids_spec(
+    contact_ids: List[str],
+    start: str,
+    salesforce_user_ids: List[str],
+    meetings_criteria: FilterContainer,
+) -> QuerySpec:
+    meeting_criteria_filter = _construct_where_clause_from_filter(meetings_criteria)
+    joined_user_ids = "','".join(salesforce_user_ids)
+    return QuerySpec(
+        label="events_by_contact_ids",
+        sobject="Event",
+        select="Id, WhoId, WhatId, Subject, CreatedDate, StartDateTime, EndDateTime, IsGroupEvent",
+        where=f"CreatedDate >= {start} AND CreatedById IN ('{joined_user_ids}') AND ({meeting_criteria_filter})",
+        order_by="StartDateTime ASC",
+        id_field="WhoId",
+        candidate_ids=contact_ids,
+        # group events are matched through their invitees in _match_events_to_contacts
+        filter_candidates=False,
+    )
+
+
+def _match_events_to_contacts(
+    planner: QueryPlanner,
+    plan: QueryPlan,
+    events: List[Dict],
+    start: str,
+    salesforce_user_ids: List[str],
+) -> Dict[str, List[Dict]]:
+    """
+    Maps the events fetched for `plan` to the contacts they were for: their primary
+    WhoId and, for group events, the contacts invited through EventRelation. Which
+    relations are looked up depends on how the events were fetched.
+    """
+    spec = plan.spec
+    contact_id_set = set(spec.candidate_ids)
+    joined_user_ids = "','".join(salesforce_user_ids)
+
+    if plan.strategy == QueryStrategy.skip:
+        relations = []
+    elif plan.strategy in (QueryStrategy.batched_in, QueryStrategy.composite):
+        # group events the contacts were invited to without being the primary WhoId
+        relations = planner.execute(
+            QuerySpec(
+                label="invited_event_relations",
+                sobject="EventRelation",
+                select="EventId, RelationId",
+                where=(
+                    f"Event.IsGroupEvent = true AND Event.CreatedDate >= {start} "
+                    f"AND Event.CreatedById IN ('{joined_user_ids}')"
+                ),
+                id_field="RelationId",
+                candidate_ids=spec.candidate_ids,
+            )
+        )
+        fetched_event_ids = {event.get("Id") for event in events}
+        invited_event_ids = {
+            relation["EventId"] for relation in relations
+        } - fetched_event_ids
+        if invited_event_ids:
+            events = events + planner.execute(
+                QuerySpec(
+                    label="invited_events",
+                    sobject="Event",
+                    select=spec.select,
+                    where=spec.where,
+                    id_field="Id",
+                    candidate_ids=list(invited_event_ids),
+                )
+            )
+    else:
+        group_event_ids = [
+            event.get("Id") for event in events if event.get("IsGroupEvent")
+        ]
+        relations = planner.execute(
+            QuerySpec(
+                label="group_event_relations",
+                sobject="EventRelation",
+                select="EventId, RelationId",
+                id_field="EventId",
+                candidate_ids=group_event_ids,
+            )
+        )
+
+    invited_contact_ids_by_event_id: Dict[str, set] = {}
+    for relation in relations:
+        if relation.get("RelationId") in contact_id_set:
+            invited_contact_ids_by_event_id.setdefault(
+                relation["EventId"], set()
+            ).add(relation["RelationId"])
+
+    events_by_contact_id = {}
+    for event in sorted(events, key=lambda event: event.get("StartDateTime") or ""):
+        matched_contact_ids = invited_contact_ids_by_event_id.get(
+            event.get("Id"), set()
+        )
+        if event.get("WhoId") in contact_id_set:
+            matched_contact_ids = matched_contact_ids | {event["WhoId"]}
+        for contact_id in matched_contact_ids:
+            events_by_contact_id.setdefault(contact_id, []).append(event)
+    return events_by_contact_id
+
+
 def fetch_opportunities_by_account_ids_from_date(
     account_ids, start, salesforce_user_ids: List[str]
 ) -> List[Dict]:
     """
-    Fetches opportunities from Salesforce based on a list of account IDs, querying once and filtering.
+    Fetches opportunities from Salesforce based on a list of account IDs.
+
+    The query planner probes how many opportunities the team created since `start`
+    and runs whichever is cheaper: `AccountId IN (...)` batches for the candidate
+    accounts, or one query over everything filtered afterwards.
     """
     api_response = ApiResponse(data=[], message="", success=True)
 
     try:
-        joined_user_ids = "','".join(salesforce_user_ids)
-        soql_query = f"""
-        SELECT Id, AccountId, Amount, CreatedDate, StageName, Name, CloseDate 
-        FROM Opportunity 
-        WHERE CreatedDate >= {start} 
-        AND CreatedById IN ('{joined_user_ids}') 
-        ORDER BY CreatedDate ASC
-        """
-
-        response = _fetch_sobjects(soql_query, get_credentials())
-        api_response.data = [
-            opp for opp in response.data if opp.get("AccountId") in account_ids
-        ]
+        account_id_set = set(account_ids)
+        if not account_id_set:
+            api_response.message = "No accounts to fetch opportunities for."
+            return api_response
+
+        api_response.data = QueryPlanner(
+            SalesforceQueryExecutor(get_credentials())
+        ).execute(
+            _opportunities_by_account_ids_spec(account_ids, start, salesforce_user_ids)
+        )
 
         api_response.success = True
         api_response.message = "Opportunities fetched and filtered successfully."
@@ -737,6 +703,75 @@ def fetch_opportunities_by_account_ids_from_date(
     return api_response
 
 
+def _opportunities_by_account_ids_spec(
+    account_ids: List[str], start: str, salesforce_user_ids: List[str]
+) -> QuerySpec:
+    joined_user_ids = "','".join(salesforce_user_ids)
+    return QuerySpec(
+        label="opportunities_by_account_ids",
+        sobject="Opportunity",
+        select="Id, AccountId, Amount, CreatedDate, StageName, Name, CloseDate",
+        where=f"CreatedDate >= {start} AND CreatedById IN ('{joined_user_ids}')",
+        order_by="CreatedDate ASC",
+        id_field="AccountId",
+        candidate_ids=account_ids,
+    )
+
+
+async def fetch_team_account_data(
+    salesforce_user_ids: List[str],
+    account_ids: List[str],
+    start: str,
+    contact_ids: List[str] = None,
+    meetings_criteria: FilterContainer = None,
+) -> Tuple[ApiResponse, ApiResponse, ApiResponse]:
+    """
+    Fetches the team's Salesforce users, the opportunities under `account_ids` and,
+    when `contact_ids` is given, the events of those contacts, all created since
+    `start`. The reads are independent, so their count probes share one set of
+    Composite Batch requests and their queries another, instead of each fetch
+    making its own round trips. Only the group event lookups run afterwards.
+
+    Returns:
+    - Tuple of ApiResponses shaped like those of `fetch_salesforce_users`,
+      `fetch_opportunities_by_account_ids_from_date` and
+      `fetch_events_by_contact_ids_from_date`.
+    """
+    try:
+        planner = QueryPlanner(SalesforceQueryExecutor(get_credentials()))
+        specs = {
+            "users": _salesforce_users_spec(salesforce_user_ids),
+            "opportunities": _opportunities_by_account_ids_spec(
+                account_ids, start, salesforce_user_ids
+            ),
+        }
+        if contact_ids is not None:
+            specs["events"] = _events_by_contact_ids_spec(
+                contact_ids, start, salesforce_user_ids, meetings_criteria
+            )
+        results = await planner.execute_many_async(specs)
+
+        events_by_contact_id = {}
+        if contact_ids is not None:
+            events_plan, events = results["events"]
+            events_by_contact_id = await run_blocking(
+                _match_events_to_contacts,
+                planner,
+                events_plan,
+                events,
+                start,
+                salesforce_user_ids,
+            )
+    except Exception as e:
+        raise Exception(format_error_message(e))
+
+    return (
+        ApiResponse(data=_to_user_models(results["users"][1]), success=True),
+        ApiResponse(data=results["opportunities"][1], success=True),
+        ApiResponse(data=events_by_contact_id, success=True),
+    )
+
+
 def fetch_logged_in_salesforce_user() -> ApiResponse:
     api_response = ApiResponse(data=[], message="", success=False)
 
@@ -862,6 +897,7 @@ def _fetch_object_fields(object_name, credentials):
             f"{instance_url}/services/data/v55.0/sobjects/{object_name}/describe",
             headers=headers,
         )
+        record_response(SALESFORCE, response)
         if response.status_code == 200:
             fields = response.json()["fields"]
             api_response.success = True
@@ -875,6 +911,110 @@ def _fetch_object_fields(object_name, credentials):
     return api_response
 
 
+class SalesforceQueryExecutor(QueryExecutor):
+    """
+    Runs the query planner's REST, composite and Bulk API calls with the given
+    `(access_token, instance_url)` credentials.
+    """
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.instance_url = credentials[1] or ""
+
+    def count(self, soql: str) -> int:
+        return _fetch_sobjects_count(soql, self.credentials).data
+
+    def fetch(self, soql: str) -> List[Dict]:
+        return _fetch_sobjects(soql, self.credentials).data
+
+    def fetch_composite(self, soqls: List[str]) -> List[List[Dict]]:
+        return CompositeBatchEngine(self.credentials).query(soqls)
+
+    async def fetch_composite_async(self, soqls: List[str]) -> List[List[Dict]]:
+        return await CompositeBatchEngine(self.credentials).query_async(soqls)
+
+    async def count_many_async(self, soqls: List[str]) -> List[Optional[int]]:
+        try:
+            return await CompositeBatchEngine(self.credentials).count_async(soqls)
+        except Exception as e:
+            logger.warning(f"Composite count probes failed: {format_error_message(e)}")
+            return await super().count_many_async(soqls)
+
+    async def fetch_many_async(self, soqls: List[str]) -> List[List[Dict]]:
+        try:
+            return await CompositeBatchEngine(self.credentials).query_async(soqls)
+        except Exception as e:
+            # the queries still run, one request each
+            logger.warning(f"Composite queries failed: {format_error_message(e)}")
+            return await super().fetch_many_async(soqls)
+
+    def fetch_bulk(self, soql: str) -> List[Dict]:
+        """
+        Runs `soql` as a Bulk API 2.0 query job and reads its CSV results. Values come
+        back as text, except empty values, booleans and datetimes which are mapped to
+        what the REST API returns.
+        """
+        access_token, instance_url = self.credentials
+        if not access_token or not instance_url:
+            raise Exception(SESSION_EXPIRED)
+        headers = {"Authorization": f"Bearer {access_token}"}
+        jobs_url = f"{instance_url}/services/data/v55.0/jobs/query"
+
+        response = requests.post(
+            jobs_url, json={"operation": "query", "query": soql}, headers=headers
+        )
+        record_response(SALESFORCE, response)
+        response.raise_for_status()
+        job_url = f"{jobs_url}/{response.json()['id']}"
+
+        deadline = time.monotonic() + Config.SALESFORCE_BULK_TIMEOUT_SECONDS
+        while True:
+            response = requests.get(job_url, headers=headers)
+            record_response(SALESFORCE, response)
+            response.raise_for_status()
+            state = response.json()["state"]
+            if state == "JobComplete":
+                break
+            if state in ("Failed", "Aborted"):
+                raise Exception(
+                    f"Bulk query job {state.lower()}: {response.json().get('errorMessage')}"
+                )
+            if time.monotonic() > deadline:
+                raise Exception("Bulk query job timed out")
+            time.sleep(Config.SALESFORCE_BULK_POLL_SECONDS)
+
+        records = []
+        locator = None
+        while True:
+            params = {"locator": locator} if locator else {}
+            response = requests.get(
+                f"{job_url}/results", headers=headers, params=params
+            )
+            record_response(SALESFORCE, response)
+            response.raise_for_status()
+            records.extend(
+                {field: _bulk_value(value) for field, value in row.items()}
+                for row in csv.DictReader(io.StringIO(response.text))
+            )
+            locator = response.headers.get("Sforce-Locator")
+            if not locator or locator == "null":
+                return records
+
+
+BULK_DATETIME_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z$")
+
+
+def _bulk_value(value: str):
+    if value == "":
+        return None
+    if value in ("true", "false"):
+        return value == "true"
+    if BULK_DATETIME_PATTERN.match(value):
+        # the REST API formats datetimes with an explicit offset
+        return f"{value[:-1]}+0000"
+    return value
+
+
 def _fetch_sobjects_count(soql_query, credentials):
     try:
         access_token, instance_url = credentials
@@ -886,6 +1026,7 @@ def _fetch_sobjects_count(soql_query, credentials):
             headers=headers,
             params={"q": soql_query},
         )
+        record_response(SALESFORCE, response)
         if response.status_code == 200:
             return ApiResponse(
                 success=True,
@@ -914,12 +1055,23 @@ def _fetch_sobjects(soql_query, credentials):
         next_records_url = None
 
         while True:
-            if next_records_url:
-                response = requests.get(next_records_url, headers=headers)
-            else:
-                response = requests.get(url, headers=headers, params={"q": soql_query})
-
-            response.raise_for_status()
+            for attempt in salesforce_retrying():
+                with attempt:
+                    if next_records_url:
+                        response = requests.get(
+                            next_records_url,
+                            headers=headers,
+                            timeout=Config.SALESFORCE_REQUEST_TIMEOUT_SECONDS,
+                        )
+                    else:
+                        response = requests.get(
+                            url,
+                            headers=headers,
+                            params={"q": soql_query},
+                            timeout=Config.SALESFORCE_REQUEST_TIMEOUT_SECONDS,
+                        )
+                    record_response(SALESFORCE, response)
+                    response.raise_for_status()
             data = response.json()
 
             all_records.extend(data["records"])
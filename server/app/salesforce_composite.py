@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote_plus
+
+import requests
+
+from config import Config
+from app.constants import SESSION_EXPIRED
+from app.http_sessions import get_client_session
+from app.instrumentation import SALESFORCE, record_response
+from app.query_planner import (
+    COMPOSITE_MAX_SUBREQUESTS,
+    SALESFORCE_QUERY_PATH,
+    _chunks,
+)
+from app.salesforce_retry import async_salesforce_retrying, salesforce_retrying
+
+API_PATH_PREFIX = "/services/data/"
+COMPOSITE_BATCH_PATH = "/services/data/v55.0/composite/batch"
+
+logger = logging.getLogger(__name__)
+
+
+class CompositeBatchEngine:
+    """
+    Packs independent SOQL reads into Composite Batch requests of up to 25
+    subrequests. Results come back per query, in the order queries were given.
+    A query with more pages than its first one is continued in the following
+    rounds, where its follow-ups share requests with those of the other queries.
+
+    Composite Batch is used rather than Composite since the latter takes at most
+    5 query subrequests per call.
+    """
+
+    def __init__(self, credentials):
+        self.access_token, self.instance_url = credentials
+        if not self.access_token or not self.instance_url:
+            raise Exception(SESSION_EXPIRED)
+        self.headers = {"Authorization": f"Bearer {self.access_token}"}
+
+    def query(self, soqls: List[str]) -> List[List[Dict]]:
+        records_by_query = [[] for _ in soqls]
+        pending = [(index, _query_url(soql)) for index, soql in enumerate(soqls)]
+        while pending:
+            results = [
+                result
+                for chunk in _chunks(pending, COMPOSITE_MAX_SUBREQUESTS)
+                for result in self._post(chunk)
+            ]
+            pending = _collect_page(pending, results, records_by_query)
+        return records_by_query
+
+    async def query_async(self, soqls: List[str]) -> List[List[Dict]]:
+        records_by_query = [[] for _ in soqls]
+        pending = [(index, _query_url(soql)) for index, soql in enumerate(soqls)]
+        while pending:
+            results = await self._post_chunks_async(pending)
+            pending = _collect_page(pending, results, records_by_query)
+        return records_by_query
+
+    async def count_async(self, soqls: List[str]) -> List[Optional[int]]:
+        """
+        Runs `SELECT COUNT()` queries, with None for each one that failed.
+        """
+        subrequests = [(index, _query_url(soql)) for index, soql in enumerate(soqls)]
+        results = await self._post_chunks_async(subrequests)
+        counts = []
+        for soql, result in zip(soqls, results):
+            if result["statusCode"] == 200:
+                counts.append(result["result"]["totalSize"])
+            else:
+                logger.warning(f"Count probe failed: {result.get('result')} ({soql})")
+                counts.append(None)
+        return counts
+
+    def _post(self, subrequests: List[Tuple[int, str]]) -> List[Dict]:
+        for attempt in salesforce_retrying():
+            with attempt:
+                response = requests.post(
+                    f"{self.instance_url}{COMPOSITE_BATCH_PATH}",
+                    json=_batch_request(subrequests),
+                    headers=self.headers,
+                    timeout=Config.SALESFORCE_REQUEST_TIMEOUT_SECONDS,
+                )
+                record_response(SALESFORCE, response)
+                if response.status_code >= 500 or response.status_code == 429:
+                    response.raise_for_status()
+        if response.status_code != 200:
+            raise Exception(
+                f"Composite batch request failed ({response.status_code}): {response.text}"
+            )
+        return response.json()["results"]
+
+    async def _post_async(self, subrequests: List[Tuple[int, str]]) -> List[Dict]:
+        async for attempt in async_salesforce_retrying():
+            with attempt:
+                return await asyncio.wait_for(
+                    self._post_once_async(subrequests),
+                    timeout=Config.SALESFORCE_REQUEST_TIMEOUT_SECONDS,
+                )
+
+    async def _post_once_async(self, subrequests: List[Tuple[int, str]]) -> List[Dict]:
+        session = get_client_session(self.instance_url)
+        async with session.post(
+            f"{self.instance_url}{COMPOSITE_BATCH_PATH}",
+            json=_batch_request(subrequests),
+            headers=self.headers,
+        ) as response:
+            if response.status >= 500 or response.status == 429:
+                # retried by `_post_async`
+                response.raise_for_status()
+            if response.status != 200:
+                raise Exception(
+                    f"Composite batch request failed ({response.status}): {await response.text()}"
+                )
+            return (await response.json())["results"]
+
+    async def _post_chunks_async(self, subrequests: List[Tuple[int, str]]) -> List[Dict]:
+        semaphore = asyncio.Semaphore(Config.SOQL_IN_BATCH_CONCURRENCY)
+
+        async def post_chunk(chunk):
+            async with semaphore:
+                return await self._post_async(chunk)
+
+        chunk_results = await asyncio.gather(
+            *(
+                post_chunk(chunk)
+                for chunk in _chunks(subrequests, COMPOSITE_MAX_SUBREQUESTS)
+            )
+        )
+        return [result for results in chunk_results for result in results]
+
+
+def _query_url(soql: str) -> str:
+    return f"{SALESFORCE_QUERY_PATH[len(API_PATH_PREFIX):]}?q={quote_plus(soql)}"
+
+
+def _batch_request(subrequests: List[Tuple[int, str]]) -> Dict:
+    return {
+        "haltOnError": False,
+        "batchRequests": [{"method": "GET", "url": url} for _, url in subrequests],
+    }
+
+
+def _collect_page(
+    subrequests: List[Tuple[int, str]],
+    results: List[Dict],
+    records_by_query: List[List[Dict]],
+) -> List[Tuple[int, str]]:
+    """
+    Adds one page of each query's records to `records_by_query` and returns the
+    follow-up subrequests for queries with more pages.
+    """
+    follow_ups = []
+    for (index, url), result in zip(subrequests, results):
+        if result["statusCode"] != 200:
+            raise Exception(
+                f"Composite batch subrequest failed ({result['statusCode']}): {result.get('result')}"
+            )
+        page = result["result"]
+        records_by_query[index].extend(page["records"])
+        if page.get("nextRecordsUrl"):
+            follow_ups.append(
+                (index, page["nextRecordsUrl"][len(API_PATH_PREFIX) :])
+            )
+    return follow_ups
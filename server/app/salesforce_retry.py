@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+import aiohttp
+import requests
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from config import Config
+
+# throttled or briefly unavailable; other failures (e.g. an expired session) are final
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES
+    if isinstance(error, requests.HTTPError):
+        return (
+            error.response is not None
+            and error.response.status_code in RETRYABLE_STATUSES
+        )
+    return isinstance(
+        error,
+        (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            requests.ConnectionError,
+            requests.Timeout,
+        ),
+    )
+
+
+def _retry_kwargs() -> dict:
+    return dict(
+        stop=stop_after_attempt(Config.SALESFORCE_RETRY_ATTEMPTS),
+        wait=wait_exponential(
+            multiplier=Config.SALESFORCE_RETRY_MIN_WAIT_SECONDS,
+            min=Config.SALESFORCE_RETRY_MIN_WAIT_SECONDS,
+            max=10,
+        ),
+        retry=retry_if_exception(is_transient_error),
+        before_sleep=_log_retry,
+        reraise=True,
+    )
+
+
+def salesforce_retrying() -> Retrying:
+    """
+    Retries a blocking Salesforce call on timeouts, connection errors, throttling
+    and 5xx replies:
+
+        for attempt in salesforce_retrying():
+            with attempt:
+                response = requests.get(...)
+                response.raise_for_status()
+    """
+    return Retrying(**_retry_kwargs())
+
+
+def async_salesforce_retrying() -> AsyncRetrying:
+    """
+    Same as `salesforce_retrying`, for aiohttp calls (`async for attempt in ...`).
+    """
+    return AsyncRetrying(**_retry_kwargs())
+
+
+def _log_retry(retry_state):
+    logger.warning(
+        f"Salesforce call failed ({retry_state.outcome.exception()}), "
+        f"retrying (attempt {retry_state.attempt_number + 1}"
+        f"/{Config.SALESFORCE_RETRY_ATTEMPTS})"
+    )
@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from config import Config
+from app.cache.backends import (
+    CacheBackend,
+    InMemorySharedClient,
+    LocalCacheBackend,
+    SharedCacheBackend,
+)
+
+POLICY_KEY = "sentry_sampling_policy"
+# request volume is counted per route in windows of this many seconds
+WINDOW_SECONDS = 60
+# requests to paths without a route share one volume counter, as in app.metrics
+UNMATCHED_KEY = "unmatched"
+
+logger = logging.getLogger(__name__)
+
+
+def parse_route_rates(value: str) -> Dict[str, float]:
+    """
+    Parses "/process_new_prospecting_activity=1,/get_settings=0.01" into a dict.
+    """
+    rates = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        route, rate = entry.rsplit("=", 1)
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+def default_policy() -> Dict[str, Any]:
+    return {
+        "enabled": True,
+        "default_rate": Config.SENTRY_TRACES_SAMPLE_RATE,
+        "route_rates": parse_route_rates(Config.SENTRY_ROUTE_SAMPLE_RATES),
+        "target_per_minute": Config.SENTRY_TRACES_TARGET_PER_MINUTE,
+    }
+
+
+def merge_policy(base: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Applies `changes` to `base`; route rates are merged route by route.
+    """
+    merged = {**base, **changes}
+    if "route_rates" in base and "route_rates" in changes:
+        merged["route_rates"] = {**base["route_rates"], **changes["route_rates"]}
+    return merged
+
+
+def validate_policy(override: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns the default policy with `override` applied, raising ValueError for
+    unknown keys and rates outside [0, 1].
+    """
+    unknown = set(override) - set(default_policy())
+    if unknown:
+        raise ValueError(f"Unknown sampling policy keys: {', '.join(sorted(unknown))}")
+    policy = merge_policy(default_policy(), override)
+    if not isinstance(policy["route_rates"], dict):
+        raise ValueError("route_rates must map routes to sample rates")
+    rates = [policy["default_rate"], *policy["route_rates"].values()]
+    if not all(isinstance(rate, (int, float)) and 0 <= rate <= 1 for rate in rates):
+        raise ValueError("Sample rates must be numbers between 0 and 1")
+    if not isinstance(policy["enabled"], bool):
+        raise ValueError("enabled must be true or false")
+    target = policy["target_per_minute"]
+    if not isinstance(target, int) or isinstance(target, bool) or target < 0:
+        raise ValueError("target_per_minute must be a non-negative integer")
+    return policy
+
+
+class TracesSampler:
+    """
+    Sentry `traces_sampler` deciding per route how many transactions to trace.
+
+    Requests are keyed by path, other transactions (e.g. an "activation_refresh"
+    job) by name. A key's rate comes from `route_rates`, else `default_rate`; a
+    rate of 1 always traces. Below 1 the rate also adapts to volume: a key seeing
+    more than `target_per_minute` requests a minute is traced at most that often,
+    so busy polling routes cost little however hot they run. A sampled parent
+    trace is always continued, so traces coming from the client stay whole.
+
+    Volume is counted per key for the app's `routes` and the keys `route_rates`
+    names; any other path counts as "unmatched", so probes of arbitrary paths
+    cannot grow the counters.
+
+    The policy starts from Config and can be switched at runtime with
+    `update_policy`. Overrides are stored in `policy_backend`, which every process
+    re-reads at most every SENTRY_SAMPLING_POLICY_REFRESH_SECONDS, so with a
+    shared backend one switch reaches every worker.
+    """
+
+    def __init__(
+        self,
+        policy_backend: CacheBackend,
+        clock: Callable[[], float] = time.monotonic,
+        routes: Iterable[str] = (),
+    ):
+        self.policy_backend = policy_backend
+        self.clock = clock
+        self.routes = frozenset(routes)
+        self._policy = default_policy()
+        self._policy_loaded_at: Optional[float] = None
+        # per key: (window start, requests in this window, requests in the previous)
+        self._volume: Dict[str, Tuple[float, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, sampling_context: Dict[str, Any]) -> float:
+        parent_sampled = sampling_context.get("parent_sampled")
+        if parent_sampled is not None:
+            return float(parent_sampled)
+
+        policy = self.get_policy()
+        if not policy["enabled"]:
+            return 0.0
+
+        key = _sampling_key(sampling_context)
+        rate = policy["route_rates"].get(key, policy["default_rate"])
+        if sampling_context.get("wsgi_environ") and not (
+            key in self.routes or key in policy["route_rates"]
+        ):
+            key = UNMATCHED_KEY
+        per_minute = self._count_request(key)
+        if rate >= 1 or rate <= 0 or not policy["target_per_minute"]:
+            return float(rate)
+        return min(rate, policy["target_per_minute"] / per_minute)
+
+    @property
+    def is_shared(self) -> bool:
+        """
+        Whether policy switches reach every worker rather than this process only.
+        """
+        return not isinstance(self.policy_backend, LocalCacheBackend)
+
+    def set_routes(self, routes: Iterable[str]):
+        self.routes = frozenset(routes)
+
+    def get_policy(self) -> Dict[str, Any]:
+        now = self.clock()
+        loaded_at = self._policy_loaded_at
+        if (
+            loaded_at is None
+            or now - loaded_at >= Config.SENTRY_SAMPLING_POLICY_REFRESH_SECONDS
+        ):
+            self._policy_loaded_at = now
+            try:
+                self._policy = validate_policy(self.policy_backend.get(POLICY_KEY) or {})
+            except Exception as e:
+                # sampling runs on every request, so keep the last policy rather than fail
+                logger.warning(f"Could not load the trace sampling policy: {e}")
+        return self._policy
+
+    def update_policy(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Applies `changes` on top of the current override and stores the result.
+        """
+        override = merge_policy(self.policy_backend.get(POLICY_KEY) or {}, changes)
+        policy = validate_policy(override)
+        self.policy_backend.set(POLICY_KEY, override)
+        self._policy, self._policy_loaded_at = policy, self.clock()
+        return policy
+
+    def reset_policy(self) -> Dict[str, Any]:
+        self.policy_backend.delete(POLICY_KEY)
+        self._policy, self._policy_loaded_at = default_policy(), self.clock()
+        return self._policy
+
+    def _count_request(self, key: str) -> int:
+        """
+        Counts a request for `key` and returns its volume per minute: the larger of
+        the previous window's count and the current one's, so bursts show at once.
+        """
+        now = self.clock()
+        with self._lock:
+            started_at, current, previous = self._volume.get(key, (now, 0, 0))
+            if now - started_at >= 2 * WINDOW_SECONDS:
+                started_at, current, previous = now, 0, 0
+            elif now - started_at >= WINDOW_SECONDS:
+                started_at, current, previous = started_at + WINDOW_SECONDS, 0, current
+            current += 1
+            self._volume[key] = (started_at, current, previous)
+        return max(current, previous)
+
+
+def _sampling_key(sampling_context: Dict[str, Any]) -> str:
+    environ = sampling_context.get("wsgi_environ")
+    if environ:
+        return environ.get("PATH_INFO") or "/"
+    return (sampling_context.get("transaction_context") or {}).get("name") or ""
+
+
+def _create_policy_backend() -> CacheBackend:
+    backend_type = Config.SENTRY_SAMPLING_POLICY_BACKEND
+    if backend_type == "local":
+        return LocalCacheBackend(max_entries=1)
+    if backend_type == "redis":
+        try:
+            import redis  # only needed for the shared backend
+        except ImportError:
+            # the sampler is built at boot; tracing must not keep the app from starting
+            logger.warning(
+                "redis is not installed, trace sampling policy switches will only "
+                "reach the worker that serves them"
+            )
+            return LocalCacheBackend(max_entries=1)
+        return SharedCacheBackend(redis.Redis.from_url(Config.REDIS_URL))
+    if backend_type == "memory":
+        return SharedCacheBackend(InMemorySharedClient())
+    raise ValueError(f"Unknown sampling policy backend: {backend_type}")
+
+
+_traces_sampler: Optional[TracesSampler] = None
+
+
+def get_traces_sampler() -> TracesSampler:
+    global _traces_sampler
+    if _traces_sampler is None:
+        _traces_sampler = TracesSampler(_create_policy_backend())
+    return _traces_sampler
+
+
+def sample_traces(sampling_context: Dict[str, Any]) -> float:
+    """
+    The `traces_sampler` given to Sentry; looks the sampler up on every call so a
+    swapped sampler takes effect.
+    """
+    return get_traces_sampler()(sampling_context)
+
+
+def set_traces_sampler(sampler: TracesSampler):
+    """
+    Swaps the sampler, e.g. for one with a fake clock in tests.
+    """
+    global _traces_sampler
+    _traces_sampler = sampler
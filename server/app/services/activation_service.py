@@ -10,7 +10,7 @@ from app.data_models import (
     StatusEnum,
     Contact,
 )
-from typing import List, Dict
+from typing import List, Dict, Optional
 from flask import current_app as app
 import asyncio
 from sentry_sdk import capture_exception, set_context
@@ -20,8 +20,8 @@ from app.salesforce_api import (
     fetch_contacts_by_account_ids,
     fetch_events_by_contact_ids_from_date,
     fetch_opportunities_by_account_ids_from_date,
-    fetch_salesforce_users,
     fetch_prospecting_tasks_by_account_ids_from_date_not_in_ids,
+    fetch_team_account_data,
 )
 from app.utils import (
     add_days,
@@ -31,9 +31,13 @@ from app.utils import (
     convert_date_to_salesforce_datetime_format,
     get_team_member_salesforce_ids,
     parse_datetime_string_with_timezone,
+    gather_with_deadline,
 )
 from datetime import datetime, date
 from app.mapper.mapper import convert_dict_to_opportunity
+from config import Config
+from app.database.activation_writer import ActivationWriter
+from app.event_loop import run_blocking
 from app.helpers.activation_helper import (
     increment_prospecting_effort_metadata,
     get_new_status,
@@ -194,7 +198,12 @@ async def increment_existing_activations(
     activations: List[Activation],
     settings: Settings,
     relevant_task_criteria: List[FilterContainer],
+    writer: Optional[ActivationWriter] = None,
 ):
+    """
+    Returns the activations that changed; when a `writer` is given each one is also
+    handed to it as soon as it is final, so upserts overlap the remaining work.
+    """
     response = ApiResponse(data=[], message="", success=False)
     try:
         today = date.today()
@@ -211,12 +220,31 @@ async def increment_existing_activations(
             task_id for activation in activations for task_id in activation.task_ids
         )
 
-        async_response = (
-            await fetch_prospecting_tasks_by_account_ids_from_date_not_in_ids(
+        # tasks, opportunities and Event meetings are independent reads, so they are
+        # fetched together; Task meetings are picked from the fetched tasks instead
+        prefetches = [
+            fetch_prospecting_tasks_by_account_ids_from_date_not_in_ids(
                 benchmark_dt,
                 relevant_task_criteria,
                 already_counted_task_ids,
                 salesforce_user_ids,
+            ),
+            run_blocking(
+                fetch_opportunities_by_account_ids_from_date,
+                account_ids,
+                benchmark_dt,
+                salesforce_user_ids,
+            ),
+        ]
+        if settings.meeting_object == "Event":
+            prefetches.append(
+                get_meetings_by_account_id_via_activations(
+                    settings, activations, {}, benchmark_dt, salesforce_user_ids
+                )
+            )
+        async_response, opportunities_response, *prefetched_meetings = (
+            await gather_with_deadline(
+                *prefetches, timeout=Config.ACTIVATION_PREFETCH_TIMEOUT_SECONDS
             )
         )
 
@@ -229,14 +257,14 @@ async def increment_existing_activations(
         }
 
         opportunities_by_account_id: List[Dict] = group_by(
-            fetch_opportunities_by_account_ids_from_date(
-                account_ids, benchmark_dt, salesforce_user_ids
-            ).data,
+            opportunities_response.data,
             "AccountId",
         )
 
         meetings_by_account_id: Dict[str, List[Dict]] = (
-            await get_meetings_by_account_id_via_activations(
+            prefetched_meetings[0]
+            if prefetched_meetings
+            else await get_meetings_by_account_id_via_activations(
                 settings,
                 activations,
                 criteria_group_tasks_by_account_id,
@@ -462,6 +490,8 @@ async def increment_existing_activations(
             # Check if the activation has changed
             if activation != original_activation:
                 changed_activations.append(activation)
+                if writer:
+                    await writer.put(activation)
 
         response.data = changed_activations
         response.success = True
@@ -472,7 +502,9 @@ async def increment_existing_activations(
 
 
 async def compute_activated_accounts(
-    criteria_tasks_by_who_id_by_account_id, settings
+    criteria_tasks_by_who_id_by_account_id,
+    settings,
+    writer: Optional[ActivationWriter] = None,
 ) -> ApiResponse:
     """
     This function, `compute_activated_accounts`, is designed to process a collection of tasks, contacts, and settings to identify and construct activations for accounts.
@@ -482,6 +514,8 @@ async def compute_activated_accounts(
     - `criteria_tasks_by_who_id_by_account_id` (dict): A dictionary where each key represents a specific criteria name and each value is a list of task objects that meet that criteria.
     - `settings` (dict): A dictionary containing various settings that influence the activation computation. This includes:
 
+    - `writer` (ActivationWriter, optional): receives each account's activations as soon as they are computed.
+
     Returns:
     - `ApiResponse`: `data` parameter contains all activations and any relevant messages.
     """
@@ -491,30 +525,37 @@ async def compute_activated_accounts(
     ):
         print("Fetching account data")
         salesforce_user_ids = get_team_member_salesforce_ids(settings)
-        print("Fetching salesforce users")
-        salesforce_user_by_id = group_by(
-            fetch_salesforce_users(salesforce_user_ids).data, "id"
-        )
-        print("Fetching first prospecting activity date")
-        first_prospecting_activity = get_first_prospecting_activity_date(
-            criteria_tasks_by_who_id_by_account_id
+        contact_ids = (
+            [
+                contact.id
+                for contact in extract_contacts_from_account_criteria_task_map(
+                    criteria_tasks_by_who_id_by_account_id
+                )
+            ]
+            if settings.meeting_object == "Event"
+            else None
         )
-        print("Fetching opportunities by account id")
-        opportunity_by_account_id = group_by(
-            fetch_opportunities_by_account_ids_from_date(
+        print("Fetching salesforce users, opportunities and events")
+        users, opportunities, meetings_by_contact_id = await asyncio.wait_for(
+            fetch_team_account_data(
+                salesforce_user_ids,
                 list(criteria_tasks_by_who_id_by_account_id.keys()),
                 first_prospecting_activity,
-                salesforce_user_ids,
-            ).data,
-            "AccountId",
+                contact_ids,
+                settings.meetings_criteria,
+            ),
+            timeout=Config.ACTIVATION_PREFETCH_TIMEOUT_SECONDS,
         )
+        salesforce_user_by_id = group_by(users.data, "id")
+        opportunity_by_account_id = group_by(opportunities.data, "AccountId")
 
-        print("Fetching meetings by account id")
+        print("Grouping meetings by account id")
         meetings_by_account_id = await get_meetings_by_account_id(
             settings,
             criteria_tasks_by_who_id_by_account_id,
             first_prospecting_activity,
             salesforce_user_ids,
+            meetings_by_contact_id=meetings_by_contact_id.data,
         )
         print("Account data fetched successfully")
         return salesforce_user_by_id, opportunity_by_account_id, meetings_by_account_id
@@ -834,6 +875,8 @@ async def compute_activated_accounts(
                     raise e
 
             response.data.extend(activations)
+            if writer:
+                await writer.put_many(activations)
 
     except Exception as e:
         raise Exception(format_error_message(e))
@@ -844,6 +887,15 @@ async def compute_activated_accounts(
 # helpers with side effects
 
 
+def _extend_meetings(account_meetings: List[Dict], meetings: List[Dict]):
+    # a group event shows up once per invited contact, but counts once per account
+    seen_ids = {meeting.get("Id") for meeting in account_meetings}
+    for meeting in meetings:
+        if meeting.get("Id") not in seen_ids:
+            seen_ids.add(meeting.get("Id"))
+            account_meetings.append(meeting)
+
+
 # Difference between this and get_meetings_by_account_id is that we cannot assume
 # our contacts are already fetched and contained in the criteria_tasks_by_who_id_by_account_id map...
 # it's meant to be used for the incrementation of activations already in our database
@@ -864,11 +916,14 @@ async def get_meetings_by_account_id_via_activations(
         contact_by_id = {contact.id: contact for contact in contacts}
         contact_ids = list(contact_by_id.keys())
 
-        meetings_by_contact_id = fetch_events_by_contact_ids_from_date(
-            contact_ids,
-            first_prospecting_activity,
-            salesforce_user_ids,
-            settings.meetings_criteria,
+        meetings_by_contact_id = (
+            await run_blocking(
+                fetch_events_by_contact_ids_from_date,
+                contact_ids,
+                first_prospecting_activity,
+                salesforce_user_ids,
+                settings.meetings_criteria,
+            )
         ).data
 
         for contact_id, meetings in meetings_by_contact_id.items():
@@ -877,7 +932,7 @@ async def get_meetings_by_account_id_via_activations(
             if account_id not in meetings_by_account_id:
                 meetings_by_account_id[account_id] = []
 
-            meetings_by_account_id[account_id].extend(meetings)
+            _extend_meetings(meetings_by_account_id[account_id], meetings)
     elif settings.meeting_object == "Task":
         for (
             account_id,
@@ -903,7 +958,12 @@ async def get_meetings_by_account_id(
     criteria_tasks_by_who_id_by_account_id: Dict[str, Dict[str, List[Dict]]],
     first_prospecting_activity: datetime,
     salesforce_user_ids: list[str],
+    meetings_by_contact_id: Optional[Dict[str, List[Dict]]] = None,
 ):
+    """
+    `meetings_by_contact_id` takes events already fetched for the map's contacts,
+    e.g. by `fetch_team_account_data`, instead of fetching them here.
+    """
     meetings_by_account_id = {}
 
     contacts: list[Contact] = extract_contacts_from_account_criteria_task_map(
@@ -913,12 +973,16 @@ async def get_meetings_by_account_id(
     if settings.meeting_object == "Event":
         contact_ids = list(contact_by_id.keys())
 
-        meetings_by_contact_id = fetch_events_by_contact_ids_from_date(
-            contact_ids,
-            first_prospecting_activity,
-            salesforce_user_ids,
-            settings.meetings_criteria,
-        ).data
+        if meetings_by_contact_id is None:
+            meetings_by_contact_id = (
+                await run_blocking(
+                    fetch_events_by_contact_ids_from_date,
+                    contact_ids,
+                    first_prospecting_activity,
+                    salesforce_user_ids,
+                    settings.meetings_criteria,
+                )
+            ).data
 
         for contact_id, meetings in meetings_by_contact_id.items():
             if contact_id not in contact_by_id:
@@ -928,7 +992,7 @@ async def get_meetings_by_account_id(
             if account_id not in meetings_by_account_id:
                 meetings_by_account_id[account_id] = []
 
-            meetings_by_account_id[account_id].extend(meetings)
+            _extend_meetings(meetings_by_account_id[account_id], meetings)
     elif settings.meeting_object == "Task":
         for (
             account_id,
@@ -0,0 +1,118 @@
+import hashlib
+from typing import Dict, List, Optional
+
+from config import Config
+from app.cache.backends import CacheBackend, LocalCacheBackend
+from app.data_models import ApiResponse
+from app.database.supabase_connection import get_session_state
+from app.metrics import record_cache_lookup
+from app.salesforce_api import (
+    VALID_FIELD_TYPES,
+    _fetch_object_fields,
+    fetch_events_by_user_ids,
+    fetch_tasks_by_user_ids,
+    get_credentials,
+)
+
+PREVIEW_ROW_LIMIT = 1000
+
+_describe_backend: Optional[CacheBackend] = None
+_preview_backend: Optional[CacheBackend] = None
+
+
+def get_preview_cache_backends():
+    global _describe_backend, _preview_backend
+    if _describe_backend is None or _preview_backend is None:
+        _describe_backend = LocalCacheBackend(
+            max_entries=Config.ONBOARDING_PREVIEW_CACHE_MAX_ENTRIES,
+            default_ttl=Config.ONBOARDING_DESCRIBE_CACHE_TTL_SECONDS,
+        )
+        _preview_backend = LocalCacheBackend(
+            max_entries=Config.ONBOARDING_PREVIEW_CACHE_MAX_ENTRIES,
+            default_ttl=Config.ONBOARDING_PREVIEW_CACHE_TTL_SECONDS,
+        )
+    return _describe_backend, _preview_backend
+
+
+def set_preview_cache_backends(
+    describe_backend: CacheBackend, preview_backend: CacheBackend
+):
+    """
+    Swaps the cache backends, e.g. to fresh local backends in tests.
+    """
+    global _describe_backend, _preview_backend
+    _describe_backend = describe_backend
+    _preview_backend = preview_backend
+
+
+def load_sobject_fields(sobject_type: str) -> List[Dict]:
+    """
+    Returns the describe of `sobject_type` for the caller's org. Field metadata
+    rarely changes, so it is shared by every user of the org for the cache TTL.
+    """
+    describe_backend, _ = get_preview_cache_backends()
+    _, instance_url = get_credentials()
+    key = f"describe:{instance_url}:{sobject_type}"
+
+    fields = describe_backend.get(key)
+    record_cache_lookup("onboarding_describe", fields is not None)
+    if fields is None:
+        response = _fetch_object_fields(sobject_type, get_credentials())
+        if not response.success:
+            raise Exception(response.message)
+        fields = response.data
+        describe_backend.set(key, fields)
+    return fields
+
+
+def select_preview_fields(sobject_type: str) -> List[str]:
+    """
+    Returns every field the onboarding tables can show, i.e. the columns users may
+    add from the describe, leading with Id so rows can be selected by the client.
+    """
+    fields = ["Id"]
+    for field in load_sobject_fields(sobject_type):
+        if field["type"] in VALID_FIELD_TYPES and field["name"] not in fields:
+            fields.append(field["name"])
+    return fields
+
+
+def fetch_preview_records(
+    sobject_type: str,
+    user_ids: List[str],
+    limit: int = PREVIEW_ROW_LIMIT,
+) -> ApiResponse:
+    """
+    Returns sample Task or Event records owned by `user_ids` for the onboarding
+    tables, holding on to recent samples per viewer so flipping back and forth
+    between users does not query Salesforce again. Samples carry every column the
+    tables can add, so toggling columns needs no new query.
+    """
+    _, preview_backend = get_preview_cache_backends()
+    columns = select_preview_fields(sobject_type)
+    _, instance_url = get_credentials()
+
+    # record visibility depends on who is looking, so samples are cached per viewer
+    scope = "|".join(
+        [
+            instance_url,
+            get_session_state().get("salesforce_id") or "",
+            sobject_type,
+            ",".join(sorted(set(user_ids))),
+            ",".join(columns),
+            str(limit),
+        ]
+    )
+    key = "preview:" + hashlib.sha1(scope.encode("utf-8")).hexdigest()
+
+    records = preview_backend.get(key)
+    record_cache_lookup("onboarding_preview", records is not None)
+    if records is None:
+        fetch_records = (
+            fetch_tasks_by_user_ids
+            if sobject_type == "Task"
+            else fetch_events_by_user_ids
+        )
+        records = fetch_records(user_ids, limit, fields=columns).data
+        preview_backend.set(key, records)
+    return ApiResponse(data=records, message="", success=True)
@@ -0,0 +1,94 @@
+from typing import Any, Dict, Iterable, Iterator
+
+from flask import Response, current_app, request, stream_with_context
+
+from app.data_models import ApiResponse
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# rows serialized per chunk written to the socket
+ROWS_PER_CHUNK = 100
+
+
+def wants_ndjson() -> bool:
+    """
+    True when the client asked for newline-delimited JSON, either with
+    `?format=ndjson` or an Accept header preferring `application/x-ndjson`.
+    """
+    if request.args.get("format") == "ndjson":
+        return True
+    return (
+        request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+        == NDJSON_MIMETYPE
+    )
+
+
+def stream_api_response(
+    response: ApiResponse, head: Dict[str, Any], rows_key: str, rows: Iterable[Any]
+) -> Response:
+    """
+    Streams `response` with a single data entry made of `head` plus `rows` under
+    `rows_key`, serializing rows as they are consumed instead of building the
+    whole body in memory first.
+
+    The JSON body is the same document `jsonify(response.to_dict())` would produce.
+    In NDJSON mode the first line is that document without the rows and every
+    following line is one row, for clients that export rows as they arrive.
+    """
+    if wants_ndjson():
+        body = _iter_ndjson(response, head, rows)
+        mimetype = NDJSON_MIMETYPE
+    else:
+        body = _iter_json(response, head, rows_key, rows)
+        mimetype = "application/json"
+    return Response(stream_with_context(body), status=200, mimetype=mimetype)
+
+
+def _dumps(value: Any) -> str:
+    # the app's provider, so dates and models render exactly like they do through jsonify
+    return current_app.json.dumps(value)
+
+
+def _envelope(response: ApiResponse) -> Dict[str, Any]:
+    envelope = response.to_dict()
+    del envelope["data"]
+    return envelope
+
+
+def _iter_json(
+    response: ApiResponse, head: Dict[str, Any], rows_key: str, rows: Iterable[Any]
+) -> Iterator[str]:
+    # `{"data": [{<head>, "<rows_key>": [` ... `]}], <envelope>}`
+    head_members = _dumps(head)[1:-1]
+    yield (
+        '{"data": [{'
+        + (head_members + ", " if head_members else "")
+        + _dumps(rows_key)
+        + ": ["
+    )
+
+    buffer = []
+    for index, row in enumerate(rows):
+        buffer.append(("," if index else "") + _dumps(row))
+        if len(buffer) >= ROWS_PER_CHUNK:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+    yield "]}], " + _dumps(_envelope(response))[1:]
+
+
+def _iter_ndjson(
+    response: ApiResponse, head: Dict[str, Any], rows: Iterable[Any]
+) -> Iterator[str]:
+    yield _dumps({"data": [head], **_envelope(response)}) + "\n"
+
+    buffer = []
+    for row in rows:
+        buffer.append(_dumps(row) + "\n")
+        if len(buffer) >= ROWS_PER_CHUNK:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
@@ -0,0 +1,80 @@
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from flask import Flask, g
+from app.cache.backends import LocalCacheBackend
+from app.cache.session_cache import (
+    get_authenticated_session,
+    invalidate_session,
+    set_session_cache_backend,
+)
+from app.data_models import AuthenticationError, SessionNotFoundError
+from app.middleware import authenticate
+
+FETCH_SESSION = "app.cache.session_cache.fetch_supabase_session"
+
+
+def get_mock_session(expiry: datetime):
+    return {
+        "id": "mock_session_token",
+        "expiry": expiry.isoformat(),
+        "state": json.dumps({"salesforce_id": "mock_user_id", "access_token": "x"}),
+    }
+
+
+@pytest.fixture(autouse=True)
+def session_cache():
+    set_session_cache_backend(LocalCacheBackend(max_entries=16, default_ttl=60))
+
+
+class TestSessionCache:
+    def test_should_fetch_each_session_once_within_ttl(self):
+        session = get_mock_session(datetime.now(timezone.utc) + timedelta(days=1))
+        with patch(FETCH_SESSION, return_value=session) as fetch:
+            first, _ = get_authenticated_session("mock_session_token")
+            first["salesforce_id"] = "changed by caller"
+            second, _ = get_authenticated_session("mock_session_token")
+
+        assert fetch.call_count == 1
+        assert second["salesforce_id"] == "mock_user_id"
+
+    def test_should_refetch_after_invalidation(self):
+        session = get_mock_session(datetime.now(timezone.utc) + timedelta(days=1))
+        with patch(FETCH_SESSION, return_value=session) as fetch:
+            get_authenticated_session("mock_session_token")
+            invalidate_session("mock_session_token")
+            get_authenticated_session("mock_session_token")
+
+        assert fetch.call_count == 2
+
+    def test_should_cache_unknown_tokens(self):
+        with patch(FETCH_SESSION, side_effect=SessionNotFoundError()) as fetch:
+            for _ in range(3):
+                with pytest.raises(SessionNotFoundError):
+                    get_authenticated_session("unknown_token")
+
+        assert fetch.call_count == 1
+
+    def test_should_not_cache_transient_failures(self):
+        with patch(
+            FETCH_SESSION, side_effect=AuthenticationError("Error fetching session")
+        ) as fetch:
+            for _ in range(2):
+                with pytest.raises(AuthenticationError):
+                    get_authenticated_session("mock_session_token")
+
+        assert fetch.call_count == 2
+
+    def test_middleware_should_still_reject_expired_cached_sessions(self):
+        app = Flask(__name__)
+        session = get_mock_session(datetime.now(timezone.utc) - timedelta(minutes=1))
+
+        @authenticate
+        def route():
+            return g.session_state["salesforce_id"]
+
+        with app.test_request_context(headers={"X-Session-Token": "mock_session_token"}):
+            with patch(FETCH_SESSION, return_value=session):
+                with pytest.raises(AuthenticationError, match="Session expired"):
+                    route()
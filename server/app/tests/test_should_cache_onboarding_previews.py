@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import patch
+from app.cache.backends import LocalCacheBackend
+from app.data_models import ApiResponse, CriteriaField, TableColumn
+from app.services.onboarding_preview_service import (
+    fetch_preview_records,
+    set_preview_cache_backends,
+)
+from app.services.setting_service import define_criteria_from_events_or_tasks
+
+SERVICE = "app.services.onboarding_preview_service"
+
+TASK_DESCRIBE = [
+    {"name": "Id", "type": "id"},
+    {"name": "Subject", "type": "string"},
+    {"name": "Status", "type": "picklist"},
+    {"name": "TaskSubtype", "type": "picklist"},
+    {"name": "Description", "type": "textarea"},
+    {"name": "Priority", "type": "picklist"},
+]
+
+
+@pytest.fixture(autouse=True)
+def preview_caches():
+    set_preview_cache_backends(
+        LocalCacheBackend(max_entries=16, default_ttl=60),
+        LocalCacheBackend(max_entries=16, default_ttl=60),
+    )
+
+
+@pytest.fixture
+def salesforce():
+    viewer = {"salesforce_id": "mock_user_id"}
+    with patch(
+        f"{SERVICE}.get_credentials",
+        return_value=("mock_access_token", "https://mock.my.salesforce.com"),
+    ), patch(f"{SERVICE}.get_session_state", side_effect=lambda: viewer), patch(
+        f"{SERVICE}._fetch_object_fields",
+        return_value=ApiResponse(data=TASK_DESCRIBE, success=True),
+    ) as describe, patch(
+        f"{SERVICE}.fetch_tasks_by_user_ids",
+        side_effect=lambda user_ids, limit, fields: ApiResponse(
+            data=[{field: f"mock_{field}" for field in fields}], success=True
+        ),
+    ) as fetch_tasks:
+        yield describe, fetch_tasks, viewer
+
+
+class TestOnboardingPreviewService:
+    def test_should_fetch_every_column_the_tables_can_add(self, salesforce):
+        _, fetch_tasks, _ = salesforce
+
+        records = fetch_preview_records("Task", ["mock_user_id"]).data
+
+        # Description is a textarea, which the tables never offer as a column
+        assert fetch_tasks.call_args.kwargs["fields"] == [
+            "Id",
+            "Subject",
+            "Status",
+            "TaskSubtype",
+            "Priority",
+        ]
+        assert "Priority" in records[0]
+
+    def test_should_build_criteria_on_a_toggled_column_without_refetching(
+        self, salesforce
+    ):
+        _, fetch_tasks, _ = salesforce
+        columns = [
+            TableColumn(id="Subject", dataType="string", label="Subject"),
+            TableColumn(id="Status", dataType="string", label="Status"),
+        ]
+        task_fields = [
+            CriteriaField(name=name, type="picklist", options=[])
+            for name in ("Subject", "Status", "Priority")
+        ]
+
+        fetch_preview_records("Task", ["mock_user_id"])
+        # the user adds Priority from the available columns
+        columns.append(TableColumn(id="Priority", dataType="string", label="Priority"))
+        records = fetch_preview_records("Task", ["mock_user_id"]).data
+        criteria = define_criteria_from_events_or_tasks(records, columns, task_fields)
+
+        assert fetch_tasks.call_count == 1
+        assert {"field": "Priority", "value": "mock_Priority"} in [
+            {"field": f.field, "value": f.value} for f in criteria.filters
+        ]
+
+    def test_should_reuse_describes_and_recent_samples(self, salesforce):
+        describe, fetch_tasks, _ = salesforce
+
+        for user_ids in (["a", "b"], ["c"], ["b", "a"], ["c"]):
+            fetch_preview_records("Task", user_ids)
+
+        assert describe.call_count == 1
+        assert fetch_tasks.call_count == 2
+
+    def test_should_keep_samples_per_viewer(self, salesforce):
+        describe, fetch_tasks, viewer = salesforce
+
+        fetch_preview_records("Task", ["mock_teammate_id"])
+        viewer["salesforce_id"] = "mock_other_user_id"
+        fetch_preview_records("Task", ["mock_teammate_id"])
+
+        # the describe is shared across the org, the records are not
+        assert describe.call_count == 1
+        assert fetch_tasks.call_count == 2
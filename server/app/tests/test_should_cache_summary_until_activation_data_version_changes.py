@@ -0,0 +1,115 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+from app import create_app
+from app.cache.backends import (
+    InMemorySharedClient,
+    LocalCacheBackend,
+    SharedCacheBackend,
+)
+from app.cache.summary_cache import (
+    _create_backends,
+    _dumps,
+    bump_data_version,
+    get_or_compute_summary,
+    set_summary_cache_backend,
+)
+
+
+def local_backend():
+    return LocalCacheBackend(max_entries=16, default_ttl=60)
+
+
+def shared_backend():
+    return SharedCacheBackend(InMemorySharedClient(), dumps=_dumps)
+
+
+@pytest.fixture(params=[local_backend, shared_backend], ids=["local", "shared"])
+def backend(request):
+    backend = request.param()
+    set_summary_cache_backend(backend)
+    yield backend
+
+
+class TestSummaryCache:
+    def test_should_return_cached_payload_while_data_version_is_unchanged(
+        self, backend
+    ):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"summary": {"total_activations": len(calls)}, "raw_data": []}
+
+        first = get_or_compute_summary(["user_a", "user_b"], "All", [], compute)
+        second = get_or_compute_summary(["user_b", "user_a"], "All", [], compute)
+
+        assert len(calls) == 1
+        assert first == second
+
+    def test_should_recompute_after_team_member_data_version_is_bumped(
+        self, backend
+    ):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"summary": {"total_activations": len(calls)}, "raw_data": []}
+
+        get_or_compute_summary(["user_a", "user_b"], "All", [], compute)
+        bump_data_version(["user_b"])
+        payload = get_or_compute_summary(["user_a", "user_b"], "All", [], compute)
+
+        assert len(calls) == 2
+        assert payload["summary"]["total_activations"] == 2
+
+    def test_should_not_invalidate_other_teams(self, backend):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"summary": {}, "raw_data": []}
+
+        get_or_compute_summary(["user_c"], "This Week", [], compute)
+        bump_data_version(["user_a"])
+        get_or_compute_summary(["user_c"], "This Week", [], compute)
+
+        assert len(calls) == 1
+
+    def test_should_key_filter_ids_separately_from_period(self, backend):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"summary": {}, "raw_data": []}
+
+        get_or_compute_summary(["user_a"], "All", [], compute)
+        get_or_compute_summary(["user_a"], "All", ["id_2", "id_1"], compute)
+        get_or_compute_summary(["user_a"], "All", ["id_1", "id_2"], compute)
+
+        assert len(calls) == 2
+
+
+def test_shared_backend_should_encode_dates_like_flask():
+    backend = shared_backend()
+    backend.set("key", {"last_prospecting_activity": date(2024, 1, 2)})
+
+    assert backend.get("key") == {
+        "last_prospecting_activity": "Tue, 02 Jan 2024 00:00:00 GMT"
+    }
+
+
+def test_local_backend_should_refuse_several_workers():
+    with patch("config.Config.SUMMARY_CACHE_BACKEND", "local"), patch(
+        "config.Config.WEB_CONCURRENCY", 4
+    ):
+        with pytest.raises(ValueError, match="single worker"):
+            _create_backends()
+
+
+def test_app_should_refuse_to_boot_with_a_local_cache_under_several_workers():
+    with patch("config.Config.SUMMARY_CACHE_BACKEND", "local"), patch(
+        "config.Config.WEB_CONCURRENCY", 4
+    ), patch("app.cache.summary_cache._summary_backend", None):
+        with pytest.raises(ValueError, match="single worker"):
+            create_app()
@@ -0,0 +1,147 @@
+import gzip
+import pytest
+from unittest.mock import patch
+from flask import Flask, jsonify
+from app.cache.backends import (
+    InMemorySharedClient,
+    LocalCacheBackend,
+    SharedCacheBackend,
+)
+from app.cache.summary_cache import bump_data_version, set_summary_cache_backend
+from app.data_models import ApiResponse
+from app.http_cache import (
+    activation_data_etag,
+    compress_response,
+    is_not_modified,
+    make_conditional,
+    not_modified,
+    set_etag,
+)
+from app.streaming import stream_api_response
+
+ROWS = [{"id": f"mock_activation_{i}", "status": "Activated"} for i in range(500)]
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.after_request(compress_response)
+
+    @app.route("/buffered")
+    def buffered():
+        response = ApiResponse(data=ROWS, message="", success=True)
+        return make_conditional(jsonify(response.to_dict()))
+
+    @app.route("/streamed", methods=["POST"])
+    def streamed():
+        etag = "mock_data_version"
+        if is_not_modified(etag):
+            return not_modified(etag)
+        response = ApiResponse(data=[], message="", success=True)
+        return set_etag(
+            stream_api_response(response, {}, "raw_data", iter(ROWS)), etag
+        )
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class TestCompressedConditionalResponses:
+    def test_should_gzip_buffered_json_when_accepted(self, client):
+        identity = client.get("/buffered")
+        encoded = client.get("/buffered", headers={"Accept-Encoding": "gzip"})
+
+        assert "Content-Encoding" not in identity.headers
+        assert encoded.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in encoded.headers["Vary"]
+        assert gzip.decompress(encoded.get_data()) == identity.get_data()
+        # the encoded body is a different representation, so it gets its own strong tag
+        assert encoded.get_etag() == (identity.get_etag()[0] + "-gzip", False)
+
+    def test_should_gzip_streamed_json_chunk_by_chunk(self, client):
+        identity = client.post("/streamed")
+        encoded = client.post("/streamed", headers={"Accept-Encoding": "gzip"})
+
+        assert encoded.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in encoded.headers
+        assert gzip.decompress(encoded.get_data()) == identity.get_data()
+
+    def test_should_answer_304_for_matching_etags(self, client):
+        first = client.get("/buffered", headers={"Accept-Encoding": "gzip"})
+        etag = first.headers["ETag"]
+
+        second = client.get(
+            "/buffered",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+        )
+        posted = client.post(
+            "/streamed", headers={"If-None-Match": '"mock_data_version"'}
+        )
+
+        assert second.status_code == 304
+        assert second.headers["ETag"] == etag
+        assert second.get_data() == b""
+        assert posted.status_code == 304
+
+    def test_should_not_compress_small_bodies(self, app):
+        @app.route("/small")
+        def small():
+            return jsonify({"success": True})
+
+        response = app.test_client().get(
+            "/small", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert "Content-Encoding" not in response.headers
+
+
+class TestActivationDataEtag:
+    def test_should_change_when_team_data_changes(self):
+        set_summary_cache_backend(LocalCacheBackend(max_entries=16))
+        app = Flask(__name__)
+
+        def etag_for(body):
+            with app.test_request_context("/activations", method="POST", json=body):
+                return activation_data_etag()
+
+        with patch(
+            "app.http_cache.load_salesforce_team_ids",
+            return_value=["mock_user_id", "mock_teammate_id"],
+        ), patch(
+            "app.http_cache.get_session_state",
+            return_value={"salesforce_id": "mock_user_id"},
+        ):
+            first = etag_for({"period": "All"})
+            assert etag_for({"period": "All"}) == first
+            assert etag_for({"period": "Today"}) != first
+
+            bump_data_version(["mock_teammate_id"])
+
+            assert etag_for({"period": "All"}) != first
+
+    def test_should_not_match_tags_from_another_process_with_local_versions(self):
+        set_summary_cache_backend(LocalCacheBackend(max_entries=16))
+        app = Flask(__name__)
+
+        def etag_for():
+            with app.test_request_context("/activations", method="POST", json={}):
+                return activation_data_etag()
+
+        with patch(
+            "app.http_cache.load_salesforce_team_ids", return_value=["mock_user_id"]
+        ), patch(
+            "app.http_cache.get_session_state",
+            return_value={"salesforce_id": "mock_user_id"},
+        ):
+            first = etag_for()
+            with patch("app.http_cache._BOOT_ID", "mock_other_boot"):
+                assert etag_for() != first
+
+            set_summary_cache_backend(SharedCacheBackend(InMemorySharedClient()))
+            shared = etag_for()
+            with patch("app.http_cache._BOOT_ID", "mock_other_boot"):
+                assert etag_for() == shared
@@ -0,0 +1,119 @@
+import json
+from datetime import date, datetime
+from app.data_models import (
+    Account,
+    Activation,
+    Contact,
+    Opportunity,
+    ProspectingEffort,
+    ProspectingMetadata,
+    TaskRecord,
+    UserModel,
+)
+from app.mapper.mapper import (
+    encode_activations_for_upsert,
+    python_activation_to_supabase_dict,
+)
+
+JSONB_FIELDS = [
+    "account",
+    "active_contacts",
+    "tasks",
+    "prospecting_metadata",
+    "prospecting_effort",
+]
+
+
+def get_mock_activation(with_effort: bool = True):
+    account = Account(id="mock_account_id", name="Mock Account")
+    task = TaskRecord.from_sobject(
+        {
+            "Id": "mock_task_id",
+            "WhoId": "mock_contact_id",
+            "Subject": "Email",
+            "CreatedDate": "2024-01-02T10:00:00.000+0000",
+        }
+    )
+    metadata = ProspectingMetadata(
+        name="Unique Content",
+        total=1,
+        first_occurrence=date(2024, 1, 2),
+        last_occurrence=date(2024, 1, 2),
+        task_ids=["mock_task_id"],
+    )
+    return Activation(
+        id="mock_activation_id",
+        account=account,
+        activated_by=UserModel(id="mock_user_id", created_at=datetime(2024, 1, 1)),
+        activated_date=date(2024, 1, 2),
+        active_contact_ids={"mock_contact_id"},
+        active_contacts=[
+            Contact(
+                id="mock_contact_id",
+                first_name="Mock",
+                last_name="Contact",
+                account_id="mock_account_id",
+            )
+        ],
+        task_ids={"mock_task_id"},
+        tasks=[task],
+        event_ids=set(),
+        opportunity=Opportunity(
+            id="mock_opportunity_id",
+            name="Mock Opportunity",
+            amount=10.5,
+            close_date=date(2024, 2, 1),
+            created_date=date(2024, 1, 3),
+            stage="Prospecting",
+        ),
+        prospecting_metadata=[metadata] if with_effort else [],
+        prospecting_effort=(
+            [
+                ProspectingEffort(
+                    activation_id="mock_activation_id",
+                    prospecting_metadata=[metadata],
+                    status="Activated",
+                    date_entered=date(2024, 1, 2),
+                    task_ids={"mock_task_id"},
+                )
+            ]
+            if with_effort
+            else []
+        ),
+    )
+
+
+def legacy_payload(activation):
+    row = python_activation_to_supabase_dict(activation)
+    for field in JSONB_FIELDS:
+        if isinstance(row.get(field), str):
+            row[field] = json.loads(row[field])
+    return row
+
+
+class TestActivationUpsertEncoding:
+    def test_should_match_the_dumps_then_loads_payload(self):
+        activations = [get_mock_activation(), get_mock_activation(with_effort=False)]
+
+        encoded = json.loads(encode_activations_for_upsert(activations))
+
+        for row, activation in zip(encoded, activations):
+            expected = legacy_payload(activation)
+            assert set(row) == set(expected)
+            for key in expected.keys() - {"created_at"}:
+                assert row[key] == expected[key], key
+
+
+class TestSerializableModel:
+    def test_should_return_json_ready_values(self):
+        activation_dict = get_mock_activation().to_dict()
+
+        assert activation_dict["activated_date"] == "2024-01-02"
+        assert activation_dict["task_ids"] == ["mock_task_id"]
+        assert activation_dict["status"] == "Activated"
+        assert activation_dict["tasks"][0]["Id"] == "mock_task_id"
+        assert activation_dict["opportunity"]["close_date"] == "2024-02-01"
+        assert activation_dict["prospecting_effort"][0]["prospecting_metadata"][0][
+            "first_occurrence"
+        ] == "2024-01-02"
+        json.dumps(activation_dict)
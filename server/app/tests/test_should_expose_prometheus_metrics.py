@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import pytest
+from app import create_app
+from app.cache.backends import LocalCacheBackend
+from app.cache.summary_cache import get_or_compute_summary, set_summary_cache_backend
+from app.instrumentation import record_loop_lag, record_slow_callback
+from app.metrics import (
+    CACHE_LOOKUPS,
+    EVENT_LOOP_LAG,
+    EVENT_LOOP_SLOW_CALLBACKS,
+    EVENT_LOOP_STALLS,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+)
+
+
+class TestMetricsRegistry:
+    def test_should_render_cumulative_histogram_buckets(self):
+        registry = MetricsRegistry()
+        histogram = registry.register(
+            Histogram("mock_seconds", "Mock latency.", ("route",), buckets=(0.1, 1))
+        )
+        counter = registry.register(Counter("mock_total", "Mock calls.", ("route",)))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, route='/mock"route')
+        counter.inc(route="/mock")
+
+        assert registry.render().splitlines() == [
+            "# HELP mock_seconds Mock latency.",
+            "# TYPE mock_seconds histogram",
+            'mock_seconds_bucket{route="/mock\\"route",le="0.1"} 2',
+            'mock_seconds_bucket{route="/mock\\"route",le="1"} 3',
+            'mock_seconds_bucket{route="/mock\\"route",le="+Inf"} 4',
+            'mock_seconds_sum{route="/mock\\"route"} 3.65',
+            'mock_seconds_count{route="/mock\\"route"} 4',
+            "# HELP mock_total Mock calls.",
+            "# TYPE mock_total counter",
+            'mock_total{route="/mock"} 1',
+        ]
+
+    def test_should_count_summary_cache_hits_and_misses(self):
+        set_summary_cache_backend(LocalCacheBackend(max_entries=16, default_ttl=60))
+        hits = CACHE_LOOKUPS.value(cache="summary", result="hit")
+        misses = CACHE_LOOKUPS.value(cache="summary", result="miss")
+
+        for _ in range(3):
+            get_or_compute_summary(["mock_user_id"], "All", [], lambda: {"summary": {}})
+
+        assert CACHE_LOOKUPS.value(cache="summary", result="miss") == misses + 1
+        assert CACHE_LOOKUPS.value(cache="summary", result="hit") == hits + 2
+
+    def test_should_count_loop_lag_stalls_and_slow_callbacks(self):
+        lags = EVENT_LOOP_LAG.count()
+        stalls = EVENT_LOOP_STALLS.value()
+        slow_callbacks = EVENT_LOOP_SLOW_CALLBACKS.value()
+
+        with patch("config.Config.EVENT_LOOP_BLOCKING_THRESHOLD_SECONDS", 0.1):
+            record_loop_lag(0.002)
+            record_loop_lag(0.25)
+        record_slow_callback("<Handle mock_callback()>", 0.3)
+
+        assert EVENT_LOOP_LAG.count() == lags + 2
+        assert EVENT_LOOP_STALLS.value() == stalls + 1
+        assert EVENT_LOOP_SLOW_CALLBACKS.value() == slow_callbacks + 1
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+    with patch(
+        "app.middleware.get_authenticated_session",
+        return_value=({"salesforce_id": "mock_user_id"}, expiry),
+    ), patch(
+        "app.routes.get_session_state", return_value={"salesforce_id": "mock_user_id"}
+    ):
+        yield app.test_client()
+
+
+class TestMetricsEndpoint:
+    def test_should_expose_request_latency_by_route(self, client):
+        for job_id in ("mock_job_1", "mock_job_2"):
+            client.get(
+                "/get_engine_run_reports",
+                query_string={"job_id": job_id},
+                headers={"X-Session-Token": "mock_session_token"},
+            )
+
+        response = client.get("/metrics")
+        body = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        assert (
+            'http_request_duration_seconds_count{method="GET",'
+            'route="/get_engine_run_reports",status="200"}'
+        ) in body
+        assert "# TYPE remote_calls_total counter" in body
+        assert "# TYPE engine_run_duration_seconds histogram" in body
+
+    def test_should_require_the_metrics_token_when_set(self, client):
+        with patch("config.Config.METRICS_TOKEN", "mock_metrics_token"):
+            assert client.get("/metrics").status_code == 401
+            response = client.get(
+                "/metrics", headers={"Authorization": "Bearer mock_metrics_token"}
+            )
+            assert response.status_code == 200
+
+    def test_should_hide_metrics_without_a_token_outside_development(self, client):
+        with patch("config.Config.ENVIRONMENT", "production"):
+            assert client.get("/metrics").status_code == 404
+            with patch("config.Config.METRICS_TOKEN", "mock_metrics_token"):
+                response = client.get(
+                    "/metrics", headers={"Authorization": "Bearer mock_metrics_token"}
+                )
+                assert response.status_code == 200
@@ -0,0 +1,112 @@
+import pytest
+from unittest.mock import patch
+from app.data_models import ApiResponse, FilterContainer
+from app.salesforce_api import fetch_events_by_contact_ids_from_date
+
+CONTACT_IDS = ["003MOCKCONTACT1", "003MOCKCONTACT2", "003MOCKCONTACT3"]
+MEETINGS_CRITERIA = FilterContainer(
+    name="Meetings", filters=[], filter_logic="Subject != null", direction="Outbound"
+)
+
+EVENTS = [
+    {
+        "Id": "00UPRIMARY",
+        "WhoId": "003MOCKCONTACT1",
+        "StartDateTime": "2024-01-03T00:00:00.000+0000",
+        "IsGroupEvent": False,
+    },
+    {
+        "Id": "00UGROUP",
+        "WhoId": "003OTHERCONTACT",
+        "StartDateTime": "2024-01-02T00:00:00.000+0000",
+        "IsGroupEvent": True,
+    },
+    {
+        "Id": "00UUNRELATED",
+        "WhoId": "003OTHERCONTACT",
+        "StartDateTime": "2024-01-01T00:00:00.000+0000",
+        "IsGroupEvent": False,
+    },
+]
+RELATIONS = [
+    {"EventId": "00UGROUP", "RelationId": "003MOCKCONTACT2"},
+    {"EventId": "00UGROUP", "RelationId": "003MOCKCONTACT3"},
+    {"EventId": "00UGROUP", "RelationId": "005MOCKUSER"},
+]
+
+
+@pytest.fixture
+def salesforce():
+    queries = []
+
+    def fetch_sobjects(soql_query, credentials):
+        queries.append(soql_query)
+        if "FROM EventRelation" in soql_query:
+            return ApiResponse(
+                data=[
+                    relation
+                    for relation in RELATIONS
+                    if f"'{relation['RelationId']}'" in soql_query
+                    or f"'{relation['EventId']}'" in soql_query
+                ],
+                success=True,
+            )
+        if "WhoId IN" in soql_query:
+            events = [e for e in EVENTS if f"'{e['WhoId']}'" in soql_query]
+        elif " Id IN" in soql_query:
+            events = [e for e in EVENTS if f"'{e['Id']}'" in soql_query]
+        else:
+            events = EVENTS
+        return ApiResponse(data=[dict(event) for event in events], success=True)
+
+    with patch(
+        "app.salesforce_api.get_credentials",
+        return_value=("mock_access_token", "https://mock.my.salesforce.com"),
+    ), patch("app.salesforce_api._fetch_sobjects", side_effect=fetch_sobjects):
+        yield queries
+
+
+def fetch_events(expected_rows):
+    with patch(
+        "app.salesforce_api._fetch_sobjects_count",
+        return_value=ApiResponse(data=expected_rows, success=True),
+    ):
+        return fetch_events_by_contact_ids_from_date(
+            CONTACT_IDS, "2024-01-01T00:00:00Z", ["mock_user_id"], MEETINGS_CRITERIA
+        ).data
+
+
+def event_ids_by_contact_id(events_by_contact_id):
+    return {
+        contact_id: [event["Id"] for event in events]
+        for contact_id, events in events_by_contact_id.items()
+    }
+
+
+EXPECTED_MATCHES = {
+    "003MOCKCONTACT1": ["00UPRIMARY"],
+    "003MOCKCONTACT2": ["00UGROUP"],
+    "003MOCKCONTACT3": ["00UGROUP"],
+}
+
+
+class TestEventFetchStrategy:
+    def test_should_query_who_id_batches_and_invited_group_events(self, salesforce):
+        events_by_contact_id = fetch_events(expected_rows=1000)
+
+        assert event_ids_by_contact_id(events_by_contact_id) == EXPECTED_MATCHES
+        assert any("WhoId IN" in query for query in salesforce)
+        assert any("RelationId IN" in query for query in salesforce)
+        # the group event's primary contact is not ours, so it is fetched by id
+        assert any("'00UGROUP'" in query and "FROM Event " in query for query in salesforce)
+
+    def test_should_query_once_and_match_group_event_invitees(self, salesforce):
+        events_by_contact_id = fetch_events(expected_rows=3)
+
+        assert event_ids_by_contact_id(events_by_contact_id) == EXPECTED_MATCHES
+        assert not any("WhoId IN" in query for query in salesforce)
+        # relations are only looked up for group events
+        relation_queries = [q for q in salesforce if "FROM EventRelation" in q]
+        assert len(relation_queries) == 1
+        assert "'00UGROUP'" in relation_queries[0]
+        assert "'00UPRIMARY'" not in relation_queries[0]
@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import patch
+from urllib.parse import quote_plus
+from app.data_models import ApiResponse
+from app.salesforce_api import (
+    SALESFORCE_QUERY_PATH,
+    fetch_opportunities_by_account_ids_from_date,
+)
+from config import Config
+
+INSTANCE_URL = "https://mock.my.salesforce.com"
+ACCOUNT_IDS = [f"001MOCKACCOUNT{i:04d}" for i in range(1200)]
+
+
+def get_mock_opportunity(account_id, created_date):
+    return {"Id": f"006{account_id}", "AccountId": account_id, "CreatedDate": created_date}
+
+
+@pytest.fixture
+def salesforce():
+    queries = []
+
+    def fetch_sobjects(soql_query, credentials):
+        queries.append(soql_query)
+        account_ids = [id for id in ACCOUNT_IDS if f"'{id}'" in soql_query]
+        records = [
+            get_mock_opportunity(account_id, f"2024-01-{index % 28 + 1:02d}")
+            for index, account_id in enumerate(account_ids[:3])
+        ]
+        if "AccountId IN" not in soql_query:
+            records.append(get_mock_opportunity("001UNRELATED", "2024-01-01"))
+        return ApiResponse(data=records, success=True)
+
+    with patch(
+        "app.salesforce_api.get_credentials",
+        return_value=("mock_access_token", INSTANCE_URL),
+    ), patch("app.salesforce_api._fetch_sobjects", side_effect=fetch_sobjects):
+        yield queries
+
+
+def mock_count(count):
+    if isinstance(count, Exception):
+        return patch("app.salesforce_api._fetch_sobjects_count", side_effect=count)
+    return patch(
+        "app.salesforce_api._fetch_sobjects_count",
+        return_value=ApiResponse(data=count, success=True),
+    )
+
+
+class TestOpportunityFetchStrategy:
+    def test_should_query_account_batches_that_fit_the_uri_limit(self, salesforce):
+        with mock_count(1_000_000):
+            opportunities = fetch_opportunities_by_account_ids_from_date(
+                ACCOUNT_IDS, "2024-01-01T00:00:00Z", ["mock_user_id"]
+            ).data
+
+        assert len(salesforce) > 1
+        for query in salesforce:
+            url = f"{INSTANCE_URL}{SALESFORCE_QUERY_PATH}?q={quote_plus(query)}"
+            assert len(url) <= Config.SOQL_MAX_URI_LENGTH
+        queried_ids = [id for id in ACCOUNT_IDS if any(f"'{id}'" in q for q in salesforce)]
+        assert queried_ids == ACCOUNT_IDS
+        # results from concurrent batches come back in CreatedDate order
+        assert [opp["CreatedDate"] for opp in opportunities] == sorted(
+            opp["CreatedDate"] for opp in opportunities
+        )
+
+    def test_should_query_once_and_filter_when_accounts_outnumber_rows(self, salesforce):
+        with mock_count(100):
+            opportunities = fetch_opportunities_by_account_ids_from_date(
+                ACCOUNT_IDS[:300], "2024-01-01T00:00:00Z", ["mock_user_id"]
+            ).data
+
+        assert len(salesforce) == 1
+        assert "AccountId IN" not in salesforce[0]
+        assert all(opp["AccountId"] in ACCOUNT_IDS for opp in opportunities)
+
+    def test_should_fall_back_to_one_query_when_the_count_fails(self, salesforce):
+        with mock_count(Exception("mock count failure")):
+            opportunities = fetch_opportunities_by_account_ids_from_date(
+                ACCOUNT_IDS[:2], "2024-01-01T00:00:00Z", ["mock_user_id"]
+            ).data
+
+        assert len(salesforce) == 1
+        assert [opp["AccountId"] for opp in opportunities] == []
+
+    def test_should_skip_the_fetch_when_nothing_matches(self, salesforce):
+        with mock_count(0):
+            opportunities = fetch_opportunities_by_account_ids_from_date(
+                ACCOUNT_IDS[:2], "2024-01-01T00:00:00Z", ["mock_user_id"]
+            ).data
+
+        assert salesforce == []
+        assert opportunities == []
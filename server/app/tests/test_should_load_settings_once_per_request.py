@@ -0,0 +1,69 @@
+from unittest.mock import patch
+from flask import Flask
+from app.data_models import Settings
+from app.database.settings_selector import (
+    invalidate_settings,
+    load_salesforce_team_ids,
+    load_settings,
+    settings_scope,
+)
+from app.database.supabase_connection import set_session_state
+
+FETCH_SETTINGS = "app.database.settings_selector.fetch_settings"
+GET_SESSION_STATE = "app.database.settings_selector.get_session_state"
+
+
+def get_mock_settings():
+    return Settings(
+        inactivity_threshold=10,
+        meeting_object="Event",
+        criteria=[],
+        activate_by_meeting=False,
+        activate_by_opportunity=False,
+        activities_per_contact=1,
+        contacts_per_account=1,
+        tracking_period=5,
+        salesforce_user_id="mock_user_id",
+        team_member_ids=["mock_team_member_id"],
+    )
+
+
+class TestSettingsContext:
+    def test_should_query_settings_once_per_app_context(self):
+        app = Flask(__name__)
+        with patch(FETCH_SETTINGS, return_value=get_mock_settings()) as fetch:
+            with app.app_context():
+                set_session_state({"salesforce_id": "mock_user_id"})
+                load_settings()
+                assert load_salesforce_team_ids() == [
+                    "mock_user_id",
+                    "mock_team_member_id",
+                ]
+            with app.app_context():
+                set_session_state({"salesforce_id": "mock_user_id"})
+                load_settings()
+
+        assert fetch.call_count == 2
+
+    def test_should_reload_after_invalidation(self):
+        app = Flask(__name__)
+        with patch(FETCH_SETTINGS, return_value=get_mock_settings()) as fetch:
+            with app.app_context():
+                set_session_state({"salesforce_id": "mock_user_id"})
+                load_settings()
+                invalidate_settings()
+                load_settings()
+
+        assert fetch.call_count == 2
+
+    def test_should_memoize_within_a_settings_scope_outside_flask(self):
+        with patch(FETCH_SETTINGS, return_value=get_mock_settings()) as fetch, patch(
+            GET_SESSION_STATE, return_value={"salesforce_id": "mock_user_id"}
+        ):
+            with settings_scope():
+                load_settings()
+                load_settings()
+            load_settings()
+            load_settings()
+
+        assert fetch.call_count == 3
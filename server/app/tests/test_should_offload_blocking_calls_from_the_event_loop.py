@@ -0,0 +1,63 @@
+import asyncio
+import contextvars
+import threading
+import time
+from unittest.mock import patch
+from app.event_loop import BackgroundEventLoop, LoopBlockingMonitor, run_blocking
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def blocking_fetch():
+    time.sleep(0.1)
+    return threading.current_thread().name, request_id.get()
+
+
+class TestRunBlocking:
+    def test_should_run_calls_on_the_pool_with_the_callers_context(self):
+        async def fetch_all():
+            request_id.set("mock_request")
+            return await asyncio.gather(*(run_blocking(blocking_fetch) for _ in range(4)))
+
+        started_at = time.perf_counter()
+        results = asyncio.run(fetch_all())
+
+        assert all(name.startswith("blocking-io") for name, _ in results)
+        assert all(value == "mock_request" for _, value in results)
+        # the calls overlap rather than holding the loop one after another
+        assert time.perf_counter() - started_at < 0.3
+
+
+class TestLoopBlockingMonitor:
+    def test_should_report_a_blocked_loop_with_its_stack(self):
+        reports = []
+
+        def report(self, blocked_for):
+            reports.append(blocked_for)
+
+        async def block_loop():
+            time.sleep(0.3)
+
+        background_loop = BackgroundEventLoop(name="mock-loop")
+        with patch("config.Config.EVENT_LOOP_DEBUG", True), patch(
+            "config.Config.EVENT_LOOP_BLOCKING_THRESHOLD_SECONDS", 0.1
+        ), patch.object(LoopBlockingMonitor, "report", report):
+            background_loop.run(asyncio.sleep(0.2))
+            assert reports == []
+            background_loop.run(block_loop())
+            time.sleep(0.1)
+        background_loop.shutdown()
+
+        # one report per stall, however long it lasts
+        assert len(reports) == 1
+        assert reports[0] > 0.1
+
+    def test_should_log_the_loop_threads_stack(self, caplog):
+        loop = asyncio.new_event_loop()
+        monitor = LoopBlockingMonitor(loop, threading.current_thread(), 0.1)
+
+        monitor.report(0.25)
+        loop.close()
+
+        assert "Event loop blocked for 0.25s" in caplog.text
+        assert "test_should_log_the_loop_threads_stack" in caplog.text
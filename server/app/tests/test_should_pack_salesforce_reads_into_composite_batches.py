@@ -0,0 +1,245 @@
+import asyncio
+import aiohttp
+import pytest
+import requests
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+from yarl import URL
+from app.data_models import ApiResponse, FilterContainer
+from app.salesforce_api import (
+    _fetch_sobjects,
+    fetch_contact_by_id_map,
+    fetch_team_account_data,
+)
+from app.salesforce_composite import CompositeBatchEngine
+
+CREDENTIALS = ("mock_access_token", "https://mock.my.salesforce.com")
+MEETINGS_CRITERIA = FilterContainer(
+    name="Meetings", filters=[], filter_logic="Subject != null", direction="Outbound"
+)
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def json(self):
+        return self.body
+
+    async def text(self):
+        return str(self.body)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            url = URL("https://mock.my.salesforce.com")
+            raise aiohttp.ClientResponseError(
+                aiohttp.RequestInfo(url, "POST", {}, url), (), status=self.status
+            )
+
+
+class FakeSession:
+    """
+    Answers Composite Batch requests from `pages_by_sobject`, one page per
+    subrequest, and keeps the subrequest URLs of each call.
+    """
+
+    def __init__(self, pages_by_sobject, count=10, fail=False, fail_times=0):
+        self.pages_by_sobject = pages_by_sobject
+        self.count = count
+        self.fail = fail
+        self.fail_times = fail_times
+        self.calls = []
+
+    def post(self, url, json, headers):
+        urls = [request["url"] for request in json["batchRequests"]]
+        self.calls.append(urls)
+        if self.fail or len(self.calls) <= self.fail_times:
+            return FakeResponse(503, "mock composite failure")
+        return FakeResponse(200, {"results": [self.answer(url) for url in urls]})
+
+    def answer(self, url):
+        if "/query/" in url:
+            sobject, page = url.rsplit("/", 1)[-1].split("-")
+            return self.page(sobject, int(page))
+        soql = parse_qs(urlparse(url).query)["q"][0]
+        if "COUNT()" in soql:
+            return {"statusCode": 200, "result": {"totalSize": self.count, "records": []}}
+        sobject = soql.split(" FROM ")[1].split(" ")[0]
+        return self.page(sobject, 0)
+
+    def page(self, sobject, page):
+        pages = self.pages_by_sobject.get(sobject, [[]])
+        result = {"totalSize": 0, "done": page == len(pages) - 1, "records": pages[page]}
+        if page < len(pages) - 1:
+            result["nextRecordsUrl"] = f"/services/data/v55.0/query/{sobject}-{page + 1}"
+        return {"statusCode": 200, "result": result}
+
+
+@pytest.fixture(autouse=True)
+def no_retry_wait():
+    with patch("config.Config.SALESFORCE_RETRY_MIN_WAIT_SECONDS", 0):
+        yield
+
+
+def rest_response(status, body=b""):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    return response
+
+
+def run_with_session(session, coroutine_factory):
+    with patch("app.salesforce_composite.get_client_session", return_value=session):
+        return asyncio.run(coroutine_factory())
+
+
+class TestCompositeBatchEngine:
+    def test_should_pack_queries_and_page_follow_ups_into_batches(self):
+        session = FakeSession(
+            {
+                "Contact": [[{"Id": "003A"}], [{"Id": "003B"}], [{"Id": "003C"}]],
+                "User": [[{"Id": "005A"}]],
+            }
+        )
+        soqls = ["SELECT Id FROM User"] * 29 + ["SELECT Id FROM Contact"]
+
+        results = run_with_session(
+            session, lambda: CompositeBatchEngine(CREDENTIALS).query_async(soqls)
+        )
+
+        # 30 queries need two batches, then each follow-up page one more round
+        assert [len(urls) for urls in session.calls] == [25, 5, 1, 1]
+        assert results[0] == [{"Id": "005A"}]
+        assert results[-1] == [{"Id": "003A"}, {"Id": "003B"}, {"Id": "003C"}]
+
+    def test_should_retry_batches_failing_with_a_transient_error(self):
+        session = FakeSession({"User": [[{"Id": "005A"}]]}, fail_times=2)
+
+        results = run_with_session(
+            session,
+            lambda: CompositeBatchEngine(CREDENTIALS).query_async(
+                ["SELECT Id FROM User"]
+            ),
+        )
+
+        assert len(session.calls) == 3
+        assert results == [[{"Id": "005A"}]]
+
+    def test_should_raise_once_retries_are_exhausted(self):
+        session = FakeSession({}, fail=True)
+
+        with pytest.raises(aiohttp.ClientResponseError):
+            run_with_session(
+                session,
+                lambda: CompositeBatchEngine(CREDENTIALS).query_async(
+                    ["SELECT Id FROM User"]
+                ),
+            )
+        assert len(session.calls) == 3
+
+
+def test_rest_queries_should_retry_transient_errors():
+    responses = [
+        requests.ConnectionError("mock connection reset"),
+        rest_response(503),
+        rest_response(200, b'{"records": [{"Id": "003A"}], "done": true}'),
+    ]
+
+    with patch("app.salesforce_api.requests.get", side_effect=responses) as get:
+        records = _fetch_sobjects("SELECT Id FROM Contact", CREDENTIALS).data
+
+    assert get.call_count == 3
+    assert records == [{"Id": "003A"}]
+
+
+@pytest.fixture
+def salesforce_credentials():
+    with patch("app.salesforce_api.get_credentials", return_value=CREDENTIALS):
+        yield
+
+
+class TestFetchTeamAccountData:
+    def test_should_fetch_users_opportunities_and_events_together(
+        self, salesforce_credentials
+    ):
+        session = FakeSession(
+            {
+                "User": [[{"Id": "005A", "UserRole": {"Name": "SDR"}}]],
+                "Opportunity": [[{"Id": "006A", "AccountId": "001A"}]],
+                "Event": [[{"Id": "00UA", "WhoId": "003A", "IsGroupEvent": False}]],
+            },
+            # few enough rows to query broadly, so no group event lookups follow
+            count=1,
+        )
+
+        users, opportunities, events = run_with_session(
+            session,
+            lambda: fetch_team_account_data(
+                ["005A"], ["001A"], "2024-01-01T00:00:00Z", ["003A"], MEETINGS_CRITERIA
+            ),
+        )
+
+        # one round trip for the count probes, one for the queries
+        assert len(session.calls) == 2
+        assert [user.id for user in users.data] == ["005A"]
+        assert users.data[0].role == "SDR"
+        assert [opp["Id"] for opp in opportunities.data] == ["006A"]
+        assert list(events.data) == ["003A"]
+
+    def test_should_fall_back_to_separate_queries_when_composite_fails(
+        self, salesforce_credentials
+    ):
+        session = FakeSession({}, fail=True)
+        fetch_sobjects = patch(
+            "app.salesforce_api._fetch_sobjects",
+            side_effect=lambda soql, credentials: ApiResponse(
+                data=[{"Id": "006A", "AccountId": "001A"}]
+                if "FROM Opportunity" in soql
+                else [],
+                success=True,
+            ),
+        )
+        fetch_count = patch(
+            "app.salesforce_api._fetch_sobjects_count",
+            side_effect=Exception("mock count failure"),
+        )
+
+        with fetch_sobjects as fetch, fetch_count:
+            users, opportunities, events = run_with_session(
+                session,
+                lambda: fetch_team_account_data(
+                    ["005A"], ["001A"], "2024-01-01T00:00:00Z"
+                ),
+            )
+
+        assert users.data == []
+        assert [opp["Id"] for opp in opportunities.data] == ["006A"]
+        assert events.data == {}
+        assert fetch.call_count == 2
+
+
+class TestFetchContactByIdMap:
+    def test_should_raise_rather_than_return_no_contacts(self, salesforce_credentials):
+        account_fields = ApiResponse(
+            data=[{"name": "Name", "type": "string"}], success=True
+        )
+        with patch(
+            "app.salesforce_api._fetch_object_fields", return_value=account_fields
+        ), patch(
+            "app.salesforce_api._fetch_sobjects_count",
+            return_value=ApiResponse(data=1, success=True),
+        ), patch(
+            "app.salesforce_api.requests.get",
+            side_effect=requests.ConnectionError("mock connection reset"),
+        ) as get:
+            with pytest.raises(Exception, match="mock connection reset"):
+                asyncio.run(fetch_contact_by_id_map(["003A"]))
+
+        assert get.call_count == 3
@@ -0,0 +1,161 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.instrumentation import stage, trace_run
+from app.query_planner import QueryExecutor, QueryPlanner, QuerySpec, QueryStrategy
+from app.salesforce_api import _bulk_value
+
+ACCOUNT_IDS = [f"001MOCKACCOUNT{i:04d}" for i in range(5000)]
+
+
+class FakeExecutor(QueryExecutor):
+    instance_url = "https://mock.my.salesforce.com"
+
+    def __init__(self, count=0):
+        self.count_result = count
+        self.calls = []
+
+    def count(self, soql):
+        self.calls.append(("count", soql))
+        if isinstance(self.count_result, Exception):
+            raise self.count_result
+        return self.count_result
+
+    def fetch(self, soql):
+        self.calls.append(("fetch", soql))
+        return [{"Id": "006MOCK", "AccountId": "001MOCKACCOUNT0000"}]
+
+    def fetch_composite(self, soqls):
+        self.calls.append(("composite", soqls))
+        return [[{"Id": f"006MOCK{i}"}] for i in range(len(soqls))]
+
+    async def fetch_composite_async(self, soqls):
+        self.calls.append(("composite_async", soqls))
+        return [[{"Id": f"006MOCK{i}"}] for i in range(len(soqls))]
+
+    def fetch_bulk(self, soql):
+        self.calls.append(("bulk", soql))
+        return []
+
+
+def opportunity_spec(account_ids):
+    return QuerySpec(
+        label="opportunities",
+        sobject="Opportunity",
+        select="Id, AccountId",
+        where="CreatedDate >= 2024-01-01T00:00:00Z",
+        id_field="AccountId",
+        candidate_ids=account_ids,
+    )
+
+
+class TestQueryPlanner:
+    def test_should_batch_few_candidates_and_query_broadly_for_many(self):
+        plan = QueryPlanner(FakeExecutor(count=100_000)).plan(
+            opportunity_spec(ACCOUNT_IDS[:50])
+        )
+        assert plan.strategy == QueryStrategy.batched_in
+
+        plan = QueryPlanner(FakeExecutor(count=100)).plan(
+            opportunity_spec(ACCOUNT_IDS[:500])
+        )
+        assert plan.strategy == QueryStrategy.broad
+
+    def test_should_skip_or_fall_back_without_a_usable_count(self):
+        planner = QueryPlanner(FakeExecutor(count=0))
+        assert planner.plan(opportunity_spec([])).strategy == QueryStrategy.skip
+        assert planner.executor.calls == []
+        assert planner.plan(opportunity_spec(ACCOUNT_IDS[:5])).strategy == QueryStrategy.skip
+
+        planner = QueryPlanner(FakeExecutor(count=Exception("mock count failure")))
+        assert planner.plan(opportunity_spec(ACCOUNT_IDS[:5])).strategy == QueryStrategy.broad
+
+    def test_should_pack_batches_into_composite_calls_past_the_batch_limit(self):
+        executor = FakeExecutor()
+        spec = QuerySpec(
+            label="contacts",
+            sobject="Contact",
+            select="Id",
+            id_field="Id",
+            candidate_ids=ACCOUNT_IDS * 10 + [f"003MOCK{i:06d}" for i in range(50_000)],
+        )
+        with patch("config.Config.SOQL_MAX_URI_LENGTH", 2000):
+            plan = QueryPlanner(executor).plan(spec)
+            rows = asyncio.run(QueryPlanner(executor).execute_async(spec))
+
+        # ids are unique, so no probe is needed to bound the rows
+        assert all(call[0] != "count" for call in executor.calls)
+        assert plan.strategy == QueryStrategy.composite
+        composite_calls = [call for call in executor.calls if call[0] == "composite_async"]
+        assert all(len(soqls) <= 25 for _, soqls in composite_calls)
+        assert sum(len(soqls) for _, soqls in composite_calls) == len(plan.id_batches)
+        assert len(rows) == len(plan.id_batches)
+
+    def test_should_cap_concurrent_batches_per_spec(self):
+        class SlowExecutor(FakeExecutor):
+            in_flight = peak = 0
+
+            async def fetch_composite_async(self, soqls):
+                SlowExecutor.in_flight += 1
+                SlowExecutor.peak = max(SlowExecutor.peak, SlowExecutor.in_flight)
+                await asyncio.sleep(0.01)
+                SlowExecutor.in_flight -= 1
+                return await super().fetch_composite_async(soqls)
+
+        spec = opportunity_spec(ACCOUNT_IDS)
+        spec.max_concurrency = 2
+        planner = QueryPlanner(SlowExecutor(count=100_000))
+        with patch("config.Config.SOQL_MAX_URI_LENGTH", 2000), patch(
+            "config.Config.SOQL_IN_BATCH_MAX_BATCHES", 1
+        ):
+            plan = planner.plan(spec)
+            asyncio.run(planner._run_composite_async(plan))
+
+        assert plan.strategy == QueryStrategy.composite
+        assert len(planner.executor.calls) > 2
+        assert SlowExecutor.peak == 2
+
+    def test_should_use_bulk_for_large_unscoped_pulls_only_when_enabled(self):
+        spec = QuerySpec(
+            label="tasks",
+            sobject="Task",
+            select="Id, WhoId",
+            where="CreatedDate >= 2024-01-01T00:00:00Z",
+            bulk_safe=True,
+        )
+        executor = FakeExecutor(count=2_000_000)
+        assert QueryPlanner(executor).plan(spec).strategy == QueryStrategy.broad
+        assert executor.calls == []
+
+        with patch("config.Config.SALESFORCE_BULK_ENABLED", True):
+            assert QueryPlanner(executor).plan(spec).strategy == QueryStrategy.bulk
+            executor.count_result = 1000
+            assert QueryPlanner(executor).plan(spec).strategy == QueryStrategy.broad
+
+    def test_should_record_the_plan_with_its_observed_cost_on_the_stage(self):
+        with trace_run("mock_refresh"), stage("fetch opportunities") as timing:
+            QueryPlanner(FakeExecutor(count=100)).execute(
+                opportunity_spec(ACCOUNT_IDS[:500])
+            )
+
+        [plan] = timing.to_dict()["query_plans"]
+        assert plan["label"] == "opportunities"
+        assert plan["strategy"] == "broad"
+        assert plan["expected_rows"] == 100
+        assert plan["queries"] == 1
+        # the broad query is filtered down to the candidate accounts
+        assert plan["rows"] == 1
+        assert plan["elapsed_ms"] is not None
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("", None),
+        ("true", True),
+        ("Call", "Call"),
+        ("2024-01-01T10:00:00.000Z", "2024-01-01T10:00:00.000+0000"),
+    ],
+)
+def test_should_map_bulk_csv_values_like_the_rest_api(value, expected):
+    assert _bulk_value(value) == expected
@@ -0,0 +1,61 @@
+import asyncio
+import time
+import pytest
+from app.utils import gather_with_deadline
+
+
+async def sleep_then_return(seconds, value, finished):
+    await asyncio.sleep(seconds)
+    finished.append(value)
+    return value
+
+
+async def fail_after(seconds):
+    await asyncio.sleep(seconds)
+    raise ValueError("mock fetch failure")
+
+
+class TestGatherWithDeadline:
+    def test_should_run_fetches_concurrently_in_order(self):
+        finished = []
+
+        async def prefetch():
+            return await gather_with_deadline(
+                sleep_then_return(0.2, "users", finished),
+                asyncio.to_thread(time.sleep, 0.2),
+                sleep_then_return(0.1, "meetings", finished),
+                timeout=5,
+            )
+
+        started_at = time.perf_counter()
+        results = asyncio.run(prefetch())
+
+        assert results == ["users", None, "meetings"]
+        assert finished == ["meetings", "users"]
+        assert time.perf_counter() - started_at < 0.35
+
+    def test_should_cancel_the_other_fetches_when_one_fails(self):
+        finished = []
+
+        async def prefetch():
+            return await gather_with_deadline(
+                sleep_then_return(0.3, "opportunities", finished), fail_after(0.05)
+            )
+
+        with pytest.raises(ValueError):
+            asyncio.run(prefetch())
+        assert finished == []
+
+    def test_should_cancel_every_fetch_past_the_deadline(self):
+        finished = []
+
+        async def prefetch():
+            return await gather_with_deadline(
+                sleep_then_return(0.01, "users", finished),
+                sleep_then_return(1, "opportunities", finished),
+                timeout=0.1,
+            )
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(prefetch())
+        assert finished == ["users"]
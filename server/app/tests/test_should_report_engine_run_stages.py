@@ -0,0 +1,210 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import httpx
+import pytest
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app import create_app
+from app.database.supabase_connection import _count_calls
+from app.http_sessions import create_client_session
+from app.query_planner import QueryExecutor, QueryPlanner, QuerySpec, QueryStrategy
+from app.cache.backends import InMemorySharedClient, SharedCacheBackend
+from app.instrumentation import (
+    SALESFORCE,
+    _recent_runs,
+    get_recent_runs,
+    get_run_reports,
+    record_response,
+    record_rows,
+    set_run_attributes,
+    set_run_report_backend,
+    stage,
+    trace_run,
+)
+
+
+async def post_to_mock_server(body, reply):
+    async def handler(request):
+        await request.read()
+        return web.Response(body=reply)
+
+    app = web.Application()
+    app.router.add_post("/services/data/v55.0/composite/batch", handler)
+    server = TestServer(app)
+    await server.start_server()
+    session = create_client_session(str(server.make_url("/")).rstrip("/"))
+    try:
+        async with session.post(
+            str(server.make_url("/services/data/v55.0/composite/batch")), data=body
+        ) as response:
+            await response.read()
+    finally:
+        await session.close()
+        await server.close()
+
+
+def supabase_session():
+    session = httpx.Client(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=b'[{"id": "mock_activation"}]')
+        )
+    )
+    _count_calls(session)
+    return session
+
+
+def salesforce_response(content):
+    response = requests.Response()
+    response._content = content
+    response.request = requests.Request(
+        "GET", "https://mock.my.salesforce.com/services/data/v55.0/query"
+    ).prepare()
+    return response
+
+
+async def mock_refresh():
+    with trace_run("activation_refresh"):
+        set_run_attributes(job_id="mock_job", salesforce_user_ids=["mock_user_id"])
+        with stage("fetch tasks"):
+            record_response(SALESFORCE, salesforce_response(b"x" * 2000))
+            with stage("resolve contacts"):
+                await post_to_mock_server(b"y" * 300, b"z" * 5000)
+                record_rows(rows_in=12, rows_out=10)
+        with stage("upsert"):
+            supabase_session().post(
+                "https://mock.supabase.co/rest/v1/Activations", content=b"[]"
+            )
+            record_rows(rows_out=1)
+
+
+class TestEngineRunReport:
+    def test_should_count_rows_calls_and_bytes_per_stage(self):
+        asyncio.run(mock_refresh())
+
+        report = get_recent_runs()[-1]
+        stages = {stage["name"]: stage for stage in report["stages"]}
+        assert report["attributes"] == {
+            "job_id": "mock_job",
+            "salesforce_user_ids": ["mock_user_id"],
+        }
+        assert stages["resolve contacts"]["rows_in"] == 12
+        assert stages["resolve contacts"]["rows_out"] == 10
+        assert stages["resolve contacts"]["salesforce"] == {
+            "calls": 1,
+            "bytes_sent": 300,
+            "bytes_received": 5000,
+        }
+        # calls count toward the enclosing stages, rows only where recorded
+        assert stages["fetch tasks"]["rows_out"] is None
+        assert stages["fetch tasks"]["salesforce"] == {
+            "calls": 2,
+            "bytes_sent": 300,
+            "bytes_received": 7000,
+        }
+        assert stages["upsert"]["supabase"] == {
+            "calls": 1,
+            "bytes_sent": 2,
+            "bytes_received": 27,
+        }
+        assert report["salesforce"]["calls"] == 2
+        assert report["supabase"]["calls"] == 1
+
+    def test_should_count_calls_of_every_batch_run_in_worker_threads(self):
+        class BatchExecutor(QueryExecutor):
+            instance_url = "https://mock.my.salesforce.com"
+
+            def count(self, soql):
+                return 100_000
+
+            def fetch(self, soql):
+                record_response(SALESFORCE, salesforce_response(b"x" * 100))
+                return [{"Id": "006MOCK"}]
+
+        planner = QueryPlanner(BatchExecutor())
+        spec = QuerySpec(
+            label="opportunities",
+            sobject="Opportunity",
+            select="Id, AccountId",
+            id_field="AccountId",
+            candidate_ids=[f"001MOCKACCOUNT{i:04d}" for i in range(200)],
+        )
+        with patch("config.Config.SOQL_MAX_URI_LENGTH", 2000):
+            with trace_run("activation_refresh"):
+                with stage("fetch opportunities"):
+                    plan = planner.plan(spec)
+                    planner.run(plan)
+
+        report = get_recent_runs()[-1]
+        stages = {stage["name"]: stage for stage in report["stages"]}
+        assert plan.strategy == QueryStrategy.batched_in
+        assert plan.queries > 1
+        assert stages["fetch opportunities"]["salesforce"]["calls"] == plan.queries
+        assert report["salesforce"]["bytes_received"] == 100 * plan.queries
+
+    def test_should_leave_calls_outside_a_run_uncounted(self):
+        runs_before = get_recent_runs()
+
+        supabase_session().get("https://mock.supabase.co/rest/v1/Settings")
+        record_response(SALESFORCE, salesforce_response(b"x"))
+
+        assert get_recent_runs() == runs_before
+
+
+@pytest.fixture(autouse=True)
+def run_reports():
+    backend = SharedCacheBackend(InMemorySharedClient())
+    set_run_report_backend(backend)
+    yield backend
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+    with patch(
+        "app.middleware.get_authenticated_session",
+        return_value=({"salesforce_id": "mock_user_id"}, expiry),
+    ), patch(
+        "app.routes.get_session_state", return_value={"salesforce_id": "mock_user_id"}
+    ):
+        yield app.test_client()
+
+
+class TestEngineRunReportsEndpoint:
+    def test_should_return_only_the_callers_team_runs(self, client):
+        asyncio.run(mock_refresh())
+        with trace_run("activation_refresh"):
+            set_run_attributes(salesforce_user_ids=["mock_other_team_user_id"])
+
+        response = client.get(
+            "/get_engine_run_reports",
+            query_string={"job_id": "mock_job"},
+            headers={"X-Session-Token": "mock_session_token"},
+        )
+
+        reports = response.get_json()["data"]
+        assert response.status_code == 200
+        assert reports
+        assert all(report["attributes"]["job_id"] == "mock_job" for report in reports)
+        assert [stage["name"] for stage in reports[-1]["stages"]] == [
+            "fetch tasks",
+            "resolve contacts",
+            "upsert",
+        ]
+
+    def test_should_serve_runs_traced_by_another_worker(self, client):
+        asyncio.run(mock_refresh())
+        # this worker restarted, or never ran the job; the report backend is shared
+        _recent_runs.clear()
+
+        response = client.get(
+            "/get_engine_run_reports",
+            query_string={"job_id": "mock_job"},
+            headers={"X-Session-Token": "mock_session_token"},
+        )
+
+        reports = response.get_json()["data"]
+        assert [report["attributes"]["job_id"] for report in reports] == ["mock_job"]
+        assert get_run_reports("mock_other_team_user_id", "mock_job") == []
@@ -0,0 +1,59 @@
+import asyncio
+import concurrent.futures
+import pytest
+from contextvars import ContextVar
+from flask import Flask, g
+from app.event_loop import BackgroundEventLoop
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+
+@pytest.fixture
+def background_loop():
+    background_loop = BackgroundEventLoop(name="test-event-loop")
+    yield background_loop
+    background_loop.shutdown()
+
+
+class TestBackgroundEventLoop:
+    def test_should_reuse_one_loop_across_calls(self, background_loop):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        assert background_loop.run(current_loop()) is background_loop.run(current_loop())
+
+    def test_should_run_with_the_callers_context(self, background_loop):
+        app = Flask(__name__)
+
+        async def read_context():
+            return request_id.get(), g.session_state
+
+        request_id.set("mock_request_id")
+        with app.app_context():
+            g.session_state = {"salesforce_id": "mock_user_id"}
+            assert background_loop.run(read_context()) == (
+                "mock_request_id",
+                {"salesforce_id": "mock_user_id"},
+            )
+
+    def test_should_raise_coroutine_exceptions_in_the_caller(self, background_loop):
+        async def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            background_loop.run(fail())
+
+    def test_should_cancel_coroutine_on_timeout(self, background_loop):
+        cancelled = concurrent.futures.Future()
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set_result(True)
+                raise
+
+        with pytest.raises(concurrent.futures.TimeoutError):
+            background_loop.run(slow(), timeout=0.05)
+
+        assert cancelled.result(timeout=1)
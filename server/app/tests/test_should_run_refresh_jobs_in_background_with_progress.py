@@ -0,0 +1,130 @@
+import pytest
+import threading
+from unittest.mock import patch
+from app.data_models import ApiResponse, JobStatus
+from app.jobs.job_queue import LocalJobQueue, _create_job_queue, report_job_progress
+
+
+@pytest.fixture
+def queue():
+    queue = LocalJobQueue(max_workers=2, result_ttl=60)
+    yield queue
+    queue.shutdown()
+
+
+class TestLocalJobQueue:
+    def test_should_return_queued_job_before_work_finishes(self, queue):
+        release = threading.Event()
+
+        def work():
+            release.wait(5)
+            return ApiResponse(success=True)
+
+        job = queue.enqueue("refresh_activations", "mock_user_id", work)
+
+        assert job.status == JobStatus.queued
+        assert not queue.get(job.id).is_finished
+
+        release.set()
+        assert queue.wait(job.id, timeout=5).status == JobStatus.completed
+
+    def test_should_record_stage_progress_reported_by_the_job(self, queue):
+        def work():
+            report_job_progress("tasks_fetched", 12)
+            report_job_progress("contacts_resolved", 4)
+            report_job_progress("activations_computed", 2)
+            report_job_progress("activations_upserted", 2)
+            return ApiResponse(success=True)
+
+        job = queue.wait(
+            queue.enqueue("refresh_activations", "mock_user_id", work).id, timeout=5
+        )
+
+        assert job.progress == {
+            "tasks_fetched": 12,
+            "contacts_resolved": 4,
+            "activations_computed": 2,
+            "activations_upserted": 2,
+        }
+        assert job.stage == "activations_upserted"
+        assert job.started_at is not None and job.finished_at is not None
+
+    def test_should_fail_job_on_unsuccessful_response_or_exception(self, queue):
+        def unsuccessful():
+            return ApiResponse(success=False, message="Error upserting new activations")
+
+        def raises():
+            raise ValueError("boom")
+
+        unsuccessful_job = queue.wait(
+            queue.enqueue("refresh_activations", "mock_user_id", unsuccessful).id, 5
+        )
+        raising_job = queue.wait(
+            queue.enqueue("refresh_activations", "mock_user_id", raises).id, 5
+        )
+
+        assert unsuccessful_job.status == JobStatus.failed
+        assert unsuccessful_job.message == "Error upserting new activations"
+        assert raising_job.status == JobStatus.failed
+        assert "boom" in raising_job.message
+
+    def test_should_ignore_progress_reported_outside_a_job(self):
+        report_job_progress("tasks_fetched", 1)
+
+
+class TestJobCoalescing:
+    def test_should_attach_concurrent_callers_to_the_in_flight_run(self, queue):
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            release.wait(5)
+            return ApiResponse(success=True)
+
+        first = queue.enqueue("refresh_activations", "user_a", work, dedupe_key="team")
+        second = queue.enqueue("refresh_activations", "user_b", work, dedupe_key="team")
+        release.set()
+
+        assert second.id == first.id
+        assert queue.wait(first.id, timeout=5).status == JobStatus.completed
+        assert queue.get(first.id).subscriber_ids == ["user_a", "user_b"]
+        assert len(calls) == 1
+
+    def test_should_coalesce_callers_after_the_window_into_one_follow_up(self):
+        queue = LocalJobQueue(max_workers=2, coalesce_window=0)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return ApiResponse(success=True)
+
+        first = queue.enqueue("refresh_activations", "user_a", work, dedupe_key="team")
+        started.wait(5)
+        follow_ups = [
+            queue.enqueue("refresh_activations", "user_a", work, dedupe_key="team")
+            for _ in range(3)
+        ]
+        other_team = queue.enqueue(
+            "refresh_activations", "user_c", lambda: None, dedupe_key="other_team"
+        )
+        release.set()
+
+        assert len({job.id for job in follow_ups}) == 1
+        assert follow_ups[0].id != first.id
+        assert queue.wait(follow_ups[0].id, timeout=5).status == JobStatus.completed
+        assert queue.wait(other_team.id, timeout=5).status == JobStatus.completed
+        assert len(calls) == 2
+        queue.shutdown()
+
+
+def test_local_queue_should_refuse_several_workers():
+    with patch("config.Config.JOB_QUEUE_BACKEND", "local"), patch(
+        "config.Config.WEB_CONCURRENCY", 4
+    ):
+        with pytest.raises(ValueError, match="single worker"):
+            _create_job_queue()
@@ -0,0 +1,173 @@
+import sys
+from unittest.mock import patch
+import pytest
+from app import create_app
+from app.cache.backends import InMemorySharedClient, LocalCacheBackend, SharedCacheBackend
+from app.sentry_sampling import (
+    TracesSampler,
+    _create_policy_backend,
+    set_traces_sampler,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def request_context(path, parent_sampled=None):
+    return {
+        "wsgi_environ": {"PATH_INFO": path},
+        "transaction_context": {"name": "generic WSGI request"},
+        "parent_sampled": parent_sampled,
+    }
+
+
+@pytest.fixture
+def sampler():
+    return TracesSampler(LocalCacheBackend(max_entries=1), clock=FakeClock())
+
+
+class TestTracesSampler:
+    def test_should_sample_by_route(self, sampler):
+        assert sampler(request_context("/process_new_prospecting_activity")) == 1
+        assert sampler(request_context("/get_settings")) == 0.01
+        assert sampler(request_context("/metrics")) == 0
+        assert sampler(request_context("/get_salesforce_users")) == 0.05
+        # background jobs are matched by transaction name
+        assert sampler({"transaction_context": {"name": "activation_refresh"}}) == 1
+
+    def test_should_continue_the_parents_decision(self, sampler):
+        assert sampler(request_context("/metrics", parent_sampled=True)) == 1
+        assert sampler(request_context("/process_new_prospecting_activity", False)) == 0
+
+    def test_should_trace_busy_routes_at_most_the_target_rate(self, sampler):
+        sampler.update_policy({"default_rate": 0.5})
+        path = "/get_paginated_prospecting_activities"
+
+        rates = [sampler(request_context(path)) for _ in range(300)]
+        assert rates[0] == 0.5
+        assert rates[-1] == pytest.approx(30 / 300)
+        # routes that always trace are left alone however busy they are
+        for _ in range(300):
+            assert sampler(request_context("/process_new_prospecting_activity")) == 1
+
+        # the last minute's volume still counts, then the route cools down
+        sampler.clock.now += 60
+        assert sampler(request_context(path)) == pytest.approx(30 / 300)
+        sampler.clock.now += 120
+        assert sampler(request_context(path)) == 0.5
+
+    def test_should_count_paths_without_a_route_under_one_key(self):
+        sampler = TracesSampler(
+            LocalCacheBackend(max_entries=1),
+            clock=FakeClock(),
+            routes=["/get_salesforce_users"],
+        )
+
+        for i in range(100):
+            sampler(request_context(f"/mock_probe_{i}"))
+        sampler(request_context("/get_salesforce_users"))
+        sampler(request_context("/get_settings"))
+        sampler({"transaction_context": {"name": "activation_refresh"}})
+
+        assert sorted(sampler._volume) == [
+            "/get_salesforce_users",
+            "/get_settings",
+            "activation_refresh",
+            "unmatched",
+        ]
+        assert sampler._volume["unmatched"][1] == 100
+
+    def test_should_switch_the_policy_for_every_process_at_runtime(self):
+        backend = SharedCacheBackend(InMemorySharedClient())
+        clock = FakeClock()
+        this_worker = TracesSampler(backend, clock=clock)
+        other_worker = TracesSampler(backend, clock=clock)
+        assert other_worker(request_context("/get_settings")) == 0.01
+
+        this_worker.update_policy({"route_rates": {"/get_settings": 1}})
+
+        assert this_worker(request_context("/get_settings")) == 1
+        assert this_worker(request_context("/metrics")) == 0
+        clock.now += 30
+        assert other_worker(request_context("/get_settings")) == 1
+
+        this_worker.update_policy({"enabled": False})
+        clock.now += 30
+        assert other_worker(request_context("/process_new_prospecting_activity")) == 0
+
+        this_worker.reset_policy()
+        clock.now += 30
+        assert other_worker(request_context("/get_settings")) == 0.01
+
+    @pytest.mark.parametrize(
+        "changes",
+        [{"default_rate": 2}, {"route_rates": {"/get_settings": -1}}, {"mock": True}],
+    )
+    def test_should_reject_invalid_policies(self, sampler, changes):
+        with pytest.raises(ValueError):
+            sampler.update_policy(changes)
+        assert sampler(request_context("/get_settings")) == 0.01
+
+    def test_should_fall_back_to_a_local_policy_without_redis_installed(self):
+        with patch("config.Config.SENTRY_SAMPLING_POLICY_BACKEND", "redis"), patch.dict(
+            sys.modules, {"redis": None}
+        ):
+            backend = _create_policy_backend()
+
+        assert isinstance(backend, LocalCacheBackend)
+
+
+@pytest.fixture
+def client(sampler):
+    set_traces_sampler(sampler)
+    with patch("config.Config.SENTRY_SAMPLING_TOKEN", "mock_sampling_token"):
+        yield create_app().test_client()
+
+
+AUTHORIZATION = {"Authorization": "Bearer mock_sampling_token"}
+
+
+class TestTraceSamplingPolicyEndpoint:
+    def test_should_update_the_policy_with_the_token(self, client, sampler):
+        assert client.get("/trace_sampling_policy").status_code == 401
+
+        response = client.put(
+            "/trace_sampling_policy",
+            json={"route_rates": {"/get_settings": 0.5}},
+            headers=AUTHORIZATION,
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()["data"][0]["route_rates"]["/get_settings"] == 0.5
+        assert sampler(request_context("/get_settings")) == 0.5
+        # the sampler's local backend only holds this worker's policy
+        assert "worker that served this request only" in response.get_json()["message"]
+        assert "/get_salesforce_users" in sampler.routes
+
+    def test_should_not_warn_when_the_policy_is_shared(self, sampler):
+        set_traces_sampler(TracesSampler(SharedCacheBackend(InMemorySharedClient())))
+        with patch("config.Config.SENTRY_SAMPLING_TOKEN", "mock_sampling_token"):
+            response = create_app().test_client().put(
+                "/trace_sampling_policy", json={"enabled": True}, headers=AUTHORIZATION
+            )
+
+        assert response.status_code == 200
+        assert response.get_json()["message"] == ""
+
+    def test_should_reject_invalid_policies(self, client):
+        response = client.put(
+            "/trace_sampling_policy", json={"default_rate": 5}, headers=AUTHORIZATION
+        )
+
+        assert response.status_code == 400
+        assert "between 0 and 1" in response.get_json()["message"]
+
+    def test_should_not_exist_without_a_token_configured(self):
+        response = create_app().test_client().get("/trace_sampling_policy")
+
+        assert response.status_code == 404
@@ -0,0 +1,107 @@
+import json
+import pytest
+import aiohttp
+from app.data_models import Account, Activation, UserModel
+from app.database.dml import upsert_activations_async
+from app.event_loop import BackgroundEventLoop
+from app.http_sessions import (
+    ClientSessionRegistry,
+    get_client_session,
+    set_client_session_registry,
+)
+
+
+@pytest.fixture
+def background_loop():
+    background_loop = BackgroundEventLoop(name="test-event-loop")
+    yield background_loop
+    background_loop.shutdown()
+
+
+@pytest.fixture
+def created_sessions(background_loop):
+    created = []
+
+    def factory(base_url):
+        created.append(base_url)
+        return aiohttp.ClientSession()
+
+    registry = ClientSessionRegistry(session_factory=factory)
+    set_client_session_registry(registry)
+    yield created
+    background_loop.run(registry.close())
+    set_client_session_registry(ClientSessionRegistry())
+
+
+class MockResponse:
+    status = 201
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class MockSession:
+    closed = False
+
+    def __init__(self):
+        self.posted = []
+
+    def post(self, url, data=None, **kwargs):
+        self.posted.append((url, json.loads(data)))
+        return MockResponse()
+
+
+def get_mock_activation(index: int):
+    account = Account(id=f"mock_account_id_{index}", name="Mock Account")
+    return Activation(
+        id=f"mock_activation_id_{index}",
+        account=account,
+        activated_by=UserModel(id="mock_user_id"),
+        active_contact_ids=set(),
+        task_ids=set(),
+        event_ids=set(),
+    )
+
+
+class TestClientSessionRegistry:
+    def test_should_reuse_sessions_per_base_url(self, background_loop, created_sessions):
+        async def get_sessions():
+            return (
+                get_client_session("https://example.my.salesforce.com/services/data"),
+                get_client_session("https://example.my.salesforce.com/composite"),
+                get_client_session("https://project.supabase.co/rest/v1/Activations"),
+            )
+
+        first = background_loop.run(get_sessions())
+        second = background_loop.run(get_sessions())
+
+        assert first == second
+        assert first[0] is first[1] and first[0] is not first[2]
+        assert created_sessions == [
+            "https://example.my.salesforce.com",
+            "https://project.supabase.co",
+        ]
+
+    def test_should_upsert_through_the_injected_session(self, background_loop):
+        session = MockSession()
+        set_client_session_registry(
+            ClientSessionRegistry(session_factory=lambda base_url: session)
+        )
+
+        try:
+            for index in range(2):
+                response = background_loop.run(
+                    upsert_activations_async([get_mock_activation(index)])
+                )
+                assert response.success
+        finally:
+            set_client_session_registry(ClientSessionRegistry())
+
+        assert [url.endswith("/rest/v1/Activations") for url, _ in session.posted] == [
+            True,
+            True,
+        ]
+        assert session.posted[1][1][0]["id"] == "mock_activation_id_1"
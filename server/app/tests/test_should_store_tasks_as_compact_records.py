@@ -0,0 +1,67 @@
+from datetime import datetime
+from app.data_models import (
+    Account,
+    Activation,
+    Filter,
+    TaskRecord,
+    UserModel,
+)
+from app.mapper.mapper import python_activation_to_supabase_dict
+from app.utils import is_model_date_field_within_window
+
+
+def get_mock_task_record():
+    return TaskRecord.from_sobject(
+        {
+            "attributes": {"type": "Task"},
+            "Id": "mock_task_id",
+            "WhoId": "mock_contact_id",
+            "OwnerId": "mock_user_id",
+            "Subject": "Email: hello",
+            "Status": "Completed",
+            "CreatedDate": "2024-01-02T10:00:00.000+0000",
+        }
+    )
+
+
+class TestTaskRecord:
+    def test_should_behave_like_the_sobject_dict(self):
+        task = get_mock_task_record()
+
+        assert task["Id"] == "mock_task_id"
+        assert task.get("WhatId") is None
+        assert task.get("NotAField") is None
+        assert "attributes" not in task
+        assert not hasattr(task, "__dict__")
+
+        task["Account"] = {"id": "mock_account_id"}
+        assert task["Account"] == {"id": "mock_account_id"}
+
+    def test_should_match_filters_and_date_windows(self):
+        task = get_mock_task_record()
+        subject_filter = Filter(
+            field="Subject", operator="contains", value="Email", data_type="string"
+        )
+
+        assert subject_filter.matches(task)
+        assert is_model_date_field_within_window(task, datetime(2024, 1, 1), 2)
+
+    def test_should_serialize_as_plain_dict_on_activation(self):
+        task = get_mock_task_record()
+        account = Account(id="mock_account_id", name="Mock Account")
+        task["Account"] = account
+        activation = Activation(
+            id="mock_activation_id",
+            account=account,
+            activated_by=UserModel(id="mock_user_id"),
+            tasks=[task],
+            task_ids={"mock_task_id"},
+            active_contact_ids=set(),
+            event_ids=set(),
+        )
+
+        assert activation.tasks[0] is task
+        serialized = activation.to_dict()["tasks"][0]
+        assert isinstance(serialized, dict)
+        assert serialized["Account"]["id"] == "mock_account_id"
+        assert '"Id": "mock_task_id"' in python_activation_to_supabase_dict(activation)["tasks"]
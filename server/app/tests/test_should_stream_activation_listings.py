@@ -0,0 +1,69 @@
+import json
+from datetime import date
+import pytest
+from flask import Flask, jsonify
+from app.data_models import ApiResponse
+from app.streaming import NDJSON_MIMETYPE, ROWS_PER_CHUNK, stream_api_response
+
+ROWS = [
+    {"id": f"mock_activation_{i}", "last_prospecting_activity": date(2024, 1, 2)}
+    for i in range(ROWS_PER_CHUNK * 2 + 5)
+]
+SUMMARY = {"total_activations": len(ROWS)}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route("/streamed")
+    def streamed():
+        response = ApiResponse(data=[], message="", success=True)
+        return stream_api_response(response, {"summary": SUMMARY}, "raw_data", iter(ROWS))
+
+    @app.route("/buffered")
+    def buffered():
+        response = ApiResponse(
+            data=[{"summary": SUMMARY, "raw_data": ROWS}], message="", success=True
+        )
+        return jsonify(response.to_dict())
+
+    return app.test_client()
+
+
+class TestStreamingResponses:
+    def test_should_stream_the_same_document_as_jsonify(self, client):
+        streamed = client.get("/streamed")
+
+        assert streamed.is_streamed
+        assert streamed.mimetype == "application/json"
+        assert streamed.get_json() == client.get("/buffered").get_json()
+
+    def test_should_stream_ndjson_when_requested(self, client):
+        for kwargs in (
+            {"query_string": {"format": "ndjson"}},
+            {"headers": {"Accept": NDJSON_MIMETYPE}},
+        ):
+            streamed = client.get("/streamed", **kwargs)
+            lines = streamed.get_data(as_text=True).splitlines()
+
+            assert streamed.mimetype == NDJSON_MIMETYPE
+            assert json.loads(lines[0]) == {
+                "data": [{"summary": SUMMARY}],
+                "message": "",
+                "success": True,
+                "status_code": 200,
+            }
+            assert [json.loads(line)["id"] for line in lines[1:]] == [
+                row["id"] for row in ROWS
+            ]
+
+    def test_should_stream_empty_listings(self):
+        app = Flask(__name__)
+        with app.test_request_context("/"):
+            response = stream_api_response(
+                ApiResponse(data=[], success=True), {}, "raw_data", []
+            )
+            body = json.loads("".join(response.response))
+
+        assert body["data"] == [{"raw_data": []}]
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from tenacity import wait_none
+from app.data_models import Account, Activation, UserModel
+from app.database.activation_writer import ActivationWriter
+from app.http_sessions import ClientSessionRegistry, set_client_session_registry
+
+
+def get_mock_activation(index: int):
+    account = Account(id=f"mock_account_id_{index}", name="Mock Account")
+    return Activation(
+        id=f"mock_activation_id_{index}",
+        account=account,
+        activated_by=UserModel(id="mock_user_id"),
+        active_contact_ids=set(),
+        task_ids=set(),
+        event_ids=set(),
+    )
+
+
+class MockResponse:
+    def __init__(self, session, status):
+        self.session = session
+        self.status = status
+        self.request_info = SimpleNamespace(real_url="mock_url")
+        self.history = ()
+
+    async def __aenter__(self):
+        self.session.in_flight += 1
+        self.session.max_in_flight = max(self.session.max_in_flight, self.session.in_flight)
+        await asyncio.sleep(0.01)
+        self.session.in_flight -= 1
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def text(self):
+        return "mock error"
+
+
+class MockSession:
+    closed = False
+
+    def __init__(self, failing_ids=(), fail_times=0):
+        self.chunks = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failing_ids = set(failing_ids)
+        self.fail_times = fail_times
+        self.attempts = 0
+
+    def post(self, url, data=None, **kwargs):
+        ids = {activation["id"] for activation in json.loads(data)}
+        if ids & self.failing_ids:
+            self.attempts += 1
+            if self.fail_times is None or self.attempts <= self.fail_times:
+                return MockResponse(self, 500)
+        self.chunks.append(sorted(ids))
+        return MockResponse(self, 201)
+
+
+@pytest.fixture
+def session():
+    return MockSession()
+
+
+def use_session(session):
+    set_client_session_registry(ClientSessionRegistry(session_factory=lambda _: session))
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    yield
+    set_client_session_registry(ClientSessionRegistry())
+
+
+class TestActivationWriter:
+    def test_should_keep_requests_in_flight_while_activations_are_produced(self):
+        session = MockSession()
+        use_session(session)
+        written = []
+
+        async def produce():
+            async with ActivationWriter(
+                chunk_size=2, max_in_flight=3, on_chunk_written=written.append
+            ) as writer:
+                for index in range(11):
+                    await writer.put(get_mock_activation(index))
+            return writer
+
+        writer = asyncio.run(produce())
+
+        assert writer.result.success
+        assert writer.written_count == 11
+        assert sorted(len(chunk) for chunk in session.chunks) == [1, 2, 2, 2, 2, 2]
+        assert 1 < session.max_in_flight <= 3
+        assert written[-1] == 11
+
+    def test_should_retry_failed_chunks(self):
+        session = MockSession(failing_ids=["mock_activation_id_0"], fail_times=2)
+        use_session(session)
+
+        async def produce():
+            async with ActivationWriter(
+                chunk_size=1, max_retries=3, retry_wait=wait_none()
+            ) as writer:
+                await writer.put_many(get_mock_activation(index) for index in range(2))
+            return writer
+
+        writer = asyncio.run(produce())
+
+        assert writer.result.success
+        assert session.attempts == 3
+
+    def test_should_report_chunks_that_keep_failing_without_dropping_others(self):
+        session = MockSession(failing_ids=["mock_activation_id_0"], fail_times=None)
+        use_session(session)
+
+        async def produce():
+            async with ActivationWriter(
+                chunk_size=1, max_retries=2, retry_wait=wait_none()
+            ) as writer:
+                await writer.put_many(get_mock_activation(index) for index in range(3))
+            return writer
+
+        writer = asyncio.run(produce())
+
+        assert not writer.result.success
+        assert [failure.activation_ids for failure in writer.failures] == [
+            ["mock_activation_id_0"]
+        ]
+        assert writer.written_count == 2
+        assert sorted(session.chunks) == [
+            ["mock_activation_id_1"],
+            ["mock_activation_id_2"],
+        ]
+
+    def test_should_keep_writing_when_invalidating_summaries_fails(self):
+        session = MockSession()
+        use_session(session)
+
+        async def produce():
+            async with ActivationWriter(chunk_size=1, max_in_flight=2) as writer:
+                await writer.put_many(get_mock_activation(index) for index in range(5))
+            return writer
+
+        with patch(
+            "app.database.activation_writer.bump_data_version",
+            side_effect=Exception("mock cache failure"),
+        ):
+            # slots leaked by failed invalidations would block the third chunk forever
+            writer = asyncio.run(asyncio.wait_for(produce(), timeout=5))
+
+        assert writer.result.success
+        assert writer.written_count == 5
@@ -0,0 +1,86 @@
+import copy
+from datetime import date, timedelta
+from app.database.activation_selector import ACTIVATION_SUMMARY_COLUMNS
+from app.helpers.activation_helper import generate_summary
+from app.mapper.mapper import supabase_dict_to_python_activation
+from app.mapper.projection import supabase_dict_to_activation_record
+
+
+def get_mock_activation_row(index: int, status: str):
+    activated_date = date.today() - timedelta(days=index)
+    return {
+        "id": f"mock_activation_id_{index}",
+        "activated_by_id": "mock_user_id",
+        "activated_by": {"id": "mock_user_id", "firstName": "Mock"},
+        "status": status,
+        "account": {"id": f"mock_account_id{index}", "name": "Mock Account"},
+        "activated_date": activated_date.isoformat(),
+        "first_prospecting_activity": activated_date.isoformat(),
+        "last_prospecting_activity": date.today().isoformat(),
+        "active_contact_ids": ["mock_contact_id0", "mock_contact_id1"],
+        "task_ids": ["mock_task_id_0", "mock_task_id_1", "mock_task_id_2"],
+        "event_ids": None,
+        "opportunity": (
+            {
+                "id": "mock_opportunity_id",
+                "name": "Mock Opportunity",
+                "amount": 1733.42,
+                "stage": "Closed Won",
+                "close_date": date.today().isoformat(),
+                "created_date": date.today().isoformat(),
+            }
+            if status == "Opportunity Created"
+            else None
+        ),
+        "prospecting_metadata": [
+            {"name": "Unique Content", "total": 3, "task_ids": []},
+        ],
+        "prospecting_effort": [
+            {
+                "activation_id": f"mock_activation_id_{index}",
+                "status": "Activated",
+                "date_entered": activated_date.isoformat(),
+                "task_ids": ["mock_task_id_0"],
+                "prospecting_metadata": [
+                    {"name": "Unique Content", "total": 1, "task_ids": []}
+                ],
+            },
+            {
+                "activation_id": f"mock_activation_id_{index}",
+                "status": status,
+                "date_entered": date.today().isoformat(),
+                "task_ids": [],
+                "prospecting_metadata": [],
+            },
+        ],
+    }
+
+
+class TestActivationProjection:
+    def test_should_produce_the_same_summary_as_pydantic_models(self):
+        rows = [
+            get_mock_activation_row(0, "Activated"),
+            get_mock_activation_row(1, "Engaged"),
+            get_mock_activation_row(2, "Opportunity Created"),
+        ]
+
+        models = [supabase_dict_to_python_activation(copy.deepcopy(r)) for r in rows]
+        records = [
+            supabase_dict_to_activation_record(r, ACTIVATION_SUMMARY_COLUMNS)
+            for r in rows
+        ]
+
+        assert generate_summary(records) == generate_summary(models)
+
+    def test_should_only_hold_projected_columns(self):
+        record = supabase_dict_to_activation_record(
+            get_mock_activation_row(0, "Activated"), ["id", "account"]
+        )
+
+        assert record.account.id == "mock_account_id0"
+        assert record.to_dict() == {
+            "id": "mock_activation_id_0",
+            "account": {"id": "mock_account_id0", "name": "Mock Account"},
+        }
+        assert not hasattr(record, "__dict__")
+        assert not hasattr(record, "status")
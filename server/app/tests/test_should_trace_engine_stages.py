@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from unittest.mock import patch
+from app.event_loop import BackgroundEventLoop, run_blocking
+from app.instrumentation import (
+    SlowCallbackFilter,
+    get_event_loop_stats,
+    get_recent_runs,
+    stage,
+    trace_run,
+)
+
+
+def spin(seconds):
+    ends_at = time.thread_time() + seconds
+    while time.thread_time() < ends_at:
+        pass
+
+
+async def mock_refresh():
+    with trace_run("mock_refresh") as run:
+        with stage("fetch tasks"):
+            await asyncio.sleep(0.05)
+            with stage("resolve contacts"):
+                await run_blocking(spin, 0.05)
+        with stage("compute"):
+            spin(0.02)
+    return run
+
+
+class TestTraceRun:
+    def test_should_time_nested_stages_with_offloaded_cpu(self):
+        run = asyncio.run(mock_refresh())
+
+        report = get_recent_runs()[-1]
+        assert report["run_id"] == run.run_id
+        assert [(s["name"], s["parent"]) for s in report["stages"]] == [
+            ("fetch tasks", "mock_refresh"),
+            ("resolve contacts", "fetch tasks"),
+            ("compute", "mock_refresh"),
+        ]
+        fetch_tasks, resolve_contacts, compute = report["stages"]
+        assert fetch_tasks["wall_ms"] >= 100
+        # CPU spent on the blocking pool counts toward the stage and its parents
+        assert resolve_contacts["offloaded_cpu_ms"] >= 50
+        assert fetch_tasks["offloaded_cpu_ms"] >= 50
+        assert report["offloaded_cpu_ms"] >= 50
+        assert compute["cpu_ms"] >= 20
+        assert compute["offloaded_cpu_ms"] == 0
+
+    def test_should_leave_unsampled_runs_untraced(self):
+        runs_before = len(get_recent_runs())
+        with patch("config.Config.ENGINE_TRACE_SAMPLE_RATE", 0):
+            run = asyncio.run(mock_refresh())
+
+        assert run is None
+        assert len(get_recent_runs()) == runs_before
+
+
+class TestEventLoopLag:
+    def test_should_sample_the_lag_of_a_blocked_loop(self):
+        async def block_loop():
+            time.sleep(0.3)
+
+        background_loop = BackgroundEventLoop(name="mock-loop")
+        with patch("config.Config.EVENT_LOOP_LAG_INTERVAL_SECONDS", 0.05):
+            background_loop.run(asyncio.sleep(0.1))
+            background_loop.run(block_loop())
+            background_loop.run(asyncio.sleep(0.1))
+        background_loop.shutdown()
+
+        stats = get_event_loop_stats()
+        assert stats["lag_samples"] > 0
+        assert stats["lag_max_ms"] >= 200
+        assert stats["stalls"] >= 1
+
+    def test_should_record_slow_callbacks_asyncio_reports(self):
+        record = logging.LogRecord(
+            "asyncio",
+            logging.WARNING,
+            __file__,
+            0,
+            "Executing %s took %.3f seconds",
+            ("<Task pending name='mock_refresh'>", 0.25),
+            None,
+        )
+        slow_callbacks = get_event_loop_stats()["slow_callbacks"]
+
+        assert SlowCallbackFilter().filter(record)
+
+        stats = get_event_loop_stats()
+        assert stats["slow_callbacks"] == slow_callbacks + 1
+        assert stats["recent_slow_callbacks"][-1]["callback"] == (
+            "<Task pending name='mock_refresh'>"
+        )
+        assert stats["recent_slow_callbacks"][-1]["duration_ms"] == 250
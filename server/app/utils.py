@@ -1,6 +1,8 @@
 import uuid, traceback
+import asyncio
+from collections.abc import Mapping
 from dataclasses import is_dataclass
-from typing import Any, Set
+from typing import Any, Awaitable, List, Optional, Set
 from datetime import timedelta, datetime, date, timezone
 from functools import reduce
 import re
@@ -49,8 +51,8 @@ def get_nested_value(item, path):
     keys = path.split(".")
 
     def get_value(current_item, key):
-        # If the current part is a dictionary, use get
-        if isinstance(current_item, dict):
+        # If the current part is a dictionary (or dict-like TaskRecord), use get
+        if isinstance(current_item, Mapping):
             return current_item.get(key)
         # If it's a dataclass or an object, use getattr
         elif is_dataclass(current_item) or hasattr(current_item, key):
@@ -113,7 +115,7 @@ def is_model_date_field_within_window(
     """
     ## offset-naive start time
     end_date = start_date + timedelta(days=period_days)
-    if isinstance(sobject_model, dict):
+    if isinstance(sobject_model, Mapping):
         model_date_value = datetime.strptime(
             sobject_model[date_field], "%Y-%m-%dT%H:%M:%S.%f%z"
         ).replace(tzinfo=None)
@@ -195,6 +197,26 @@ def format_error_message(e):
     return f"{tb_str} [{str(e)}]"
 
 
+# async utils
+async def gather_with_deadline(
+    *awaitables: Awaitable, timeout: Optional[float] = None
+) -> List[Any]:
+    """
+    Awaits `awaitables` concurrently and returns their results in order. Unlike
+    `asyncio.gather`, the first failure, or reaching `timeout` seconds, cancels the
+    ones still running before the error is raised. Work offloaded with
+    `run_blocking` is no longer awaited once cancelled, but its thread runs on.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.wait_for(asyncio.gather(*tasks), timeout)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
 # string utils
 def surround_numbers_with_underscores(text):
     return re.sub(r"(\d+)", r"_\1_", text)
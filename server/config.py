@@ -29,5 +29,160 @@ class Config:
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = "Lax"
     SESSION_COOKIE_DOMAIN = None  # Allow the cookie to be valid for all subdomains
+
+    # Summary cache: "local" (per process), "redis" (shared, needs REDIS_URL) or "memory".
+    # Defaults to "redis" when REDIS_URL is set; "local" refuses to run under several
+    # workers (WEB_CONCURRENCY, as gunicorn reads it) since they would serve stale data
+    SUMMARY_CACHE_BACKEND = os.getenv(
+        "SUMMARY_CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "local"
+    )
+    SUMMARY_CACHE_TTL_SECONDS = int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", 60 * 60))
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 512))
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+
+    # Authenticated sessions are cached per process; unknown tokens are cached for less time
+    SESSION_CACHE_TTL_SECONDS = int(os.getenv("SESSION_CACHE_TTL_SECONDS", 30))
+    SESSION_CACHE_NEGATIVE_TTL_SECONDS = int(
+        os.getenv("SESSION_CACHE_NEGATIVE_TTL_SECONDS", 5)
+    )
+    SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", 4096))
+
+    # Pooled aiohttp sessions shared across requests, one per remote base URL
+    HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", 100))
+    HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", 20))
+    HTTP_DNS_CACHE_TTL_SECONDS = int(os.getenv("HTTP_DNS_CACHE_TTL_SECONDS", 300))
+    HTTP_KEEPALIVE_TIMEOUT_SECONDS = int(os.getenv("HTTP_KEEPALIVE_TIMEOUT_SECONDS", 30))
+
+    # Background jobs, e.g. activation refreshes. Only the in-process "local" queue exists
+    # today, which refuses to run under several workers (see WEB_CONCURRENCY)
+    JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "local")
+    JOB_QUEUE_MAX_WORKERS = int(os.getenv("JOB_QUEUE_MAX_WORKERS", 4))
+    JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", 60 * 60))
+    # callers within this many seconds of a team refresh starting share its result
+    JOB_COALESCE_WINDOW_SECONDS = int(os.getenv("JOB_COALESCE_WINDOW_SECONDS", 30))
+
+    # Sync Salesforce/Supabase calls from coroutines run on a bounded thread pool.
+    # In debug mode the background loop reports anything blocking it past the threshold
+    BLOCKING_IO_MAX_WORKERS = int(os.getenv("BLOCKING_IO_MAX_WORKERS", 16))
+    EVENT_LOOP_DEBUG = os.getenv("EVENT_LOOP_DEBUG", "false").lower() == "true"
+    EVENT_LOOP_BLOCKING_THRESHOLD_SECONDS = float(
+        os.getenv("EVENT_LOOP_BLOCKING_THRESHOLD_SECONDS", 0.1)
+    )
+
+    # Engine instrumentation: loop lag sampling, and stage timings of a sample of runs,
+    # optionally sent to Sentry as span trees. Run reports are kept per team and job in
+    # ENGINE_TRACE_BACKEND ("local", "redis" or "memory"; "redis" when REDIS_URL is set)
+    EVENT_LOOP_LAG_INTERVAL_SECONDS = float(
+        os.getenv("EVENT_LOOP_LAG_INTERVAL_SECONDS", 1)
+    )
+    EVENT_LOOP_LAG_HISTORY = int(os.getenv("EVENT_LOOP_LAG_HISTORY", 3600))
+    ENGINE_TRACE_SAMPLE_RATE = float(os.getenv("ENGINE_TRACE_SAMPLE_RATE", 1.0))
+    ENGINE_TRACE_SENTRY_SPANS = (
+        os.getenv("ENGINE_TRACE_SENTRY_SPANS", "false").lower() == "true"
+    )
+    ENGINE_TRACE_HISTORY = int(os.getenv("ENGINE_TRACE_HISTORY", 100))
+    ENGINE_TRACE_BACKEND = os.getenv(
+        "ENGINE_TRACE_BACKEND", "redis" if os.getenv("REDIS_URL") else "local"
+    )
+    ENGINE_TRACE_TTL_SECONDS = int(os.getenv("ENGINE_TRACE_TTL_SECONDS", 7 * 24 * 3600))
+
+    # Sentry traces a share of requests; /metrics covers all of them and requires
+    # METRICS_TOKEN as a bearer token. Without a token it is only served in development
+    ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+    SENTRY_TRACES_SAMPLE_RATE = float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", 0.05))
+    SENTRY_PROFILES_SAMPLE_RATE = float(os.getenv("SENTRY_PROFILES_SAMPLE_RATE", 0.1))
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Route-aware trace sampling: "route=rate" pairs (1 always traces), a per-route cap
+    # on traces a minute, and where runtime overrides live ("local", "redis", "memory";
+    # "redis" when REDIS_URL is set, "local" only switches the worker that served it).
+    # Overrides are switched through /trace_sampling_policy with SENTRY_SAMPLING_TOKEN
+    SENTRY_ROUTE_SAMPLE_RATES = os.getenv(
+        "SENTRY_ROUTE_SAMPLE_RATES",
+        "/process_new_prospecting_activity=1,activation_refresh=1,"
+        "/get_settings=0.01,/get_job_status=0.01,/metrics=0",
+    )
+    SENTRY_TRACES_TARGET_PER_MINUTE = int(
+        os.getenv("SENTRY_TRACES_TARGET_PER_MINUTE", 30)
+    )
+    SENTRY_SAMPLING_POLICY_BACKEND = os.getenv(
+        "SENTRY_SAMPLING_POLICY_BACKEND", "redis" if os.getenv("REDIS_URL") else "local"
+    )
+    SENTRY_SAMPLING_POLICY_REFRESH_SECONDS = int(
+        os.getenv("SENTRY_SAMPLING_POLICY_REFRESH_SECONDS", 30)
+    )
+    SENTRY_SAMPLING_TOKEN = os.getenv("SENTRY_SAMPLING_TOKEN")
+
+    # deadline shared by the Salesforce reads an activation refresh prefetches together
+    ACTIVATION_PREFETCH_TIMEOUT_SECONDS = int(
+        os.getenv("ACTIVATION_PREFETCH_TIMEOUT_SECONDS", 120)
+    )
+
+    # Onboarding previews: describes are shared per org, sample records per viewer
+    ONBOARDING_DESCRIBE_CACHE_TTL_SECONDS = int(
+        os.getenv("ONBOARDING_DESCRIBE_CACHE_TTL_SECONDS", 60 * 60)
+    )
+    ONBOARDING_PREVIEW_CACHE_TTL_SECONDS = int(
+        os.getenv("ONBOARDING_PREVIEW_CACHE_TTL_SECONDS", 5 * 60)
+    )
+    ONBOARDING_PREVIEW_CACHE_MAX_ENTRIES = int(
+        os.getenv("ONBOARDING_PREVIEW_CACHE_MAX_ENTRIES", 256)
+    )
+
+    # SOQL "Id IN (...)" batching: batches keep the query URL under the REST URI limit
+    SOQL_MAX_URI_LENGTH = int(os.getenv("SOQL_MAX_URI_LENGTH", 16000))
+    SOQL_IN_BATCH_MAX_BATCHES = int(os.getenv("SOQL_IN_BATCH_MAX_BATCHES", 20))
+    SOQL_IN_BATCH_CONCURRENCY = int(os.getenv("SOQL_IN_BATCH_CONCURRENCY", 4))
+
+    # Salesforce calls are retried on timeouts, throttling and 5xx replies. Contact
+    # lookups, the largest fan-out of a refresh, send at most this many calls at once
+    SALESFORCE_REQUEST_TIMEOUT_SECONDS = float(
+        os.getenv("SALESFORCE_REQUEST_TIMEOUT_SECONDS", 30)
+    )
+    SALESFORCE_RETRY_ATTEMPTS = int(os.getenv("SALESFORCE_RETRY_ATTEMPTS", 3))
+    SALESFORCE_RETRY_MIN_WAIT_SECONDS = float(
+        os.getenv("SALESFORCE_RETRY_MIN_WAIT_SECONDS", 2)
+    )
+    SALESFORCE_CONTACT_LOOKUP_CONCURRENCY = int(
+        os.getenv("SALESFORCE_CONTACT_LOOKUP_CONCURRENCY", 2)
+    )
+
+    # Salesforce query planner cost model, in milliseconds
+    SALESFORCE_PLANNER_REQUEST_COST_MS = float(
+        os.getenv("SALESFORCE_PLANNER_REQUEST_COST_MS", 150)
+    )
+    SALESFORCE_PLANNER_SUBREQUEST_COST_MS = float(
+        os.getenv("SALESFORCE_PLANNER_SUBREQUEST_COST_MS", 15)
+    )
+    SALESFORCE_PLANNER_ROW_COST_MS = float(
+        os.getenv("SALESFORCE_PLANNER_ROW_COST_MS", 0.05)
+    )
+    SALESFORCE_PLANNER_ID_COST_MS = float(
+        os.getenv("SALESFORCE_PLANNER_ID_COST_MS", 0.01)
+    )
+    SALESFORCE_PLANNER_ROWS_PER_ID = float(
+        os.getenv("SALESFORCE_PLANNER_ROWS_PER_ID", 1)
+    )
+
+    # Bulk API 2.0 queries for large broad pulls, off unless enabled
+    SALESFORCE_BULK_ENABLED = (
+        os.getenv("SALESFORCE_BULK_ENABLED", "false").lower() == "true"
+    )
+    SALESFORCE_BULK_JOB_COST_MS = float(
+        os.getenv("SALESFORCE_BULK_JOB_COST_MS", 3000)
+    )
+    SALESFORCE_BULK_ROW_COST_MS = float(
+        os.getenv("SALESFORCE_BULK_ROW_COST_MS", 0.005)
+    )
+    SALESFORCE_BULK_POLL_SECONDS = float(os.getenv("SALESFORCE_BULK_POLL_SECONDS", 2))
+    SALESFORCE_BULK_TIMEOUT_SECONDS = float(
+        os.getenv("SALESFORCE_BULK_TIMEOUT_SECONDS", 300)
+    )
+
+    # JSON responses larger than this are gzip/brotli encoded when the client accepts it
+    COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 500))
+    COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))
+
     STRIPE_PRICE_ID = "price_1PnKvQEldv3lVQeQ8sfDVHBG"
     STRIPE_SECRET_KEY = "sk_test_51Pn71vEldv3lVQeQipdKnrCEaH3wPhplvxhUDjE3KMPFb1L1cJjj1hu1tkfFgbzakx4UmAmo0bzY6nkZpR8a597h00k1IA4yBL"